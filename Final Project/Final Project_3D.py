@@ -4,7 +4,37 @@ from OpenGL.GLU import *
 import random
 import math
 import time
+import os
 import sys
+import argparse
+import hashlib
+import struct
+from array import array
+from collections import deque
+from itertools import repeat
+
+# redraw.py and text_atlas.py are shared with the labs, from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from spatial_hash import SpatialHash
+from entity_store import ArrayStore, view_class, np
+from platform_table import PlatformTable
+from flow_field import FlowField
+from geometry_cache import GeometryCache
+from batch_renderer import BatchRenderer, pack_spheres
+from lod import SphereLOD
+from frustum import Frustum
+from profiler import Profiler
+from game_loop import FixedStepLoop
+from entity_pool import Pool
+from rng_streams import RandomStreams
+from text_atlas import TextAtlas, CachedLine
+from replay import InputLog, KEY_DOWN, KEY_UP, SPECIAL_DOWN, SPECIAL_UP, MOUSE
+from input_queue import InputQueue, PlayerCommand, LEFT, RIGHT, JUMP, ATTACK
+from redraw import RedrawScheduler, DEFAULT_FPS
+from checkpoint import KINDS, encode, save
 
 # Constants
 SCREEN_WIDTH = 1200
@@ -22,10 +52,17 @@ BLAST_RADIUS = 300
 MAX_HEALTH = 100
 ENEMY_SPAWN_RATE = 3
 ENEMY_SPEED = 10
+ENEMY_SIZE = 25
 ENEMY_DAMAGE = 5
 ENEMY_JUMP_CHANCE = 0.02
 ARENA_WIDTH = 1000
 ARENA_HEIGHT = 600
+FLOW_CELL_SIZE = 25  # grid spacing of the enemy pathing field
+FOV_Y = 45
+NEAR_PLANE = 0.1
+FAR_PLANE = 5000
+FIXED_STEP = 1/60.0  # simulation dt, independent of the frame rate
+MAX_CATCHUP_STEPS = 5
 
 # Game states
 MENU = 0
@@ -38,11 +75,278 @@ NO_WEAPON = 0
 SWORD = 1
 GUN = 2
 GRENADE = 3
+WEAPON_NAMES = {NO_WEAPON: "None", SWORD: "Sword", GUN: "Gun", GRENADE: "Grenade"}
+
+# Static meshes. Each is compiled into a display list by the geometry
+# cache, so they must not depend on per-frame state.
+def draw_player_body_mesh():
+    glBegin(GL_QUADS)
+    # Front
+    glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    # Back
+    glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
+    # Left
+    glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
+    # Right
+    glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
+    # Top
+    glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
+    # Bottom
+    glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
+    glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
+    glEnd()
+
+def draw_sword_mesh(facing_right):
+    # Sword handle
+    glColor3f(0.5, 0.3, 0.1)
+    glBegin(GL_QUADS)
+    glVertex3f(0, -5, -3)
+    glVertex3f(10 if facing_right else -10, -5, -3)
+    glVertex3f(10 if facing_right else -10, 5, -3)
+    glVertex3f(0, 5, -3)
+    glVertex3f(0, -5, 3)
+    glVertex3f(10 if facing_right else -10, -5, 3)
+    glVertex3f(10 if facing_right else -10, 5, 3)
+    glVertex3f(0, 5, 3)
+    glEnd()
+
+    # Sword blade
+    glColor3f(0.9, 0.9, 0.9)
+    glBegin(GL_QUADS)
+    glVertex3f(10 if facing_right else -10, -3, -2)
+    glVertex3f(30 if facing_right else -30, -3, -2)
+    glVertex3f(30 if facing_right else -30, 3, -2)
+    glVertex3f(10 if facing_right else -10, 3, -2)
+    glVertex3f(10 if facing_right else -10, -3, 2)
+    glVertex3f(30 if facing_right else -30, -3, 2)
+    glVertex3f(30 if facing_right else -30, 3, 2)
+    glVertex3f(10 if facing_right else -10, 3, 2)
+    glEnd()
+
+    # Sword tip
+    glColor3f(0.8, 0.8, 0.8)
+    glBegin(GL_TRIANGLES)
+    glVertex3f(30 if facing_right else -30, -3, -2)
+    glVertex3f(40 if facing_right else -40, 0, -2)
+    glVertex3f(30 if facing_right else -30, 3, -2)
+    glVertex3f(30 if facing_right else -30, -3, 2)
+    glVertex3f(40 if facing_right else -40, 0, 2)
+    glVertex3f(30 if facing_right else -30, 3, 2)
+    glEnd()
+
+def draw_gun_mesh(facing_right):
+    # Gun body
+    glColor3f(0.4, 0.4, 0.4)
+    glBegin(GL_QUADS)
+    # Main body
+    glVertex3f(0, -6, -4)
+    glVertex3f(20 if facing_right else -20, -6, -4)
+    glVertex3f(20 if facing_right else -20, 6, -4)
+    glVertex3f(0, 6, -4)
+    glVertex3f(0, -6, 4)
+    glVertex3f(20 if facing_right else -20, -6, 4)
+    glVertex3f(20 if facing_right else -20, 6, 4)
+    glVertex3f(0, 6, 4)
+
+    # Barrel
+    glVertex3f(20 if facing_right else -20, -4, -3)
+    glVertex3f(30 if facing_right else -30, -4, -3)
+    glVertex3f(30 if facing_right else -30, 4, -3)
+    glVertex3f(20 if facing_right else -20, 4, -3)
+    glVertex3f(20 if facing_right else -20, -4, 3)
+    glVertex3f(30 if facing_right else -30, -4, 3)
+    glVertex3f(30 if facing_right else -30, 4, 3)
+    glVertex3f(20 if facing_right else -20, 4, 3)
+
+    # Grip
+    glVertex3f(5 if facing_right else -5, -6, -6)
+    glVertex3f(15 if facing_right else -15, -6, -6)
+    glVertex3f(15 if facing_right else -15, -2, -6)
+    glVertex3f(5 if facing_right else -5, -2, -6)
+    glVertex3f(5 if facing_right else -5, -6, 6)
+    glVertex3f(15 if facing_right else -15, -6, 6)
+    glVertex3f(15 if facing_right else -15, -2, 6)
+    glVertex3f(5 if facing_right else -5, -2, 6)
+    glEnd()
+
+    # Gun details
+    glColor3f(0.2, 0.2, 0.2)
+    glBegin(GL_LINES)
+    # Sights
+    glVertex3f(25 if facing_right else -25, 5, 0)
+    glVertex3f(25 if facing_right else -25, 7, 0)
+    glVertex3f(0, 5, 0)
+    glVertex3f(0, 7, 0)
+    glEnd()
+
+def draw_platform_mesh(width):
+    glColor3f(0.3, 0.6, 0.3)
+    glBegin(GL_QUADS)
+    # Top
+    glVertex3f(-width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glVertex3f(-width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    # Bottom
+    glVertex3f(-width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glVertex3f(-width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    # Front
+    glVertex3f(-width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glVertex3f(width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glVertex3f(width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glVertex3f(-width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    # Back
+    glVertex3f(-width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(-width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    # Left
+    glVertex3f(-width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(-width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(-width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glVertex3f(-width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    # Right
+    glVertex3f(width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
+    glVertex3f(width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glVertex3f(width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
+    glEnd()
+
+def draw_pickup_mesh(weapon_type):
+    if weapon_type == SWORD:
+        #blade
+        glColor3f(0.9, 0.9, 0.1)
+        glRotatef(45, 0, 0, 1)
+        glBegin(GL_QUADS)
+        glVertex3f(-20, -5, -2)
+        glVertex3f(20, -5, -2)
+        glVertex3f(20, 5, -2)
+        glVertex3f(-20, 5, -2)
+        glVertex3f(-20, -5, 2)
+        glVertex3f(20, -5, 2)
+        glVertex3f(20, 5, 2)
+        glVertex3f(-20, 5, 2)
+        glEnd()
+        #tip
+        glColor3f(0.5, 0.3, 0.1)
+        glBegin(GL_QUADS)
+        glVertex3f(-10, -7, -3)
+        glVertex3f(-5, -7, -3)
+        glVertex3f(-5, 7, -3)
+        glVertex3f(-10, 7, -3)
+        glVertex3f(-10, -7, 3)
+        glVertex3f(-5, -7, 3)
+        glVertex3f(-5, 7, 3)
+        glVertex3f(-10, 7, 3)
+        glEnd()
+    elif weapon_type == GUN:
+        glColor3f(0.4, 0.4, 0.4)
+        glBegin(GL_QUADS)
+        # Main body
+        glVertex3f(-15, -8, -5)
+        glVertex3f(15, -8, -5)
+        glVertex3f(15, 8, -5)
+        glVertex3f(-15, 8, -5)
+        glVertex3f(-15, -8, 5)
+        glVertex3f(15, -8, 5)
+        glVertex3f(15, 8, 5)
+        glVertex3f(-15, 8, 5)
+
+        # Barrel
+        glVertex3f(15, -4, -3)
+        glVertex3f(25, -4, -3)
+        glVertex3f(25, 4, -3)
+        glVertex3f(15, 4, -3)
+        glVertex3f(15, -4, 3)
+        glVertex3f(25, -4, 3)
+        glVertex3f(25, 4, 3)
+        glVertex3f(15, 4, 3)
+
+        # Grip
+        glVertex3f(-5, -8, -7)
+        glVertex3f(5, -8, -7)
+        glVertex3f(5, -4, -7)
+        glVertex3f(-5, -4, -7)
+        glVertex3f(-5, -8, 7)
+        glVertex3f(5, -8, 7)
+        glVertex3f(5, -4, 7)
+        glVertex3f(-5, -4, 7)
+        glEnd()
+
+        # Details
+        glColor3f(0.2, 0.2, 0.2)
+        glBegin(GL_LINES)
+        # Sights
+        glVertex3f(20, 6, 0)
+        glVertex3f(20, 8, 0)
+        glVertex3f(-5, 6, 0)
+        glVertex3f(-5, 8, 0)
+        glEnd()
+
+    elif weapon_type == GRENADE:
+        glColor3f(0.9, 0.2, 0.2)
+        glutSolidSphere(12, 10, 10)
+
+        glColor3f(0.8, 0.8, 0.8)
+        glBegin(GL_LINES)
+        glVertex3f(12, 5, 0)
+        glVertex3f(18, 8, 0)
+        glEnd()
+
+geometry = GeometryCache()
+batches = BatchRenderer()
+lod = SphereLOD()
+frustum = Frustum()
+profiler = Profiler()
+effects = RandomStreams()  # cosmetic randomness, never read by the simulation
+hud_text = TextAtlas([GLUT_BITMAP_HELVETICA_18, GLUT_BITMAP_TIMES_ROMAN_24, GLUT_BITMAP_9_BY_15])
+
+def steer_player(player, held, pressed):
+    # Movement part of a command: left or right alone walks, a jump press
+    # jumps. Shared with the network client's prediction.
+    if held & LEFT and not held & RIGHT:
+        player.vx = -PLAYER_SPEED
+        player.facing_right = False
+    elif held & RIGHT and not held & LEFT:
+        player.vx = PLAYER_SPEED
+        player.facing_right = True
+    else:
+        player.vx = 0
+    if pressed & JUMP:
+        player.jump()
+
+def weapon_line(weapon, seconds_left):
+    if weapon == NO_WEAPON:
+        return "Weapon: None"
+    return f"Weapon: {WEAPON_NAMES[weapon]} ({seconds_left}s)"
 
 class Player:
+    bound_radius = PLAYER_SIZE * 2  # body, head and a held sword
+    
     def __init__(self, x, y, player_id=1):
         self.x = x
         self.y = y
+        self.prev_x = x  # position before the last step, for interpolation
+        self.prev_y = y
         self.z = 0
         self.vx = 0
         self.vy = 0
@@ -61,7 +365,7 @@ class Player:
         self.color = (0.8, 0.2, 0.2) if player_id == 1 else (0.2, 0.2, 0.8)
         self.hit_effect = 0
     
-    def update(self, dt, platforms):
+    def update(self, dt, ground):
         self.vy -= GRAVITY
         self.x += self.vx * dt
         self.y += self.vy * dt
@@ -71,16 +375,12 @@ class Player:
             self.hit_effect = max(0, self.hit_effect - dt * 5)
         
         self.on_ground = False
-        for platform in platforms:
-            if (self.x + PLAYER_SIZE/2 > platform.x - platform.width/2 and 
-                self.x - PLAYER_SIZE/2 < platform.x + platform.width/2):
-                if (self.y - PLAYER_SIZE/2 <= platform.y + PLATFORM_HEIGHT/2 and 
-                    self.y - PLAYER_SIZE/2 >= platform.y - PLATFORM_HEIGHT/2 and 
-                    self.vy < 0):
-                    self.y = platform.y + PLATFORM_HEIGHT/2 + PLAYER_SIZE/2
-                    self.vy = 0
-                    self.on_ground = True
-                    self.is_jumping = False
+        landed = ground.land(self.x, self.y, self.vy, PLAYER_SIZE/2)
+        if landed >= 0:
+            self.y = ground.tops[landed] + PLAYER_SIZE/2
+            self.vy = 0
+            self.on_ground = True
+            self.is_jumping = False
         
         if self.sword_swinging:
             self.swing_angle += 30 * self.swing_direction  # Increased swing speed
@@ -117,43 +417,12 @@ class Player:
         else:
             glColor3f(*self.color)
             
-        glBegin(GL_QUADS)
-        # Front
-        glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        # Back
-        glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
-        # Left
-        glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
-        # Right
-        glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
-        # Top
-        glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glVertex3f(-PLAYER_SIZE/2, PLAYER_SIZE/2, PLAYER_SIZE/2)
-        # Bottom
-        glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, -PLAYER_SIZE/2)
-        glVertex3f(PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glVertex3f(-PLAYER_SIZE/2, -PLAYER_SIZE/2, PLAYER_SIZE/2)
-        glEnd()
+        geometry.draw(("player_body",), draw_player_body_mesh)
         
         # Head
         glColor3f(0.9, 0.7, 0.7)
         glTranslatef(0, PLAYER_SIZE/2 + PLAYER_SIZE/4, 0)
-        glutSolidSphere(PLAYER_SIZE/4, 10, 10)
+        lod.solid_sphere(PLAYER_SIZE/4, self.x, self.y + PLAYER_SIZE*3/4, self.z)
         
         # Weapon
         if self.weapon == SWORD:
@@ -162,118 +431,48 @@ class Player:
                 glRotatef(self.swing_angle if self.facing_right else -self.swing_angle, 0, 0, 1)
             glTranslatef(PLAYER_SIZE/2 if self.facing_right else -PLAYER_SIZE/2, -PLAYER_SIZE/4, 0)
             
-            # Sword handle
-            glColor3f(0.5, 0.3, 0.1)
-            glBegin(GL_QUADS)
-            glVertex3f(0, -5, -3)
-            glVertex3f(10 if self.facing_right else -10, -5, -3)
-            glVertex3f(10 if self.facing_right else -10, 5, -3)
-            glVertex3f(0, 5, -3)
-            glVertex3f(0, -5, 3)
-            glVertex3f(10 if self.facing_right else -10, -5, 3)
-            glVertex3f(10 if self.facing_right else -10, 5, 3)
-            glVertex3f(0, 5, 3)
-            glEnd()
-            
-            # Sword blade (only when swinging or holding)
-            if self.sword_swinging or not self.sword_swinging:
-                glColor3f(0.9, 0.9, 0.9)
-                glBegin(GL_QUADS)
-                glVertex3f(10 if self.facing_right else -10, -3, -2)
-                glVertex3f(30 if self.facing_right else -30, -3, -2)
-                glVertex3f(30 if self.facing_right else -30, 3, -2)
-                glVertex3f(10 if self.facing_right else -10, 3, -2)
-                glVertex3f(10 if self.facing_right else -10, -3, 2)
-                glVertex3f(30 if self.facing_right else -30, -3, 2)
-                glVertex3f(30 if self.facing_right else -30, 3, 2)
-                glVertex3f(10 if self.facing_right else -10, 3, 2)
-                glEnd()
-                
-                # Sword tip
-                glColor3f(0.8, 0.8, 0.8)
-                glBegin(GL_TRIANGLES)
-                glVertex3f(30 if self.facing_right else -30, -3, -2)
-                glVertex3f(40 if self.facing_right else -40, 0, -2)
-                glVertex3f(30 if self.facing_right else -30, 3, -2)
-                glVertex3f(30 if self.facing_right else -30, -3, 2)
-                glVertex3f(40 if self.facing_right else -40, 0, 2)
-                glVertex3f(30 if self.facing_right else -30, 3, 2)
-                glEnd()
+            geometry.draw(("sword", self.facing_right), draw_sword_mesh, self.facing_right)
             glPopMatrix()
         elif self.weapon == GUN:
             glPushMatrix()
             glTranslatef(PLAYER_SIZE/2 if self.facing_right else -PLAYER_SIZE/2, -PLAYER_SIZE/4, 0)
             
-            # Gun body
-            glColor3f(0.4, 0.4, 0.4)
-            glBegin(GL_QUADS)
-            # Main body
-            glVertex3f(0, -6, -4)
-            glVertex3f(20 if self.facing_right else -20, -6, -4)
-            glVertex3f(20 if self.facing_right else -20, 6, -4)
-            glVertex3f(0, 6, -4)
-            glVertex3f(0, -6, 4)
-            glVertex3f(20 if self.facing_right else -20, -6, 4)
-            glVertex3f(20 if self.facing_right else -20, 6, 4)
-            glVertex3f(0, 6, 4)
-            
-            # Barrel
-            glVertex3f(20 if self.facing_right else -20, -4, -3)
-            glVertex3f(30 if self.facing_right else -30, -4, -3)
-            glVertex3f(30 if self.facing_right else -30, 4, -3)
-            glVertex3f(20 if self.facing_right else -20, 4, -3)
-            glVertex3f(20 if self.facing_right else -20, -4, 3)
-            glVertex3f(30 if self.facing_right else -30, -4, 3)
-            glVertex3f(30 if self.facing_right else -30, 4, 3)
-            glVertex3f(20 if self.facing_right else -20, 4, 3)
-            
-            # Grip
-            glVertex3f(5 if self.facing_right else -5, -6, -6)
-            glVertex3f(15 if self.facing_right else -15, -6, -6)
-            glVertex3f(15 if self.facing_right else -15, -2, -6)
-            glVertex3f(5 if self.facing_right else -5, -2, -6)
-            glVertex3f(5 if self.facing_right else -5, -6, 6)
-            glVertex3f(15 if self.facing_right else -15, -6, 6)
-            glVertex3f(15 if self.facing_right else -15, -2, 6)
-            glVertex3f(5 if self.facing_right else -5, -2, 6)
-            glEnd()
-            
-            # Gun details
-            glColor3f(0.2, 0.2, 0.2)
-            glBegin(GL_LINES)
-            # Sights
-            glVertex3f(25 if self.facing_right else -25, 5, 0)
-            glVertex3f(25 if self.facing_right else -25, 7, 0)
-            glVertex3f(0, 5, 0)
-            glVertex3f(0, 7, 0)
-            glEnd()
+            geometry.draw(("gun", self.facing_right), draw_gun_mesh, self.facing_right)
             glPopMatrix()
         elif self.weapon == GRENADE:
             glPushMatrix()
             glTranslatef(PLAYER_SIZE/2 if self.facing_right else -PLAYER_SIZE/2, -PLAYER_SIZE/4, 0)
             glColor3f(0.9, 0.2, 0.2)
-            glutSolidSphere(PLAYER_SIZE/4, 10, 10)
+            lod.solid_sphere(PLAYER_SIZE/4, self.x, self.y + PLAYER_SIZE/2, self.z)
             glPopMatrix()
         
         glPopMatrix()
 
 class Enemy:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "prev_x", "prev_y", "z", "vx", "vy", "health", "size", "color",
+                 "attack_cooldown", "on_ground", "wing_phase", "body_angle", "eye_offset",
+                 "net_id", "speed")
+    bound_scale = 1.3  # wings reach about 1.25 * size from the centre
+    
+    def __init__(self, x, y, rng=random):
         self.x = x
         self.y = y
-        self.z = random.uniform(-20, 20)
-        self.vx = random.choice([-1, 1]) * ENEMY_SPEED
+        self.prev_x = x  # position before the last step, for interpolation
+        self.prev_y = y
+        self.z = rng.uniform(-20, 20)
+        self.vx = rng.choice([-1, 1]) * ENEMY_SPEED
         self.vy = 0
         self.health = 1
-        self.size = 25
+        self.size = ENEMY_SIZE
         self.color = (0.8, 0.8, 0.2)
         self.attack_cooldown = 0
         self.on_ground = False
-        self.wing_phase = random.uniform(0, 2*math.pi)
+        self.wing_phase = rng.uniform(0, 2*math.pi)
         self.body_angle = 0
-        self.eye_offset = random.uniform(0, 2*math.pi)
+        self.eye_offset = rng.uniform(0, 2*math.pi)
+        self.speed = ENEMY_SPEED * (0.8 + 0.4 * rng.random())
     
-    def update(self, dt, platforms, player):
+    def update(self, dt, ground, player, rng=random, flow=None):
         dx = player.x - self.x
         dy = player.y - self.y
         distance = math.sqrt(dx*dx + dy*dy)
@@ -282,11 +481,18 @@ class Enemy:
             dx /= distance
             dy /= distance
         
-        self.vx = dx * ENEMY_SPEED * (0.8 + 0.4 * random.random())
+        # Follow the flow field around platforms; straight at the player
+        # where it gives no direction
+        if flow is not None:
+            fx, fy = flow.direction(self.x, self.y)
+            if fx or fy:
+                dx, dy = fx, fy
+        
+        self.vx = dx * self.speed
         self.vy = dy * ENEMY_SPEED * 0.5
         self.vy -= GRAVITY * 0.5
         
-        if distance < 200 and self.on_ground and random.random() < ENEMY_JUMP_CHANCE:
+        if distance < 200 and self.on_ground and rng.random() < ENEMY_JUMP_CHANCE:
             self.vy = JUMP_FORCE * 0.7
             self.on_ground = False
         
@@ -305,15 +511,11 @@ class Enemy:
             self.y = ARENA_HEIGHT/2 - 50
         
         self.on_ground = False
-        for platform in platforms:
-            if (self.x + self.size/2 > platform.x - platform.width/2 and 
-                self.x - self.size/2 < platform.x + platform.width/2):
-                if (self.y - self.size/2 <= platform.y + PLATFORM_HEIGHT/2 and 
-                    self.y - self.size/2 >= platform.y - PLATFORM_HEIGHT/2 and 
-                    self.vy < 0):
-                    self.y = platform.y + PLATFORM_HEIGHT/2 + self.size/2
-                    self.vy = 0
-                    self.on_ground = True
+        landed = ground.land(self.x, self.y, self.vy, self.size/2)
+        if landed >= 0:
+            self.y = ground.tops[landed] + self.size/2
+            self.vy = 0
+            self.on_ground = True
         
         if distance < self.size + PLAYER_SIZE:
             if self.attack_cooldown <= 0:
@@ -332,7 +534,7 @@ class Enemy:
         # Body
         glColor3f(*self.color)
         glRotatef(self.body_angle, 0, 1, 0)
-        glutSolidSphere(self.size/2, 10, 10)
+        lod.solid_sphere(self.size/2, self.x, self.y, self.z)
         
         # Eyes
         glColor3f(0, 0, 0)
@@ -340,12 +542,12 @@ class Enemy:
         eye_z = self.size/4 * math.sin(self.eye_offset)
         glPushMatrix()
         glTranslatef(eye_x, 0, eye_z + self.size/4)
-        glutSolidSphere(self.size/8, 8, 8)
+        lod.solid_sphere(self.size/8, self.x, self.y, self.z)
         glPopMatrix()
         
         glPushMatrix()
         glTranslatef(-eye_x, 0, eye_z + self.size/4)
-        glutSolidSphere(self.size/8, 8, 8)
+        lod.solid_sphere(self.size/8, self.x, self.y, self.z)
         glPopMatrix()
         
         # Wings
@@ -378,59 +580,33 @@ class Platform:
         self.z = 0
         self.width = width
     
+    def bound_radius(self):
+        return math.sqrt((self.width/2)**2 + (PLATFORM_HEIGHT/2)**2 + (PLATFORM_DEPTH/2)**2)
+    
     def draw(self):
         glPushMatrix()
         glTranslatef(self.x, self.y, self.z)
         
-        glColor3f(0.3, 0.6, 0.3)
-        glBegin(GL_QUADS)
-        # Top
-        glVertex3f(-self.width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glVertex3f(-self.width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        # Bottom
-        glVertex3f(-self.width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glVertex3f(-self.width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        # Front
-        glVertex3f(-self.width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glVertex3f(-self.width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        # Back
-        glVertex3f(-self.width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(-self.width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        # Left
-        glVertex3f(-self.width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(-self.width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(-self.width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glVertex3f(-self.width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        # Right
-        glVertex3f(self.width/2, -PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, PLATFORM_HEIGHT/2, -PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glVertex3f(self.width/2, -PLATFORM_HEIGHT/2, PLATFORM_DEPTH/2)
-        glEnd()
+        # Mesh is cached per width; see GeometryCache.invalidate
+        geometry.draw(("platform", self.width), draw_platform_mesh, self.width)
         
         glPopMatrix()
 
 class Weapon:
-    def __init__(self, x, y):
+    bound_radius = 30  # before the pulse scale
+    
+    def __init__(self, x, y, spawn_time, rng=random):
         self.x = x
         self.y = y
-        self.z = random.uniform(-5, 5)
-        self.type = random.choice([SWORD, GUN, GRENADE])
-        self.spawn_time = time.time()
+        self.z = rng.uniform(-5, 5)
+        self.type = rng.choice([SWORD, GUN, GRENADE])
+        self.spawn_time = spawn_time
         self.pulse = 0
         self.growing = True
         self.rotation = 0
     
-    def is_active(self):
-        return time.time() - self.spawn_time < WEAPON_LIFETIME
+    def is_active(self, now):
+        return now - self.spawn_time < WEAPON_LIFETIME
     
     def update(self, dt):
         if self.growing:
@@ -449,92 +625,19 @@ class Weapon:
         glScalef(1 + self.pulse, 1 + self.pulse, 1 + self.pulse)
         glRotatef(self.rotation, 0, 1, 0)
         
-        if self.type == SWORD:
-            #blade
-            glColor3f(0.9, 0.9, 0.1)
-            glRotatef(45, 0, 0, 1)
-            glBegin(GL_QUADS)
-            glVertex3f(-20, -5, -2)
-            glVertex3f(20, -5, -2)
-            glVertex3f(20, 5, -2)
-            glVertex3f(-20, 5, -2)
-            glVertex3f(-20, -5, 2)
-            glVertex3f(20, -5, 2)
-            glVertex3f(20, 5, 2)
-            glVertex3f(-20, 5, 2)
-            glEnd()
-            #tip
-            glColor3f(0.5, 0.3, 0.1)
-            glBegin(GL_QUADS)
-            glVertex3f(-10, -7, -3)
-            glVertex3f(-5, -7, -3)
-            glVertex3f(-5, 7, -3)
-            glVertex3f(-10, 7, -3)
-            glVertex3f(-10, -7, 3)
-            glVertex3f(-5, -7, 3)
-            glVertex3f(-5, 7, 3)
-            glVertex3f(-10, 7, 3)
-            glEnd()
-        elif self.type == GUN:
-            glColor3f(0.4, 0.4, 0.4)
-            glBegin(GL_QUADS)
-            # Main body
-            glVertex3f(-15, -8, -5)
-            glVertex3f(15, -8, -5)
-            glVertex3f(15, 8, -5)
-            glVertex3f(-15, 8, -5)
-            glVertex3f(-15, -8, 5)
-            glVertex3f(15, -8, 5)
-            glVertex3f(15, 8, 5)
-            glVertex3f(-15, 8, 5)
-            
-            # Barrel
-            glVertex3f(15, -4, -3)
-            glVertex3f(25, -4, -3)
-            glVertex3f(25, 4, -3)
-            glVertex3f(15, 4, -3)
-            glVertex3f(15, -4, 3)
-            glVertex3f(25, -4, 3)
-            glVertex3f(25, 4, 3)
-            glVertex3f(15, 4, 3)
-            
-            # Grip
-            glVertex3f(-5, -8, -7)
-            glVertex3f(5, -8, -7)
-            glVertex3f(5, -4, -7)
-            glVertex3f(-5, -4, -7)
-            glVertex3f(-5, -8, 7)
-            glVertex3f(5, -8, 7)
-            glVertex3f(5, -4, 7)
-            glVertex3f(-5, -4, 7)
-            glEnd()
-            
-            # Details
-            glColor3f(0.2, 0.2, 0.2)
-            glBegin(GL_LINES)
-            # Sights
-            glVertex3f(20, 6, 0)
-            glVertex3f(20, 8, 0)
-            glVertex3f(-5, 6, 0)
-            glVertex3f(-5, 8, 0)
-            glEnd()
-            
-        elif self.type == GRENADE:
-            glColor3f(0.9, 0.2, 0.2)
-            glutSolidSphere(12, 10, 10)
-            
-            glColor3f(0.8, 0.8, 0.8)
-            glBegin(GL_LINES)
-            glVertex3f(12, 5, 0)
-            glVertex3f(18, 8, 0)
-            glEnd()
+        geometry.draw(("pickup", self.type), draw_pickup_mesh, self.type)
         
         glPopMatrix()
 
 class Bullet:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "z", "vx", "owner_id", "lifetime", "net_id")
+    bound_radius = 15  # sphere plus tail
+    
     def __init__(self, x, y, direction, owner_id):
         self.x = x
         self.y = y
+        self.prev_x = x  # position before the last step, for interpolation
+        self.prev_y = y
         self.z = 0
         self.vx = direction * BULLET_SPEED
         self.owner_id = owner_id
@@ -549,7 +652,7 @@ class Bullet:
         glPushMatrix()
         glTranslatef(self.x, self.y, self.z)
         glColor3f(1.0, 1.0, 0.0)
-        glutSolidSphere(5, 10, 10)
+        lod.solid_sphere(5, self.x, self.y, self.z)
         #tail
         glBegin(GL_LINES)
         glVertex3f(-10 if self.vx > 0 else 10, 0, 0)
@@ -559,9 +662,15 @@ class Bullet:
         glPopMatrix()
 
 class Grenade:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "z", "vx", "vy", "owner_id", "timer",
+                 "exploded", "rotation", "net_id")
+    bound_radius = 12  # sphere plus spark
+    
     def __init__(self, x, y, direction, owner_id):
         self.x = x
         self.y = y
+        self.prev_x = x  # position before the last step, for interpolation
+        self.prev_y = y
         self.z = 0
         self.vx = direction * GRENADE_SPEED
         self.vy = 15
@@ -570,7 +679,7 @@ class Grenade:
         self.exploded = False
         self.rotation = 0
     
-    def update(self, dt, platforms):
+    def update(self, dt, ground):
         if self.exploded:
             return False
         
@@ -585,15 +694,11 @@ class Grenade:
         self.x += self.vx * dt
         self.y += self.vy * dt
         
-        for platform in platforms:
-            if (self.x > platform.x - platform.width/2 and 
-                self.x < platform.x + platform.width/2 and
-                self.y - 8 <= platform.y + PLATFORM_HEIGHT/2 and 
-                self.y - 8 >= platform.y - PLATFORM_HEIGHT/2 and 
-                self.vy < 0):
-                self.y = platform.y + PLATFORM_HEIGHT/2 + 8
-                self.vy *= -0.6
-                self.vx *= 0.8
+        landed = ground.land(self.x, self.y, self.vy, 8)
+        if landed >= 0:
+            self.y = ground.tops[landed] + 8
+            self.vy *= -0.6
+            self.vx *= 0.8
         
         return -ARENA_WIDTH/2 < self.x < ARENA_WIDTH/2
     
@@ -603,7 +708,7 @@ class Grenade:
         glRotatef(self.rotation, 0, 0, 1)
         glColor3f(0.9, 0.2, 0.2)
         
-        glutSolidSphere(8, 10, 10)
+        lod.solid_sphere(8, self.x, self.y, self.z)
         
         glColor3f(0.7, 0.1, 0.1)
         #decorative lines
@@ -617,12 +722,15 @@ class Grenade:
             glColor3f(1.0, 0.5, 0.0)
             glBegin(GL_LINES)
             glVertex3f(0, 8, 0)
-            glVertex3f(random.uniform(-5, 5), random.uniform(8, 12), 0)
+            sparks = effects.stream("sparks")
+            glVertex3f(sparks.uniform(-5, 5), sparks.uniform(8, 12), 0)
             glEnd()
         
         glPopMatrix()
 
 class Explosion:
+    __slots__ = ("x", "y", "z", "radius", "max_radius", "growth_rate", "active", "net_id")
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -646,26 +754,414 @@ class Explosion:
         glColor4f(1.0, 0.5, 0.0, 0.7 * (1.0 - self.radius/self.max_radius))
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glutSolidSphere(self.radius, 20, 20)
+        lod.solid_sphere(self.radius, self.x, self.y, self.z)
         
         # Inner core
         glColor4f(1.0, 0.8, 0.0, 0.5 * (1.0 - self.radius/self.max_radius))
-        glutSolidSphere(self.radius * 0.7, 20, 20)
+        lod.solid_sphere(self.radius * 0.7, self.x, self.y, self.z)
         
         # Bright center
         glColor4f(1.0, 1.0, 0.0, 0.3 * (1.0 - self.radius/self.max_radius))
-        glutSolidSphere(self.radius * 0.4, 20, 20)
+        lod.solid_sphere(self.radius * 0.4, self.x, self.y, self.z)
         
         # Shockwave ring
         if self.radius > self.max_radius * 0.7:
             glColor4f(1.0, 1.0, 1.0, 0.2 * (1.0 - self.radius/self.max_radius))
-            glutWireSphere(self.radius * 1.1, 16, 16)
+            lod.wire_sphere(self.radius * 1.1, self.x, self.y, self.z)
         
         glDisable(GL_BLEND)
         glPopMatrix()
 
+class EnemyStore(ArrayStore):
+    fields = (
+        ("x", float), ("y", float), ("z", float), ("vx", float), ("vy", float),
+        ("prev_x", float), ("prev_y", float), ("size", float),
+        ("attack_cooldown", float), ("on_ground", bool),
+        ("wing_phase", float), ("body_angle", float), ("eye_offset", float),
+        ("alive", bool), ("speed", float),
+    )
+    view_cls = view_class(Enemy, fields, color=(0.8, 0.8, 0.2), health=1)
+    
+    def spawn(self, x, y):
+        return self.add(
+            x=x, y=y, prev_x=x, prev_y=y, z=self.rng.uniform(-20, 20),
+            vx=self.rng.choice([-1, 1]) * ENEMY_SPEED,
+            size=ENEMY_SIZE, alive=True,
+            wing_phase=self.rng.uniform(0, 2*math.pi),
+            eye_offset=self.rng.uniform(0, 2*math.pi),
+            speed=ENEMY_SPEED * (0.8 + 0.4 * self.rng.random()),
+        )
+    
+    def update(self, dt, ground, player, flow=None):
+        # Enemy.update for every row at once
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+        size = self.size[:n]
+        on_ground = self.on_ground[:n]
+        cooldown = self.attack_cooldown[:n]
+        
+        dx = player.x - x
+        dy = player.y - y
+        distance = np.sqrt(dx*dx + dy*dy)
+        moving = distance > 0
+        dx[moving] /= distance[moving]
+        dy[moving] /= distance[moving]
+        
+        if flow is not None:
+            fx, fy = flow.direction_batch(x, y)
+            steer = (fx != 0) | (fy != 0)
+            dx = np.where(steer, fx, dx)
+            dy = np.where(steer, fy, dy)
+        
+        vx[:] = dx * self.speed[:n]
+        vy[:] = dy * ENEMY_SPEED * 0.5 - GRAVITY * 0.5
+        
+        jump = (distance < 200) & on_ground & (self.rng.random(n) < ENEMY_JUMP_CHANCE)
+        vy[jump] = JUMP_FORCE * 0.7
+        
+        x += vx * dt
+        y += vy * dt
+        self.body_angle[:n] += dt * 30
+        np.clip(x, -ARENA_WIDTH/2, ARENA_WIDTH/2, out=x)
+        np.clip(y, -ARENA_HEIGHT/2 + 50, ARENA_HEIGHT/2 - 50, out=y)
+        
+        landed = ground.land_batch(x, y, vy, size/2)
+        land = landed >= 0
+        y[land] = ground.top_array[landed[land]] + size[land]/2
+        vy[land] = 0
+        on_ground[:] = land
+        
+        near = distance < size + PLAYER_SIZE
+        attack = near & (cooldown <= 0)
+        cooldown[near & ~attack] -= dt
+        cooldown[attack] = 1.0
+        for _ in range(int(np.count_nonzero(attack))):
+            player.take_damage(ENEMY_DAMAGE)
+        
+        self.wing_phase[:n] += dt * 10
+        self.eye_offset[:n] += dt * 2
+
+class BulletStore(ArrayStore):
+    fields = (
+        ("x", float), ("y", float), ("z", float), ("vx", float),
+        ("prev_x", float), ("prev_y", float),
+        ("owner_id", int), ("lifetime", float), ("alive", bool),
+    )
+    view_cls = view_class(Bullet, fields)
+    
+    def spawn(self, x, y, direction, owner_id):
+        return self.add(x=x, y=y, prev_x=x, prev_y=y, vx=direction * BULLET_SPEED,
+                        owner_id=owner_id, lifetime=2.0, alive=True)
+    
+    def update(self, dt):
+        n = self.count
+        x = self.x[:n]
+        lifetime = self.lifetime[:n]
+        x += self.vx[:n] * dt
+        lifetime -= dt
+        self.alive[:n] = (lifetime > 0) & (x > -ARENA_WIDTH/2) & (x < ARENA_WIDTH/2)
+
+class GrenadeStore(ArrayStore):
+    fields = (
+        ("x", float), ("y", float), ("z", float), ("vx", float), ("vy", float),
+        ("prev_x", float), ("prev_y", float),
+        ("owner_id", int), ("timer", float), ("exploded", bool),
+        ("rotation", float), ("alive", bool),
+    )
+    view_cls = view_class(Grenade, fields)
+    
+    def spawn(self, x, y, direction, owner_id):
+        return self.add(x=x, y=y, prev_x=x, prev_y=y, vx=direction * GRENADE_SPEED, vy=15,
+                        owner_id=owner_id, timer=2.0, alive=True)
+    
+    def update(self, dt, ground):
+        # alive mirrors Grenade.update's return value: False once exploded,
+        # True on the tick it explodes, otherwise whether it is in the arena
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+        exploded = self.exploded[:n]
+        timer = self.timer[:n]
+        alive = self.alive[:n]
+        
+        live = ~exploded
+        alive[exploded] = False
+        timer[live] -= dt
+        self.rotation[:n][live] += dt * 360
+        
+        boom = live & (timer <= 0)
+        exploded[boom] = True
+        alive[boom] = True
+        
+        flying = live & ~boom
+        vy[flying] -= GRAVITY * 2
+        x[flying] += vx[flying] * dt
+        y[flying] += vy[flying] * dt
+        
+        rows = np.flatnonzero(flying)
+        landed = ground.land_batch(x[rows], y[rows], vy[rows], 8)
+        bounce = rows[landed >= 0]
+        y[bounce] = ground.top_array[landed[landed >= 0]] + 8
+        vy[bounce] *= -0.6
+        vx[bounce] *= 0.8
+        
+        alive[flying] = (x[flying] > -ARENA_WIDTH/2) & (x[flying] < ARENA_WIDTH/2)
+
+def save_positions(entities, store):
+    # Remembers where entities are before a step so draw can interpolate
+    if store is not None:
+        n = store.count
+        store.prev_x[:n] = store.x[:n]
+        store.prev_y[:n] = store.y[:n]
+        return
+    for e in entities:
+        e.prev_x = e.x
+        e.prev_y = e.y
+
+def blend_positions(entities, store, alpha):
+    # Moves entities to prev + (current - prev) * alpha for drawing and
+    # returns what restore_positions needs to put them back
+    if store is not None:
+        n = store.count
+        saved = (store.x[:n].copy(), store.y[:n].copy())
+        store.x[:n] = store.prev_x[:n] + (saved[0] - store.prev_x[:n]) * alpha
+        store.y[:n] = store.prev_y[:n] + (saved[1] - store.prev_y[:n]) * alpha
+        return saved
+    saved = [(e.x, e.y) for e in entities]
+    for e in entities:
+        e.x = e.prev_x + (e.x - e.prev_x) * alpha
+        e.y = e.prev_y + (e.y - e.prev_y) * alpha
+    return saved
+
+def restore_positions(entities, store, saved):
+    if store is not None:
+        n = store.count
+        store.x[:n], store.y[:n] = saved
+        return
+    for e, (x, y) in zip(entities, saved):
+        e.x = x
+        e.y = y
+
+def entity_columns(entities, store, names):
+    # Per-field arrays for a list of entities, read straight from the NumPy
+    # store when the list is backed by one (its rows match the list order)
+    if store is not None:
+        return [getattr(store, name)[:store.count] for name in names]
+    table = np.array([[getattr(e, name) for name in names] for e in entities], dtype=float)
+    return list(table.reshape(len(entities), len(names)).T)
+
+def checkpoint_columns(kind, entities, store):
+    # Checkpoint sections for one entity kind. A NumPy store's columns are
+    # written as they are; fields it doesn't keep (net_id) come from the views.
+    sections = []
+    for name, code in KINDS[kind]:
+        column = getattr(store, name, None) if store is not None else None
+        if column is not None:
+            values = column[:store.count]
+        else:
+            values = array(code, [getattr(e, name) for e in entities])
+        sections.append((f"{kind}.{name}", code, values))
+    return sections
+
+def restore_entities(kind, checkpoint, make):
+    # One entity kind read back from a checkpoint. make(row) returns an
+    # entity for a row ({field: value}); every saved field is then set on it.
+    fields = KINDS[kind]
+    columns = [checkpoint.column(f"{kind}.{name}").tolist() for name, _ in fields]
+    entities = []
+    for values in zip(*columns):
+        row = {name: bool(value) if code == "B" else value for (name, code), value in zip(fields, values)}
+        entity = make(row)
+        for name, value in row.items():
+            setattr(entity, name, value)
+        entities.append(entity)
+    return entities
+
+def restore_bulk(kind, checkpoint, make, **unsaved):
+    # restore_entities for the kinds there can be many thousands of:
+    # make(n) returns n entities whose fields are all about to be set
+    # (reused or made without __init__, e.g. by Pool.take), and each
+    # column is set on all of them by one map() call, with no row dicts
+    # or Python code per entity. unsaved holds fields the checkpoint
+    # leaves out.
+    fields = KINDS[kind]
+    columns = [checkpoint.column(f"{kind}.{name}").tolist() for name, _ in fields]
+    entities = make(len(columns[0]))
+    for (name, code), values in zip(fields, columns):
+        if code == "B":
+            values = map(bool, values)
+        # deque(maxlen=0) runs the map without keeping the Nones it yields
+        deque(map(setattr, entities, repeat(name), values), maxlen=0)
+    for name, value in unsaved.items():
+        deque(map(setattr, entities, repeat(name), repeat(value)), maxlen=0)
+    return entities
+
+def reuse(entities, cls, n):
+    # n entities for restore_bulk: the list's own first, then new ones
+    # made without __init__
+    return entities[:n] + list(map(cls.__new__, repeat(cls, n - len(entities))))
+
+def restore_store(kind, checkpoint, store):
+    # restore_entities for a NumPy store: columns are copied in one go
+    columns = {name: checkpoint.array(f"{kind}.{name}") for name, _ in KINDS[kind]}
+    columns["alive"] = True
+    net_ids = columns.pop("net_id").tolist()
+    views = store.restore(len(net_ids), columns)
+    for view, net_id in zip(views, net_ids):
+        view.net_id = net_id
+    return views
+
+def rotate_y(angle, lx, ly, lz):
+    # glRotatef(angle, 0, 1, 0) applied to local offsets
+    c, s = np.cos(angle), np.sin(angle)
+    return lx*c + lz*s, ly, -lx*s + lz*c
+
+def draw_bullets_batched(bullets, store):
+    x, y, z, vx = entity_columns(bullets, store, ("x", "y", "z", "vx"))
+    keep = frustum.visible_batch(x, y, z, Bullet.bound_radius)
+    x, y, z, vx = x[keep], y[keep], z[keep], vx[keep]
+    if len(x) == 0:
+        return
+    batches.lod_spheres(pack_spheres(x, y, z, 5, (1.0, 1.0, 0.0, 1.0)), lod)
+    #tail
+    ends = np.empty((len(x), 2, 3))
+    ends[:, 0, 0] = x + np.where(vx > 0, -10, 10)
+    ends[:, 1, 0] = x
+    ends[:, :, 1] = y[:, None]
+    ends[:, :, 2] = z[:, None]
+    batches.lines(ends.reshape(-1, 3), (1.0, 1.0, 0.0, 1.0))
+
+def draw_grenades_batched(grenades, store):
+    x, y, z, rotation, timer = entity_columns(grenades, store, ("x", "y", "z", "rotation", "timer"))
+    keep = frustum.visible_batch(x, y, z, Grenade.bound_radius)
+    x, y, z, rotation, timer = x[keep], y[keep], z[keep], rotation[keep], timer[keep]
+    n = len(x)
+    if n == 0:
+        return
+    batches.lod_spheres(pack_spheres(x, y, z, 8, (0.9, 0.2, 0.2, 1.0)), lod)
+    
+    #decorative lines, rotated with the grenade about z
+    turn = np.radians(rotation)[:, None]
+    i = np.arange(5)[None, :]
+    seg = np.empty((n, 5, 2, 3))
+    for end, angle in enumerate((i * math.pi/2.5 + turn, (i + 0.5) * math.pi/2.5 + turn)):
+        seg[:, :, end, 0] = x[:, None] + 8 * np.cos(angle)
+        seg[:, :, end, 1] = y[:, None] + 8 * np.sin(angle)
+        seg[:, :, end, 2] = z[:, None]
+    batches.lines(seg.reshape(-1, 3), (0.7, 0.1, 0.1, 1.0))
+    
+    #spark effect
+    lit = timer < 0.5
+    m = int(np.count_nonzero(lit))
+    if m:
+        local = np.zeros((m, 2, 2))
+        local[:, 0, 1] = 8
+        sparks = effects.numpy("sparks")
+        local[:, 1, 0] = sparks.uniform(-5, 5, m)
+        local[:, 1, 1] = sparks.uniform(8, 12, m)
+        c = np.cos(turn[lit])
+        s = np.sin(turn[lit])
+        spark = np.empty((m, 2, 3))
+        spark[:, :, 0] = x[lit, None] + local[:, :, 0] * c - local[:, :, 1] * s
+        spark[:, :, 1] = y[lit, None] + local[:, :, 0] * s + local[:, :, 1] * c
+        spark[:, :, 2] = z[lit, None]
+        batches.lines(spark.reshape(-1, 3), (1.0, 0.5, 0.0, 1.0))
+
+def draw_explosions_batched(explosions):
+    x, y, z, radius, max_radius = entity_columns(explosions, None, ("x", "y", "z", "radius", "max_radius"))
+    keep = frustum.visible_batch(x, y, z, radius * 1.1)
+    x, y, z, radius, max_radius = x[keep], y[keep], z[keep], radius[keep], max_radius[keep]
+    n = len(x)
+    if n == 0:
+        return
+    fade = 1.0 - radius/max_radius
+    # Main sphere, inner core and bright center of each explosion, in order
+    shells = np.empty((n, 3, 8), dtype=np.float32)
+    shells[:, :, 0] = x[:, None]
+    shells[:, :, 1] = y[:, None]
+    shells[:, :, 2] = z[:, None]
+    shells[:, :, 3] = radius[:, None] * np.array([1.0, 0.7, 0.4])
+    shells[:, :, 4:7] = np.array([(1.0, 0.5, 0.0), (1.0, 0.8, 0.0), (1.0, 1.0, 0.0)])
+    shells[:, :, 7] = fade[:, None] * np.array([0.7, 0.5, 0.3])
+    
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    batches.lod_spheres(shells.reshape(-1, 8), lod)
+    
+    # Shockwave ring
+    ring = radius > max_radius * 0.7
+    if ring.any():
+        colors = np.empty((int(np.count_nonzero(ring)), 4))
+        colors[:, 0:3] = 1.0
+        colors[:, 3] = 0.2 * fade[ring]
+        batches.lod_spheres(pack_spheres(x[ring], y[ring], z[ring], radius[ring] * 1.1, colors),
+                            lod, wire=True)
+    glDisable(GL_BLEND)
+
+def draw_enemies_batched(enemies, store):
+    x, y, z, size, body_angle, eye_offset, wing_phase = entity_columns(
+        enemies, store, ("x", "y", "z", "size", "body_angle", "eye_offset", "wing_phase"))
+    keep = frustum.visible_batch(x, y, z, size * Enemy.bound_scale)
+    x, y, z, size, body_angle, eye_offset, wing_phase = (
+        column[keep] for column in (x, y, z, size, body_angle, eye_offset, wing_phase))
+    n = len(x)
+    if n == 0:
+        return
+    # Body
+    batches.lod_spheres(pack_spheres(x, y, z, size/2, (0.8, 0.8, 0.2, 1.0)), lod)
+    
+    # Eyes, placed in the body's rotated frame
+    angle = np.radians(body_angle)
+    eye_x = size/4 * np.cos(eye_offset)
+    eye_z = size/4 * np.sin(eye_offset) + size/4
+    eyes = np.empty((n, 2, 8), dtype=np.float32)
+    for k, side in enumerate((eye_x, -eye_x)):
+        dx, dy, dz = rotate_y(angle, side, 0, eye_z)
+        eyes[:, k, 0] = x + dx
+        eyes[:, k, 1] = y + dy
+        eyes[:, k, 2] = z + dz
+    eyes[:, :, 3] = (size/8)[:, None]
+    eyes[:, :, 4:8] = (0.0, 0.0, 0.0, 1.0)
+    batches.lod_spheres(eyes.reshape(-1, 8), lod)
+    
+    # Wings
+    wing_offset = np.sin(wing_phase) * 5
+    local = np.zeros((n, 6, 3))
+    for k, side in enumerate((-1, 1)):
+        local[:, 3*k + 1, 0] = side * size
+        local[:, 3*k + 1, 1] = size/2 + wing_offset
+        local[:, 3*k + 2, 0] = side * size
+        local[:, 3*k + 2, 1] = -size/2 + wing_offset
+        local[:, 3*k + 1:3*k + 3, 2] = 5
+    dx, dy, dz = rotate_y(angle[:, None], local[:, :, 0], local[:, :, 1], local[:, :, 2])
+    wings = np.stack([x[:, None] + dx, y[:, None] + dy, z[:, None] + dz], axis=-1)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    batches.triangles(wings.reshape(-1, 3), (0.8, 0.8, 1.0, 0.6))
+    glDisable(GL_BLEND)
+
+class SimClock:
+    # Manually advanced clock so the game can be stepped without a window
+    def __init__(self, start=0.0):
+        self.now = start
+    
+    def advance(self, dt):
+        self.now += dt
+    
+    def __call__(self):
+        return self.now
+
 class Game:
-    def __init__(self):
+    def __init__(self, clock=None, backend="objects", seed=None):
+        # backend="numpy" keeps enemies, bullets and grenades in NumPy arrays.
+        # Gameplay reads time from clock (a SimClock unless one is given) and
+        # draws random numbers from streams derived from seed.
+        self.clock = clock if clock is not None else SimClock()
+        self.backend = backend
+        self.rng = RandomStreams(seed)
         self.game_state = MENU
         self.score = [0, 0]
         self.game_time = 0
@@ -680,9 +1176,42 @@ class Game:
         self.explosions = []
         self.camera_x = 0
         self.camera_y = 0
+        self.prev_camera_x = 0
+        self.prev_camera_y = 0
+        self.enemy_grid = SpatialHash(cell_size=64)
+        # Projectiles and effects are recycled across ticks and rounds; with
+        # the numpy backend the stores play that role for bullets and grenades
+        self.bullet_pool = Pool(Bullet)
+        self.grenade_pool = Pool(Grenade)
+        self.explosion_pool = Pool(Explosion)
+        self.enemy_store = self.bullet_store = self.grenade_store = None
+        self.next_net_id = 0
+        self.commands = [PlayerCommand(), PlayerCommand()]
+        # HUD lines are only re-formatted when the numbers in them change
+        self.hud_score = CachedLine(lambda score: f"Score: {score}")
+        self.hud_time = CachedLine(lambda seconds: f"Time: {seconds}s")
+        self.hud_weapon = [CachedLine(weapon_line) for _ in range(2)]
+        self.hud_health = [CachedLine(lambda health: f"Health: {health}%") for _ in range(2)]
         self.setup_arena()
     
     def setup_arena(self):
+        # Buttons held or pressed on the menu or in the last match don't
+        # carry into this one
+        for command in self.commands:
+            command.clear()
+        self.explosion_pool.release_all(self.explosions)
+        if self.backend == "numpy":
+            if self.enemy_store is None:
+                self.enemy_store = EnemyStore(rng=self.rng.numpy("enemies"))
+                self.bullet_store = BulletStore()
+                self.grenade_store = GrenadeStore()
+            else:
+                self.enemy_store.clear()
+                self.bullet_store.clear()
+                self.grenade_store.clear()
+        else:
+            self.bullet_pool.release_all(self.bullets)
+            self.grenade_pool.release_all(self.grenades)
         self.players = []
         self.enemies = []
         self.platforms = []
@@ -702,6 +1231,7 @@ class Game:
         
         for x, y in platform_positions:
             self.platforms.append(Platform(x, y, 200))
+        self.build_platform_tables()
         
         self.players = [
             Player(-200, -ARENA_HEIGHT/2 + 100, 1)
@@ -710,94 +1240,212 @@ class Game:
         if self.game_state == MULTI_PLAYER:
             self.players.append(Player(200, -ARENA_HEIGHT/2 + 100, 2))
     
+    def build_platform_tables(self):
+        # Must be called again whenever self.platforms changes
+        self.player_ground = PlatformTable(self.platforms, PLAYER_SIZE/2, PLATFORM_HEIGHT)
+        self.enemy_ground = PlatformTable(self.platforms, ENEMY_SIZE/2, PLATFORM_HEIGHT)
+        self.grenade_ground = PlatformTable(self.platforms, 0, PLATFORM_HEIGHT)
+        self.enemy_flow = FlowField(-ARENA_WIDTH/2, -ARENA_HEIGHT/2, ARENA_WIDTH, ARENA_HEIGHT, FLOW_CELL_SIZE)
+        self.enemy_flow.block_platforms(self.platforms, ENEMY_SIZE/2, PLATFORM_HEIGHT)
+    
     def spawn_weapon(self):
-        if time.time() - self.last_weapon_spawn > 5 and len(self.weapons) < 3:
-            x = random.uniform(-ARENA_WIDTH/2 + 50, ARENA_WIDTH/2 - 50)
-            y = random.uniform(-ARENA_HEIGHT/2 + 100, ARENA_HEIGHT/2 - 100)
-            self.weapons.append(Weapon(x, y))
-            self.last_weapon_spawn = time.time()
+        now = self.clock()
+        if now - self.last_weapon_spawn > 5 and len(self.weapons) < 3:
+            rng = self.rng.stream("weapons")
+            x = rng.uniform(-ARENA_WIDTH/2 + 50, ARENA_WIDTH/2 - 50)
+            y = rng.uniform(-ARENA_HEIGHT/2 + 100, ARENA_HEIGHT/2 - 100)
+            weapon = Weapon(x, y, now, rng)
+            weapon.net_id = self.new_net_id()
+            self.weapons.append(weapon)
+            self.last_weapon_spawn = now
     
     def spawn_enemy(self):
-        if self.game_state == SINGLE_PLAYER and time.time() - self.last_enemy_spawn > ENEMY_SPAWN_RATE:
-            side = random.choice(['top', 'bottom', 'left', 'right'])
+        if self.game_state == SINGLE_PLAYER and self.clock() - self.last_enemy_spawn > ENEMY_SPAWN_RATE:
+            rng = self.rng.stream("spawn")
+            side = rng.choice(['top', 'bottom', 'left', 'right'])
             if side == 'left':
                 x = -ARENA_WIDTH/2 - 50
-                y = random.uniform(-ARENA_HEIGHT/2 + 100, ARENA_HEIGHT/2 - 100)
+                y = rng.uniform(-ARENA_HEIGHT/2 + 100, ARENA_HEIGHT/2 - 100)
             elif side == 'right':
                 x = ARENA_WIDTH/2 + 50
-                y = random.uniform(-ARENA_HEIGHT/2 + 100, ARENA_HEIGHT/2 - 100)
+                y = rng.uniform(-ARENA_HEIGHT/2 + 100, ARENA_HEIGHT/2 - 100)
             elif side == 'top':
-                x = random.uniform(-ARENA_WIDTH/2 + 50, ARENA_WIDTH/2 - 50)
+                x = rng.uniform(-ARENA_WIDTH/2 + 50, ARENA_WIDTH/2 - 50)
                 y = ARENA_HEIGHT/2 + 50
             else:
-                x = random.uniform(-ARENA_WIDTH/2 + 50, ARENA_WIDTH/2 - 50)
+                x = rng.uniform(-ARENA_WIDTH/2 + 50, ARENA_WIDTH/2 - 50)
                 y = -ARENA_HEIGHT/2 - 50
                 
-            self.enemies.append(Enemy(x, y))
-            self.last_enemy_spawn = time.time()
+            self.add_enemy(x, y)
+            self.last_enemy_spawn = self.clock()
+    
+    def add_enemy(self, x, y):
+        if self.enemy_store is not None:
+            enemy = self.enemy_store.spawn(x, y)
+        else:
+            enemy = Enemy(x, y, self.rng.stream("enemies"))
+        enemy.net_id = self.new_net_id()
+        self.enemies.append(enemy)
+        return enemy
+    
+    def add_bullet(self, x, y, direction, owner_id):
+        if self.bullet_store is not None:
+            bullet = self.bullet_store.spawn(x, y, direction, owner_id)
+        else:
+            bullet = self.bullet_pool.acquire(x, y, direction, owner_id)
+        bullet.net_id = self.new_net_id()
+        self.bullets.append(bullet)
+        return bullet
+    
+    def add_grenade(self, x, y, direction, owner_id):
+        if self.grenade_store is not None:
+            grenade = self.grenade_store.spawn(x, y, direction, owner_id)
+        else:
+            grenade = self.grenade_pool.acquire(x, y, direction, owner_id)
+        grenade.net_id = self.new_net_id()
+        self.grenades.append(grenade)
+        return grenade
+    
+    def player_attack(self, player):
+        # Swing, shoot or throw with whatever the player is holding
+        if player.weapon == SWORD and not player.sword_swinging:
+            player.sword_swinging = True
+            player.swing_angle = 0
+            player.swing_direction = 1
+        elif player.weapon == GUN and self.clock() - player.last_shot > player.shot_delay:
+            direction = 1 if player.facing_right else -1
+            self.add_bullet(
+                player.x + direction * PLAYER_SIZE/2,
+                player.y,
+                direction,
+                player.player_id
+            )
+            player.last_shot = self.clock()
+        elif player.weapon == GRENADE:
+            direction = 1 if player.facing_right else -1
+            self.add_grenade(
+                player.x + direction * PLAYER_SIZE/2,
+                player.y,
+                direction,
+                player.player_id
+            )
+            player.weapon = NO_WEAPON
+            player.weapon_time = 0
+    
+    def apply_commands(self):
+        # Start of a tick: each player acts on its command, then the
+        # command's presses are used up
+        if self.game_state in (SINGLE_PLAYER, MULTI_PLAYER):
+            for player, command in zip(self.players, self.commands):
+                steer_player(player, command.held, command.pressed)
+                if command.pressed & ATTACK:
+                    self.player_attack(player)
+        for command in self.commands:
+            command.consume()
+    
+    def new_net_id(self):
+        # Identifies an entity in network snapshots for as long as it lives
+        self.next_net_id += 1
+        return self.next_net_id
     
     def check_collisions(self):
-        for weapon in self.weapons[:]:
-            weapon.update(1/60.0)
-            if not weapon.is_active():
-                self.weapons.remove(weapon)
+        # Removals are collected in sets and applied once at the end of the
+        # tick; enemies are looked up through the spatial hash.
+        sections = profiler.sections("collisions")
+        now = self.clock()
+        enemies = self.enemies
+        grid = self.enemy_grid
+        if self.enemy_store is not None:
+            n = self.enemy_store.count
+            grid.build_xy(self.enemy_store.x[:n].tolist(), self.enemy_store.y[:n].tolist())
+            # Views report the results of these vectorized steps
+            self.bullet_store.update(FIXED_STEP)
+            self.grenade_store.update(FIXED_STEP, self.grenade_ground)
+        else:
+            grid.build(enemies)
+        dead_enemies = set()
+        dead_bullets = set()
+        dead_grenades = set()
+        dead_weapons = set()
+        sections.split("grid")
+        
+        for weapon in self.weapons:
+            weapon.update(FIXED_STEP)
+            if not weapon.is_active(now):
+                dead_weapons.add(weapon)
                 continue
                 
             for player in self.players:
-                dist = math.sqrt((player.x - weapon.x)**2 + (player.y - weapon.y)**2)
-                if dist < PLAYER_SIZE and player.weapon == NO_WEAPON:
+                dx = player.x - weapon.x
+                dy = player.y - weapon.y
+                if dx*dx + dy*dy < PLAYER_SIZE**2 and player.weapon == NO_WEAPON:
                     player.weapon = weapon.type
                     player.weapon_time = 0
-                    self.weapons.remove(weapon)
+                    dead_weapons.add(weapon)
                     break
+        sections.split("weapons")
         
         for player in self.players:
             if player.sword_swinging:
                 for other in self.players:
                     if other != player:
-                        dist = math.sqrt((player.x - other.x)**2 + (player.y - other.y)**2)
-                        if dist < PLAYER_SIZE * 1.5 and abs(player.swing_angle) > 45:
+                        dx = player.x - other.x
+                        dy = player.y - other.y
+                        if dx*dx + dy*dy < (PLAYER_SIZE * 1.5)**2 and abs(player.swing_angle) > 45:
                             if other.take_damage(5):
                                 if self.game_state == SINGLE_PLAYER:
                                     self.score[0] += 10
                 
-                for enemy in self.enemies[:]:
-                    dist = math.sqrt((player.x - enemy.x)**2 + (player.y - enemy.y)**2)
-                    if dist < PLAYER_SIZE * 1.5 + enemy.size/2 and abs(player.swing_angle) > 45:
-                        self.enemies.remove(enemy)
-                        self.score[0] += 5
+                if abs(player.swing_angle) > 45:
+                    for i in grid.query(player.x, player.y, PLAYER_SIZE * 1.5 + ENEMY_SIZE/2):
+                        enemy = enemies[i]
+                        if enemy in dead_enemies:
+                            continue
+                        dx = player.x - enemy.x
+                        dy = player.y - enemy.y
+                        if dx*dx + dy*dy < (PLAYER_SIZE * 1.5 + enemy.size/2)**2:
+                            dead_enemies.add(enemy)
+                            self.score[0] += 5
+        sections.split("sword")
         
-        for bullet in self.bullets[:]:
-            if not bullet.update(1/60.0):
-                self.bullets.remove(bullet)
+        for bullet in self.bullets:
+            if not bullet.update(FIXED_STEP):
+                dead_bullets.add(bullet)
                 continue
                 
             for player in self.players:
                 if player.player_id != bullet.owner_id:
-                    dist = math.sqrt((bullet.x - player.x)**2 + (bullet.y - player.y)**2)
-                    if dist < PLAYER_SIZE:
+                    dx = bullet.x - player.x
+                    dy = bullet.y - player.y
+                    if dx*dx + dy*dy < PLAYER_SIZE**2:
                         if player.take_damage(5):
                             if self.game_state == SINGLE_PLAYER:
                                 self.score[0] += 10
-                        self.bullets.remove(bullet)
+                        dead_bullets.add(bullet)
                         break
             
-            if self.game_state == SINGLE_PLAYER:
-                for enemy in self.enemies[:]:
-                    dist = math.sqrt((bullet.x - enemy.x)**2 + (bullet.y - enemy.y)**2)
-                    if dist < enemy.size/2 + 5:
-                        self.enemies.remove(enemy)
+            if self.game_state == SINGLE_PLAYER and bullet not in dead_bullets:
+                for i in grid.query(bullet.x, bullet.y, ENEMY_SIZE/2 + 5):
+                    enemy = enemies[i]
+                    if enemy in dead_enemies:
+                        continue
+                    dx = bullet.x - enemy.x
+                    dy = bullet.y - enemy.y
+                    if dx*dx + dy*dy < (enemy.size/2 + 5)**2:
+                        dead_enemies.add(enemy)
                         self.score[0] += 5
-                        self.bullets.remove(bullet)
+                        dead_bullets.add(bullet)
                         break
+        sections.split("bullets")
         
-        for grenade in self.grenades[:]:
-            if not grenade.update(1/60.0, self.platforms):
-                self.grenades.remove(grenade)
+        for grenade in self.grenades:
+            if not grenade.update(FIXED_STEP, self.grenade_ground):
+                dead_grenades.add(grenade)
                 continue
                 
             if grenade.exploded:
-                explosion = Explosion(grenade.x, grenade.y)
+                explosion = self.explosion_pool.acquire(grenade.x, grenade.y)
+                explosion.net_id = self.new_net_id()
                 self.explosions.append(explosion)
                 
                 # Check for hits immediately when explosion starts
@@ -811,35 +1459,185 @@ class Game:
                                     self.score[0] += 10
                 
                 if self.game_state == SINGLE_PLAYER:
-                    for enemy in self.enemies[:]:
-                        dist = math.sqrt((grenade.x - enemy.x)**2 + (grenade.y - enemy.y)**2)
-                        if dist < BLAST_RADIUS:
-                            self.enemies.remove(enemy)
+                    for i in grid.query(grenade.x, grenade.y, BLAST_RADIUS):
+                        enemy = enemies[i]
+                        if enemy in dead_enemies:
+                            continue
+                        dx = grenade.x - enemy.x
+                        dy = grenade.y - enemy.y
+                        if dx*dx + dy*dy < BLAST_RADIUS**2:
+                            dead_enemies.add(enemy)
                             self.score[0] += 10
                 
-                self.grenades.remove(grenade)
+                dead_grenades.add(grenade)
+        sections.split("grenades")
         
-        for explosion in self.explosions[:]:
-            if not explosion.update(1/60.0):
-                self.explosions.remove(explosion)
-                continue
+        live_explosions = []
+        for explosion in self.explosions:
+            if explosion.update(FIXED_STEP):
+                live_explosions.append(explosion)
+            else:
+                self.explosion_pool.release(explosion)
+        self.explosions = live_explosions
+        
+        if dead_weapons:
+            self.weapons = [w for w in self.weapons if w not in dead_weapons]
+        if dead_enemies:
+            self.enemies = [e for e in enemies if e not in dead_enemies]
+        if dead_bullets:
+            self.bullets = [b for b in self.bullets if b not in dead_bullets]
+            if self.bullet_store is None:
+                self.bullet_pool.release_all(dead_bullets)
+        if dead_grenades:
+            self.grenades = [g for g in self.grenades if g not in dead_grenades]
+            if self.grenade_store is None:
+                self.grenade_pool.release_all(dead_grenades)
+        
+        if self.enemy_store is not None:
+            self.enemy_store.sync(self.enemies)
+            self.bullet_store.sync(self.bullets)
+            self.grenade_store.sync(self.grenades)
+        sections.split("cleanup")
+    
+    def pool_stats(self):
+        # live / high_water / allocated / reused for each recycled entity kind
+        if self.backend == "numpy":
+            pools = {"enemies": self.enemy_store, "bullets": self.bullet_store,
+                     "grenades": self.grenade_store}
+        else:
+            pools = {"bullets": self.bullet_pool, "grenades": self.grenade_pool}
+        pools["explosions"] = self.explosion_pool
+        return {name: pool.stats() for name, pool in pools.items()}
+    
+    def state_hash(self):
+        # 8-byte digest of the simulation state carried between ticks;
+        # replays compare it to spot desyncs. Cosmetic fields are left out.
+        h = hashlib.blake2b(digest_size=8)
+        pack = struct.pack
+        h.update(pack("<iqqdd", self.game_state, self.score[0], self.score[1],
+                      self.game_time, self.clock()))
+        for p in self.players:
+            h.update(pack("<6dB?", p.x, p.y, p.vx, p.vy, p.health, p.weapon_time,
+                          p.weapon, p.sword_swinging))
+        for group in (self.enemies, self.bullets, self.grenades):
+            h.update(pack("<I", len(group)))
+            for e in group:
+                h.update(pack("<3d", e.x, e.y, e.vx))
+        for w in self.weapons:
+            h.update(pack("<3dB", w.x, w.y, w.spawn_time, w.type))
+        for e in self.explosions:
+            h.update(pack("<3d", e.x, e.y, e.radius))
+        return h.digest()
+    
+    def checkpoint(self, path=None):
+        # Binary checkpoint of the simulation (see checkpoint.py): returned
+        # as bytes, or written to path. Like state_hash it leaves out
+        # cosmetic state, but it keeps everything later ticks read, so a
+        # restored game plays on exactly as this one would.
+        sections = self.checkpoint_sections()
+        if path is None:
+            return encode(sections, self.backend)
+        save(path, sections, self.backend)
+    
+    def checkpoint_sections(self):
+        winner = getattr(self, "winner", None)
+        sections = [
+            ("game.f", "d", [self.game_time, self.clock(), self.last_weapon_spawn, self.last_enemy_spawn,
+                             self.camera_x, self.camera_y, self.prev_camera_x, self.prev_camera_y]),
+            ("game.i", "q", [self.game_state, self.score[0], self.score[1],
+                             -1 if winner is None else winner, self.next_net_id]
+                            + [c.held for c in self.commands] + [c.pressed for c in self.commands]),
+        ]
+        sections += checkpoint_columns("platforms", self.platforms, None)
+        sections += checkpoint_columns("players", self.players, None)
+        sections += checkpoint_columns("weapons", self.weapons, None)
+        sections += checkpoint_columns("explosions", self.explosions, None)
+        sections += checkpoint_columns("enemies", self.enemies, self.enemy_store)
+        sections += checkpoint_columns("bullets", self.bullets, self.bullet_store)
+        sections += checkpoint_columns("grenades", self.grenades, self.grenade_store)
+        return sections + self.rng.checkpoint_sections()
+    
+    def restore(self, checkpoint):
+        # Puts the simulation back to a Checkpoint of a game with the same
+        # backend, reusing this game's pools and stores. The clock is only
+        # set back if it is a SimClock.
+        if checkpoint.backend != self.backend:
+            raise ValueError(f"checkpoint is for the {checkpoint.backend} backend, not {self.backend}")
+        (self.game_time, now, self.last_weapon_spawn, self.last_enemy_spawn,
+         self.camera_x, self.camera_y, self.prev_camera_x, self.prev_camera_y) = checkpoint.column("game.f").tolist()
+        ints = checkpoint.column("game.i").tolist()
+        self.game_state, score1, score2, winner, self.next_net_id = ints[:5]
+        self.score = [score1, score2]
+        self.winner = None if winner < 0 else winner
+        for command, held, pressed in zip(self.commands, ints[5:7], ints[7:9]):
+            command.held = held
+            command.pressed = pressed
+            command.stamp = None
+        if isinstance(self.clock, SimClock):
+            self.clock.now = now
+        
+        # Constructors that draw random numbers get a throwaway stream;
+        # all the saved fields are overwritten anyway
+        blank = random.Random(0)
+        platforms = restore_entities("platforms", checkpoint, lambda row: Platform(0, 0, 0))
+        if [(p.x, p.y, p.width) for p in platforms] != [(p.x, p.y, p.width) for p in self.platforms]:
+            self.platforms = platforms
+            self.build_platform_tables()
+        self.players = restore_entities("players", checkpoint, lambda row: Player(0, 0, row["player_id"]))
+        self.weapons = restore_entities("weapons", checkpoint, lambda row: Weapon(0, 0, 0, blank))
+        self.explosion_pool.release_all(self.explosions)
+        self.explosions = restore_bulk("explosions", checkpoint, self.explosion_pool.take)
+        if self.enemy_store is not None:
+            self.enemies = restore_store("enemies", checkpoint, self.enemy_store)
+            self.bullets = restore_store("bullets", checkpoint, self.bullet_store)
+            self.grenades = restore_store("grenades", checkpoint, self.grenade_store)
+        else:
+            self.bullet_pool.release_all(self.bullets)
+            self.grenade_pool.release_all(self.grenades)
+            # Enemies aren't pooled, but the ones this game has are reused
+            # the same way, and only the shortfall is made
+            enemies = self.enemies
+            self.enemies = restore_bulk("enemies", checkpoint, lambda n: reuse(enemies, Enemy, n),
+                                        health=1, color=(0.8, 0.8, 0.2))
+            self.bullets = restore_bulk("bullets", checkpoint, self.bullet_pool.take)
+            self.grenades = restore_bulk("grenades", checkpoint, self.grenade_pool.take)
+        self.rng.restore_checkpoint(checkpoint)
+    
+    def save_previous(self):
+        # Called before each fixed step; draw blends from this state to the
+        # one the step produces
+        save_positions(self.players, None)
+        save_positions(self.enemies, self.enemy_store)
+        save_positions(self.bullets, self.bullet_store)
+        save_positions(self.grenades, self.grenade_store)
+        self.prev_camera_x = self.camera_x
+        self.prev_camera_y = self.camera_y
     
     def update(self, dt):
             if self.game_state in [SINGLE_PLAYER, MULTI_PLAYER]:
+                sections = profiler.sections("update")
                 self.game_time += dt
                 
                 for player in self.players:
-                    player.update(dt, self.platforms)
+                    player.update(dt, self.player_ground)
+                sections.split("players")
                 
                 if self.game_state == SINGLE_PLAYER:
                     self.spawn_enemy()
-                    for enemy in self.enemies[:]:
-                        enemy.update(dt, self.platforms, self.players[0])
+                    self.enemy_flow.update(self.players[0].x, self.players[0].y)
+                    if self.enemy_store is not None:
+                        self.enemy_store.update(dt, self.enemy_ground, self.players[0], self.enemy_flow)
+                    else:
+                        rng = self.rng.stream("enemies")
+                        for enemy in self.enemies[:]:
+                            enemy.update(dt, self.enemy_ground, self.players[0], rng, self.enemy_flow)
+                sections.split("enemies")
                 
-                if random.random() < 0.01:
+                if self.rng.stream("weapons").random() < 0.01:
                     self.spawn_weapon()
                 
                 self.check_collisions()
+                sections.split("collisions")
                 
                 # Check for game over conditions
                 if self.game_state == MULTI_PLAYER:
@@ -864,23 +1662,32 @@ class Game:
                     self.camera_y += (avg_y - self.camera_y) * dt * 2
             
             
-    def draw(self):
+    def draw(self, alpha=1.0):
+            # alpha is how far real time is between the last two fixed steps
+            profiler.mark_frame()
+            sections = profiler.sections("draw")
+            hud_text.prepare()
             glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
             glLoadIdentity()
             
             glMatrixMode(GL_PROJECTION)
             glLoadIdentity()
-            gluPerspective(45, SCREEN_WIDTH/SCREEN_HEIGHT, 0.1, 5000)
+            gluPerspective(FOV_Y, SCREEN_WIDTH/SCREEN_HEIGHT, NEAR_PLANE, FAR_PLANE)
             
             glMatrixMode(GL_MODELVIEW)
             glLoadIdentity()
             
             # Camera follows players with slight delay
-            gluLookAt(
-                self.camera_x, self.camera_y - 200, 800,
-                self.camera_x, self.camera_y, 0,
-                0, 1, 0
-            )
+            camera_x = self.prev_camera_x + (self.camera_x - self.prev_camera_x) * alpha
+            camera_y = self.prev_camera_y + (self.camera_y - self.prev_camera_y) * alpha
+            eye = (camera_x, camera_y - 200, 800)
+            target = (camera_x, camera_y, 0)
+            gluLookAt(*eye, *target, 0, 1, 0)
+            lod.set_camera(eye, FOV_Y, SCREEN_HEIGHT)
+            lod.begin_frame()
+            frustum.set_camera(eye, target, (0, 1, 0), FOV_Y,
+                               SCREEN_WIDTH/SCREEN_HEIGHT, NEAR_PLANE, FAR_PLANE)
+            frustum.begin_frame()
             
             glEnable(GL_DEPTH_TEST)
             
@@ -892,36 +1699,75 @@ class Game:
             glVertex3f(5000, 5000, -1000)
             glVertex3f(-5000, 5000, -1000)
             glEnd()
+            sections.split("setup")
             
             if self.game_state == MENU:
                 self.draw_menu()
             elif self.game_state == GAME_OVER:
                 self.draw_game_over()
             else:
+                moving = [(self.players, None), (self.enemies, self.enemy_store),
+                          (self.bullets, self.bullet_store), (self.grenades, self.grenade_store)]
+                if alpha < 1:
+                    saved = [blend_positions(e, store, alpha) for e, store in moving]
+                
+                # Bounding spheres are tested before any GL call
                 for platform in self.platforms:
-                    platform.draw()
+                    if frustum.visible(platform.x, platform.y, platform.z, platform.bound_radius()):
+                        platform.draw()
+                sections.split("platforms")
                 
                 for weapon in self.weapons:
-                    weapon.draw()
-                
-                for bullet in self.bullets:
-                    bullet.draw()
-                
-                for grenade in self.grenades:
-                    grenade.draw()
+                    if frustum.visible(weapon.x, weapon.y, weapon.z, weapon.bound_radius * (1 + weapon.pulse)):
+                        weapon.draw()
+                sections.split("weapons")
                 
-                for explosion in self.explosions:
-                    explosion.draw()
-                
-                for enemy in self.enemies:
-                    enemy.draw()
+                if batches.enabled:
+                    # One vertex array per entity kind
+                    batches.begin_frame()
+                    draw_bullets_batched(self.bullets, self.bullet_store)
+                    sections.split("bullets")
+                    draw_grenades_batched(self.grenades, self.grenade_store)
+                    sections.split("grenades")
+                    draw_explosions_batched(self.explosions)
+                    sections.split("explosions")
+                    draw_enemies_batched(self.enemies, self.enemy_store)
+                    sections.split("enemies")
+                else:
+                    for bullet in self.bullets:
+                        if frustum.visible(bullet.x, bullet.y, bullet.z, bullet.bound_radius):
+                            bullet.draw()
+                    sections.split("bullets")
+                    
+                    for grenade in self.grenades:
+                        if frustum.visible(grenade.x, grenade.y, grenade.z, grenade.bound_radius):
+                            grenade.draw()
+                    sections.split("grenades")
+                    
+                    for explosion in self.explosions:
+                        if frustum.visible(explosion.x, explosion.y, explosion.z, explosion.radius * 1.1):
+                            explosion.draw()
+                    sections.split("explosions")
+                    
+                    for enemy in self.enemies:
+                        if frustum.visible(enemy.x, enemy.y, enemy.z, enemy.size * enemy.bound_scale):
+                            enemy.draw()
+                    sections.split("enemies")
                 
                 for player in self.players:
-                    player.draw()
+                    if frustum.visible(player.x, player.y, player.z, player.bound_radius):
+                        player.draw()
+                sections.split("players")
+                
+                if alpha < 1:
+                    for (e, store), state in zip(moving, saved):
+                        restore_positions(e, store, state)
                 
                 self.draw_hud()
+                sections.split("hud")
             
             glutSwapBuffers()
+            sections.split("swap")
         
     def draw_hud(self):
             glMatrixMode(GL_PROJECTION)
@@ -936,54 +1782,28 @@ class Game:
             
             if self.game_state == SINGLE_PLAYER:
                 glColor3f(1, 1, 1)
-                self.draw_text(20, SCREEN_HEIGHT - 30, f"Score: {self.score[0]}")
+                self.draw_text(20, SCREEN_HEIGHT - 30, self.hud_score(self.score[0]))
             
-            if len(self.players) > 0 and self.players[0].health > 0:
-                weapon_text = "Weapon: "
-                if self.players[0].weapon == NO_WEAPON:
-                    weapon_text += "None"
-                elif self.players[0].weapon == SWORD:
-                    weapon_text += "Sword"
-                elif self.players[0].weapon == GUN:
-                    weapon_text += "Gun"
-                elif self.players[0].weapon == GRENADE:
-                    weapon_text += "Grenade"
-                
-                if self.players[0].weapon != NO_WEAPON:
-                    weapon_text += f" ({WEAPON_LIFETIME - int(self.players[0].weapon_time)}s)"
-                
-                # Add health percentage below weapon info
-                health_text = f"Health: {int(self.players[0].health)}%"
-                self.draw_text(20, SCREEN_HEIGHT - 90, weapon_text)
-                self.draw_text(20, SCREEN_HEIGHT - 120, health_text)
-            
-            if len(self.players) > 1 and self.players[1].health > 0:
-                weapon_text = "Weapon: "
-                if self.players[1].weapon == NO_WEAPON:
-                    weapon_text += "None"
-                elif self.players[1].weapon == SWORD:
-                    weapon_text += "Sword"
-                elif self.players[1].weapon == GUN:
-                    weapon_text += "Gun"
-                elif self.players[1].weapon == GRENADE:
-                    weapon_text += "Grenade"
-                
-                if self.players[1].weapon != NO_WEAPON:
-                    weapon_text += f" ({WEAPON_LIFETIME - int(self.players[1].weapon_time)}s)"
-                
-                # Add health percentage below weapon info
-                health_text = f"Health: {int(self.players[1].health)}%"
-                text_width = sum(glutBitmapWidth(GLUT_BITMAP_HELVETICA_18, ord(c)) for c in weapon_text)
-                self.draw_text(SCREEN_WIDTH - 20 - text_width, SCREEN_HEIGHT - 90, weapon_text)
-                self.draw_text(SCREEN_WIDTH - 20 - text_width, SCREEN_HEIGHT - 120, health_text)
+            # Player 1's weapon and health top left, player 2's top right
+            for i, player in enumerate(self.players[:2]):
+                if player.health <= 0:
+                    continue
+                weapon_text = self.hud_weapon[i](player.weapon, WEAPON_LIFETIME - int(player.weapon_time))
+                health_text = self.hud_health[i](int(player.health))
+                x = 20 if i == 0 else SCREEN_WIDTH - 20 - hud_text.width(weapon_text, GLUT_BITMAP_HELVETICA_18)
+                self.draw_text(x, SCREEN_HEIGHT - 90, weapon_text)
+                self.draw_text(x, SCREEN_HEIGHT - 120, health_text)
             
-            self.draw_text(SCREEN_WIDTH/2 - 50, SCREEN_HEIGHT - 30, f"Time: {int(self.game_time)}s")
+            self.draw_text(SCREEN_WIDTH/2 - 50, SCREEN_HEIGHT - 30, self.hud_time(int(self.game_time)))
             
             if self.game_state == SINGLE_PLAYER:
                 self.draw_text(20, 30, "WASD: Move | SPACE: Attack | R: Restart")
             else:
                 self.draw_text(20, 30, "Player1: WASD | Player2: Arrows | SPACE/CTRL: Attack | R: Restart")
             
+            if profiler.show:
+                self.draw_profiler_overlay()
+            
             glPopMatrix()
             glMatrixMode(GL_PROJECTION)
             glPopMatrix()
@@ -991,10 +1811,21 @@ class Game:
             
             glEnable(GL_DEPTH_TEST)
         
+    def draw_profiler_overlay(self):
+            # Rolling p50/p95/p99 per scope, top right, toggled with P
+            glColor3f(1, 1, 0)
+            y = SCREEN_HEIGHT - 60
+            for line in profiler.overlay_lines():
+                self.draw_text(SCREEN_WIDTH - 330, y, line, GLUT_BITMAP_9_BY_15)
+                y -= 16
+            y -= 16
+            for name, stats in self.pool_stats().items():
+                line = f"{name:<12}live {stats['live']:>4}  peak {stats['high_water']:>4}"
+                self.draw_text(SCREEN_WIDTH - 330, y, line, GLUT_BITMAP_9_BY_15)
+                y -= 16
+        
     def draw_text(self, x, y, text, font=GLUT_BITMAP_HELVETICA_18):
-            glRasterPos2f(x, y)
-            for character in text:
-                glutBitmapCharacter(font, ord(character))
+            hud_text.draw(x, y, text, font)
         
     def draw_menu(self):
             glMatrixMode(GL_PROJECTION)
@@ -1008,7 +1839,7 @@ class Game:
             glDisable(GL_DEPTH_TEST)
             
             text = "B0T BRAWL"
-            width = sum(glutBitmapWidth(GLUT_BITMAP_TIMES_ROMAN_24, ord(c)) for c in text)
+            width = hud_text.width(text, GLUT_BITMAP_TIMES_ROMAN_24)
             self.draw_text(SCREEN_WIDTH/2 - width/2, SCREEN_HEIGHT/2 + 150, text, GLUT_BITMAP_TIMES_ROMAN_24)
             
             glColor4f(0.2, 0.2, 0.3, 0.7)
@@ -1064,13 +1895,12 @@ class Game:
             
             # "GAME OVER" text
             text = "GAME OVER"
-            width = sum(glutBitmapWidth(GLUT_BITMAP_TIMES_ROMAN_24, ord(c)) for c in text)
+            width = hud_text.width(text, GLUT_BITMAP_TIMES_ROMAN_24)
             glColor3f(1, 0.2, 0.2)
             self.draw_text(SCREEN_WIDTH/2 - width/2, SCREEN_HEIGHT/2 + 100, text, GLUT_BITMAP_TIMES_ROMAN_24)
             
             # Winner/Score text
             if self.winner:
-                print("game_over_window",self.game_state)
                 if hasattr(self, 'winner'):
                     if self.winner == 1:
                         text = "Player 1 Wins!"
@@ -1088,27 +1918,27 @@ class Game:
                 text = f"Score: {self.score[0]}"
                 color = (1.0, 1.0, 1.0)
             
-            width = sum(glutBitmapWidth(GLUT_BITMAP_HELVETICA_18, ord(c)) for c in text)
+            width = hud_text.width(text, GLUT_BITMAP_HELVETICA_18)
             glColor3f(*color)
             self.draw_text(SCREEN_WIDTH/2 - width/2, SCREEN_HEIGHT/2 + 40, text)
             
             # Rest of the game over text
             glColor3f(1, 1, 1)
             text = "Press R to return to menu"
-            width = sum(glutBitmapWidth(GLUT_BITMAP_HELVETICA_18, ord(c)) for c in text)
+            width = hud_text.width(text, GLUT_BITMAP_HELVETICA_18)
             self.draw_text(SCREEN_WIDTH/2 - width/2, SCREEN_HEIGHT/2 - 20, text)
             
             text = "Press ESC to quit"
-            width = sum(glutBitmapWidth(GLUT_BITMAP_HELVETICA_18, ord(c)) for c in text)
+            width = hud_text.width(text, GLUT_BITMAP_HELVETICA_18)
             self.draw_text(SCREEN_WIDTH/2 - width/2, SCREEN_HEIGHT/2 - 60, text)
             
             text = f"Time survived: {int(self.game_time)} seconds"
-            width = sum(glutBitmapWidth(GLUT_BITMAP_HELVETICA_18, ord(c)) for c in text)
+            width = hud_text.width(text, GLUT_BITMAP_HELVETICA_18)
             self.draw_text(SCREEN_WIDTH/2 - width/2, SCREEN_HEIGHT/2 - 100, text)
             
             if self.game_state == SINGLE_PLAYER:
                 text = f"Enemies defeated: {self.score[0]//5}"
-                width = sum(glutBitmapWidth(GLUT_BITMAP_HELVETICA_18, ord(c)) for c in text)
+                width = hud_text.width(text, GLUT_BITMAP_HELVETICA_18)
                 self.draw_text(SCREEN_WIDTH/2 - width/2, SCREEN_HEIGHT/2 - 140, text)
             
             glPopMatrix()
@@ -1125,15 +1955,99 @@ class Game:
             self.last_enemy_spawn = 0
             self.camera_x = 0
             self.camera_y = 0
+            self.prev_camera_x = 0
+            self.prev_camera_y = 0
             self.winner = None  # Reset winner
             self.setup_arena()
 
 game = Game()
+input_log = None  # InputLog while recording a replay
+inputs = InputQueue()
+window = None
+redraw = None  # RedrawScheduler while the window is open
+loop = FixedStepLoop(FIXED_STEP, MAX_CATCHUP_STEPS)
+
+def leave_main_loop():
+    # No-op when the handlers are driven by a headless replay
+    if window is not None:
+        glutLeaveMainLoop()
+
+def request_frame():
+    # Input may arrive while the window sleeps on a static screen
+    if redraw is not None:
+        redraw.wake()
 
+# Player buttons; player 1 also attacks with the left mouse button
+PLAYER1_KEYS = {"a": LEFT, "d": RIGHT, "w": JUMP, " ": ATTACK}
+PLAYER2_KEYS = {GLUT_KEY_LEFT: LEFT, GLUT_KEY_RIGHT: RIGHT, GLUT_KEY_UP: JUMP, GLUT_KEY_DOWN: ATTACK}
+
+# GLUT callbacks only queue the event; process_input applies it at the
+# start of the next fixed step
 def keyboard(key, x, y):
-    key = key.decode('utf-8').lower()
-    
-    if game.game_state == MENU:
+    inputs.push(KEY_DOWN, key[0])
+    request_frame()
+
+def keyboard_up(key, x, y):
+    inputs.push(KEY_UP, key[0])
+    request_frame()
+
+def special_key(key, x, y):
+    inputs.push(SPECIAL_DOWN, key)
+    request_frame()
+
+def special_key_up(key, x, y):
+    inputs.push(SPECIAL_UP, key)
+    request_frame()
+
+def mouse(button, state, x, y):
+    inputs.push(MOUSE, button, state)
+    request_frame()
+
+def apply_input(kind, code, state):
+    # Queues one logged event as if GLUT had delivered it
+    inputs.push(kind, code, state)
+
+def process_input():
+    # Applies the events queued since the last step in arrival order,
+    # recording them for replays and timing how long presses waited
+    now = inputs.clock()
+    for kind, code, state, stamp in inputs.drain():
+        if input_log is not None:
+            input_log.record(kind, code, state)
+        if profiler.enabled and (kind in (KEY_DOWN, SPECIAL_DOWN) or (kind == MOUSE and state == GLUT_DOWN)):
+            profiler.record("input.latency", now - stamp)
+        handle_event(kind, code, state, stamp)
+    game.apply_commands()
+
+def handle_event(kind, code, state, stamp):
+    if kind == KEY_DOWN or kind == KEY_UP:
+        key = chr(code).lower()
+        button = PLAYER1_KEYS.get(key)
+        if button is None:
+            if kind == KEY_DOWN:
+                menu_key(key)
+        elif kind == KEY_DOWN:
+            game.commands[0].press(button, stamp)
+        else:
+            game.commands[0].release(button)
+    elif kind == SPECIAL_DOWN or kind == SPECIAL_UP:
+        button = PLAYER2_KEYS.get(code)
+        if button is None:
+            return
+        if kind == SPECIAL_DOWN:
+            game.commands[1].press(button, stamp)
+        else:
+            game.commands[1].release(button)
+    elif kind == MOUSE and code == GLUT_LEFT_BUTTON:
+        if state == GLUT_DOWN:
+            game.commands[0].press(ATTACK, stamp)
+        else:
+            game.commands[0].release(ATTACK)
+
+def menu_key(key):
+    if key == 'p':
+        profiler.toggle_overlay()
+    elif game.game_state == MENU:
         if key == '1':
             game.game_state = SINGLE_PLAYER
             game.reset_game()
@@ -1141,158 +2055,180 @@ def keyboard(key, x, y):
             game.game_state = MULTI_PLAYER
             game.reset_game()
         elif key == '\x1b':
-            glutLeaveMainLoop()
-    
+            leave_main_loop()
     elif game.game_state in [SINGLE_PLAYER, MULTI_PLAYER]:
-        player = game.players[0]
-        
-        if key == 'a':
-            player.vx = -PLAYER_SPEED
-            player.facing_right = False
-        elif key == 'd':
-            player.vx = PLAYER_SPEED
-            player.facing_right = True
-        elif key == 'w':
-            player.jump()
-        elif key == ' ':
-            if player.weapon == SWORD and not player.sword_swinging:
-                player.sword_swinging = True
-                player.swing_angle = 0
-                player.swing_direction = 1
-            elif player.weapon == GUN and time.time() - player.last_shot > player.shot_delay:
-                direction = 1 if player.facing_right else -1
-                game.bullets.append(Bullet(
-                    player.x + direction * PLAYER_SIZE/2,
-                    player.y,
-                    direction,
-                    player.player_id
-                ))
-                player.last_shot = time.time()
-            elif player.weapon == GRENADE:
-                direction = 1 if player.facing_right else -1
-                game.grenades.append(Grenade(
-                    player.x + direction * PLAYER_SIZE/2,
-                    player.y,
-                    direction,
-                    player.player_id
-                ))
-                player.weapon = NO_WEAPON
-                player.weapon_time = 0
-        elif key == 'r':
+        if key == 'r':
             game.reset_game()
         elif key == '\x1b':
             game.game_state = MENU
-    
     elif game.game_state == GAME_OVER:
         if key == 'r':
             game.game_state = MENU
             game.reset_game()
         elif key == '\x1b':
-            glutLeaveMainLoop()
+            leave_main_loop()
 
-def keyboard_up(key, x, y):
-    key = key.decode('utf-8').lower()
-    if game.game_state in [SINGLE_PLAYER, MULTI_PLAYER]:
-        player = game.players[0]
-        if key == 'a' and player.vx < 0:
-            player.vx = 0
-        elif key == 'd' and player.vx > 0:
-            player.vx = 0
+def step(dt):
+    process_input()
+    game.clock.advance(dt)
+    game.save_previous()
+    with profiler.scope("update"):
+        game.update(dt)
+    if input_log is not None:
+        input_log.end_tick(game)
 
-def special_key(key, x, y):
-    if game.game_state == MULTI_PLAYER and len(game.players) > 1:
-        player = game.players[1]
-        
-        if key == GLUT_KEY_LEFT:
-            player.vx = -PLAYER_SPEED
-            player.facing_right = False
-        elif key == GLUT_KEY_RIGHT:
-            player.vx = PLAYER_SPEED
-            player.facing_right = True
-        elif key == GLUT_KEY_UP:
-            player.jump()
-        elif key == GLUT_KEY_DOWN:
-            if player.weapon == SWORD and not player.sword_swinging:
-                player.sword_swinging = True
-                player.swing_angle = 0
-                player.swing_direction = 1
-            elif player.weapon == GUN and time.time() - player.last_shot > player.shot_delay:
-                direction = 1 if player.facing_right else -1
-                game.bullets.append(Bullet(
-                    player.x + direction * PLAYER_SIZE/2,
-                    player.y,
-                    direction,
-                    player.player_id
-                ))
-                player.last_shot = time.time()
-            elif player.weapon == GRENADE:
-                direction = 1 if player.facing_right else -1
-                game.grenades.append(Grenade(
-                    player.x + direction * PLAYER_SIZE/2,
-                    player.y,
-                    direction,
-                    player.player_id
-                ))
-                player.weapon = NO_WEAPON
-                player.weapon_time = 0
+def frame(resumed):
+    # Runs before each redraw. Time spent asleep on a static screen is
+    # not simulated. Returns whether more frames are needed: while a match
+    # is on, and until queued input has been applied.
+    if resumed:
+        loop.reset()
+    loop.throttle()
+    loop.advance(step)
+    return game.game_state in (SINGLE_PLAYER, MULTI_PLAYER) or len(inputs) > 0
 
-def special_key_up(key, x, y):
-    if game.game_state == MULTI_PLAYER and len(game.players) > 1:
-        player = game.players[1]
-        if key == GLUT_KEY_LEFT and player.vx < 0:
-            player.vx = 0
-        elif key == GLUT_KEY_RIGHT and player.vx > 0:
-            player.vx = 0
+def display():
+    game.draw(loop.alpha)
 
-def mouse(button, state, x, y):
-    if game.game_state in [SINGLE_PLAYER, MULTI_PLAYER]:
-        player = game.players[0]
-        if button == GLUT_LEFT_BUTTON and state == GLUT_DOWN:
-            if player.weapon == SWORD and not player.sword_swinging:
-                player.sword_swinging = True
-                player.swing_angle = 0
-                player.swing_direction = 1
-            elif player.weapon == GUN and time.time() - player.last_shot > player.shot_delay:
-                direction = 1 if player.facing_right else -1
-                game.bullets.append(Bullet(
-                    player.x + direction * PLAYER_SIZE/2,
-                    player.y,
-                    direction,
-                    player.player_id
-                ))
-                player.last_shot = time.time()
-            elif player.weapon == GRENADE:
-                direction = 1 if player.facing_right else -1
-                game.grenades.append(Grenade(
-                    player.x + direction * PLAYER_SIZE/2,
-                    player.y,
-                    direction,
-                    player.player_id
-                ))
-                player.weapon = NO_WEAPON
-                player.weapon_time = 0
-
-def idle():
-    game.update(1/60.0)
-    glutPostRedisplay()
-
-def main():
+def main(profile_path=None, max_fps=0, record_path=None, seed=None, backend="objects",
+         redraw_mode=None, cpu_report=None):
+    global game, input_log, window, redraw
+    game = Game(backend=backend, seed=seed)
+    if record_path:
+        input_log = InputLog(game.rng.seed, backend, FIXED_STEP)
+    profiler.enabled = profile_path is not None
+    redraw = RedrawScheduler(frame, max_fps or DEFAULT_FPS, redraw_mode, cpu_report)
+    # The scheduler paces frames itself; spinning is only capped on request
+    loop.max_fps = max_fps if redraw.mode == "spin" else 0
     glutInit()
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
     glutInitWindowSize(SCREEN_WIDTH, SCREEN_HEIGHT)
-    glutCreateWindow(b"Bot Brawl 3D")
+    window = glutCreateWindow(b"Bot Brawl 3D")
     
-    glutDisplayFunc(game.draw)
+    glutDisplayFunc(display)
     glutKeyboardFunc(keyboard)
     glutKeyboardUpFunc(keyboard_up)
     glutSpecialFunc(special_key)
     glutSpecialUpFunc(special_key_up)
     glutMouseFunc(mouse)
-    glutIdleFunc(idle)
+    redraw.start()
     
     glClearColor(0.1, 0.1, 0.5, 1.0)  # Dark blue background
     
+    # Return from glutMainLoop on Esc or window close so the profile is written
+    glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_GLUTMAINLOOP_RETURNS)
     glutMainLoop()
+    window = None
+    redraw = None
+    if profile_path:
+        profiler.dump(profile_path)
+    if record_path:
+        input_log.save(record_path)
+        print(f"recorded {input_log.ticks} ticks, seed {input_log.seed}, to {record_path}")
+
+def run_headless(ticks, dt=FIXED_STEP, mode=SINGLE_PLAYER, backend="objects", seed=None):
+    # Steps the simulation as fast as possible, no GLUT window or GL calls.
+    # A finished match is restarted so long runs keep exercising the logic.
+    clock = SimClock()
+    sim = Game(clock=clock, backend=backend, seed=seed)
+    sim.game_state = mode
+    sim.reset_game()
+    matches = 1
+    start = time.perf_counter()
+    for _ in range(ticks):
+        clock.advance(dt)
+        with profiler.scope("update"):
+            sim.update(dt)
+        if sim.game_state == GAME_OVER:
+            sim.game_state = mode
+            sim.reset_game()
+            matches += 1
+    elapsed = time.perf_counter() - start
+    return sim, matches, elapsed
+
+def run_replay(path):
+    # Re-simulates a recorded match at full speed through the input
+    # handlers, checking the logged state hashes. Returns the log, the
+    # number of hashes that matched and the tick of the first mismatch.
+    global game
+    log = InputLog.load(path)
+    game = Game(backend=log.backend, seed=log.seed)
+    expected = dict(log.hashes)
+    events = iter(log.events)
+    pending = next(events, None)
+    checked = 0
+    desync = None
+    start = time.perf_counter()
+    for tick in range(log.ticks):
+        while pending is not None and pending[0] == tick:
+            apply_input(*pending[1:])
+            pending = next(events, None)
+        step(log.step)
+        digest = expected.get(tick + 1)
+        if digest is not None:
+            if game.state_hash() != digest:
+                desync = tick + 1
+                break
+            checked += 1
+    elapsed = time.perf_counter() - start
+    return log, checked, desync, elapsed
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bot Brawl 3D")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the simulation without a window and report ticks/sec")
+    parser.add_argument("--ticks", type=int, default=10000,
+                        help="number of fixed ticks to simulate in headless mode")
+    parser.add_argument("--multiplayer", action="store_true",
+                        help="simulate multiplayer mode instead of single player")
+    parser.add_argument("--backend", choices=["objects", "numpy"], default="objects",
+                        help="entity storage for enemies, bullets and grenades")
+    parser.add_argument("--seed", type=int,
+                        help="match seed; random if omitted")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the inputs of this session to a replay file")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="re-simulate a recorded replay headless and verify it")
+    parser.add_argument("--max-fps", type=float, default=0,
+                        help=f"frame rate while a match is on (default {DEFAULT_FPS}; "
+                             "with --redraw spin, 0 = unlimited)")
+    parser.add_argument("--redraw", choices=["timer", "spin"],
+                        help="timer: draw only when something changes (default); "
+                             "spin: redraw on every idle pass, as before")
+    parser.add_argument("--cpu-report", type=float, metavar="SECONDS",
+                        help="print the CPU time used per second every SECONDS")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="collect frame timings and write them to PATH on exit "
+                             "(JSON if it ends in .json, CSV otherwise)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.replay:
+        profiler.enabled = args.profile is not None
+        log, checked, desync, elapsed = run_replay(args.replay)
+        ticks = desync or log.ticks
+        rate = ticks / elapsed if elapsed > 0 else float("inf")
+        print(f"replayed {ticks} ticks in {elapsed:.3f}s ({rate:.0f} ticks/sec), seed {log.seed}, "
+              f"{checked}/{len(log.hashes)} state hashes match")
+        if args.profile:
+            profiler.dump(args.profile)
+        if desync is not None:
+            print(f"desync at tick {desync}")
+            sys.exit(1)
+    elif args.headless:
+        profiler.enabled = args.profile is not None
+        mode = MULTI_PLAYER if args.multiplayer else SINGLE_PLAYER
+        sim, matches, elapsed = run_headless(args.ticks, mode=mode, backend=args.backend,
+                                             seed=args.seed)
+        rate = args.ticks / elapsed if elapsed > 0 else float("inf")
+        print(f"{args.ticks} ticks in {elapsed:.3f}s ({rate:.0f} ticks/sec), seed {sim.rng.seed}, "
+              f"{matches} match(es), {len(sim.enemies)} enemies alive")
+        for name, stats in sim.pool_stats().items():
+            print(f"  {name:<10} high-water {stats['high_water']:>5}, allocated {stats['allocated']:>5}, "
+                  f"reused {stats['reused']:>6}")
+        if args.profile:
+            profiler.dump(args.profile)
+    else:
+        main(args.profile, args.max_fps, args.record, args.seed, args.backend,
+             args.redraw, args.cpu_report)
\ No newline at end of file
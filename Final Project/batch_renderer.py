@@ -0,0 +1,123 @@
+# Batched drawing for entities that are many copies of the same shape.
+# Sphere meshes are tessellated once per (slices, stacks); a batch of
+# instances, packed as rows of [x, y, z, radius, r, g, b, a], is expanded
+# into one vertex/colour array and submitted with a single glDrawArrays.
+# The fixed-function pipeline has no per-instance attributes, so the
+# expansion happens on the CPU with NumPy.
+from functools import lru_cache
+
+from OpenGL.GL import (glEnableClientState, glDisableClientState, glVertexPointer,
+                       glColorPointer, glDrawArrays, GL_VERTEX_ARRAY, GL_COLOR_ARRAY,
+                       GL_FLOAT, GL_TRIANGLES, GL_LINES)
+
+try:
+    import numpy as np
+except ImportError:  # batching is skipped without NumPy
+    np = None
+
+
+@lru_cache(maxsize=None)
+def sphere_grid(slices, stacks):
+    # Unit-sphere points laid out like glutSolidSphere: stacks along z,
+    # slices around it
+    theta = np.linspace(0, np.pi, stacks + 1)[:, None]
+    phi = np.linspace(0, 2 * np.pi, slices + 1)[None, :]
+    return np.stack([np.sin(theta) * np.cos(phi),
+                     np.sin(theta) * np.sin(phi),
+                     np.cos(theta) * np.ones_like(phi)], axis=-1).astype(np.float32)
+
+
+@lru_cache(maxsize=None)
+def sphere_triangles(slices, stacks):
+    # Two triangles per grid cell, except in the cells touching a pole:
+    # one of their triangles has two corners on the pole and no area, so
+    # it is left out, as glutSolidSphere leaves it out
+    grid = sphere_grid(slices, stacks)
+    a, b = grid[:-1, :-1], grid[1:, :-1]
+    c, d = grid[1:, 1:], grid[:-1, 1:]
+    cells = np.stack([a, b, c, a, c, d], axis=2).reshape(stacks, slices, 2, 3, 3)
+    keep = np.ones((stacks, 1, 2), dtype=bool)
+    keep[0, :, 1] = False  # a and d are the north pole
+    keep[-1, :, 0] = False  # b and c are the south pole
+    return cells[np.broadcast_to(keep, cells.shape[:3])].reshape(-1, 3)
+
+
+@lru_cache(maxsize=None)
+def sphere_wire(slices, stacks):
+    grid = sphere_grid(slices, stacks)
+    rings = np.stack([grid[:, :-1], grid[:, 1:]], axis=2).reshape(-1, 3)
+    meridians = np.stack([grid[:-1, :], grid[1:, :]], axis=2).reshape(-1, 3)
+    return np.concatenate([rings, meridians])
+
+
+def pack_spheres(x, y, z, radius, color):
+    # Instance rows for spheres(); radius and color may be per-instance arrays
+    instances = np.empty((len(x), 8), dtype=np.float32)
+    instances[:, 0] = x
+    instances[:, 1] = y
+    instances[:, 2] = z
+    instances[:, 3] = radius
+    instances[:, 4:8] = color
+    return instances
+
+
+class BatchRenderer:
+    def __init__(self):
+        self.enabled = np is not None
+        self.draw_calls = 0
+        self.instances = 0
+        self.primitives = 0
+
+    def begin_frame(self):
+        self.draw_calls = 0
+        self.instances = 0
+        self.primitives = 0
+
+    def submit(self, mode, vertices, colors):
+        # vertices (V, 3) and colors (V, 4) float32 arrays, one draw call
+        if len(vertices) == 0:
+            return
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        colors = np.ascontiguousarray(colors, dtype=np.float32)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices)
+        glColorPointer(4, GL_FLOAT, 0, colors)
+        glDrawArrays(mode, 0, len(vertices))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        self.draw_calls += 1
+        self.primitives += len(vertices) // (3 if mode == GL_TRIANGLES else 2)
+
+    def spheres(self, instances, slices, stacks, wire=False):
+        # instances: (N, 8) rows of [x, y, z, radius, r, g, b, a]
+        if len(instances) == 0:
+            return
+        instances = np.asarray(instances, dtype=np.float32)
+        mesh = sphere_wire(slices, stacks) if wire else sphere_triangles(slices, stacks)
+        vertices = mesh[None, :, :] * instances[:, None, 3:4] + instances[:, None, 0:3]
+        colors = np.broadcast_to(instances[:, None, 4:8], (len(instances), len(mesh), 4))
+        self.instances += len(instances)
+        self.submit(GL_LINES if wire else GL_TRIANGLES,
+                    vertices.reshape(-1, 3), colors.reshape(-1, 4))
+
+    def lod_spheres(self, instances, lod, wire=False):
+        # spheres() with each instance's tessellation picked by a SphereLOD;
+        # one draw call per level in use
+        if len(instances) == 0:
+            return
+        instances = np.asarray(instances, dtype=np.float32)
+        level = lod.select_batch(instances)
+        for i, (_, slices, stacks) in enumerate(lod.levels):
+            rows = instances[level == i]
+            if len(rows):
+                if not wire:
+                    lod.triangles += len(rows) * (len(sphere_triangles(slices, stacks)) // 3)
+                self.spheres(rows, slices, stacks, wire)
+
+    def lines(self, vertices, color):
+        # vertices (2K, 3) endpoint pairs sharing one RGBA colour
+        self.submit(GL_LINES, vertices, np.broadcast_to(np.asarray(color, dtype=np.float32), (len(vertices), 4)))
+
+    def triangles(self, vertices, color):
+        self.submit(GL_TRIANGLES, vertices, np.broadcast_to(np.asarray(color, dtype=np.float32), (len(vertices), 4)))
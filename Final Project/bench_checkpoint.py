@@ -0,0 +1,82 @@
+# Measures checkpoint size and speed for each entity backend with many
+# live enemies: encoding to bytes, writing a file, decoding (parsing the
+# section table and reading every column) and restoring, from bytes and
+# from a memory-mapped file. Restores go into one existing Game, as a
+# rollback would.
+# Usage: python bench_checkpoint.py [--counts 10 1000 100000] [--repeat 3]
+import argparse
+import os
+import tempfile
+import time
+
+from bench_entities import build_game
+from bot_brawl import load_game
+from checkpoint import Checkpoint
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def read_all(checkpoint):
+    for name in checkpoint.sections:
+        checkpoint.column(name).tolist()
+
+
+def restore_file(game, path):
+    checkpoint = Checkpoint.open(path)
+    game.restore(checkpoint)
+    checkpoint.close()
+
+
+def bench(bb, backend, n_enemies, repeat, path):
+    game = build_game(bb, backend, n_enemies)
+    # A few ticks so the scalars and random streams are not at their defaults
+    for _ in range(10):
+        game.clock.advance(bb.FIXED_STEP)
+        game.update(bb.FIXED_STEP)
+    data = game.checkpoint()
+    target = bb.Game(backend=backend)
+    entities = sum(len(group) for group in (game.players, game.enemies, game.platforms, game.weapons,
+                                            game.bullets, game.grenades, game.explosions))
+    return {
+        "entities": entities,
+        "size": len(data),
+        "encode": best_time(game.checkpoint, repeat),
+        "save": best_time(lambda: game.checkpoint(path), repeat),
+        "decode": best_time(lambda: read_all(Checkpoint(data)), repeat),
+        "restore": best_time(lambda: target.restore(Checkpoint(data)), repeat),
+        "restore_mmap": best_time(lambda: restore_file(target, path), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Brawl checkpoint benchmark")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=["objects", "numpy"])
+    args = parser.parse_args()
+
+    bb = load_game()
+    handle, path = tempfile.mkstemp(suffix=".bbcp")
+    os.close(handle)
+    print(f"{'backend':>8} {'entities':>9} {'bytes':>10} {'B/entity':>9} {'encode ms':>10} {'save ms':>8} "
+          f"{'decode ms':>10} {'restore ms':>11} {'mmap ms':>8}")
+    try:
+        for backend in args.backends:
+            for n in args.counts:
+                r = bench(bb, backend, n, args.repeat, path)
+                print(f"{backend:>8} {r['entities']:>9} {r['size']:>10} {r['size'] / r['entities']:>9.1f} "
+                      f"{r['encode'] * 1000:>10.3f} {r['save'] * 1000:>8.3f} {r['decode'] * 1000:>10.3f} "
+                      f"{r['restore'] * 1000:>11.3f} {r['restore_mmap'] * 1000:>8.3f}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
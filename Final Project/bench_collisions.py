@@ -0,0 +1,104 @@
+# Measures Game.check_collisions cost against the number of live enemies.
+# First, on every scene, the spatial-hash broad phase has to find the same
+# sword and bullet hits on enemies as testing every pair, and the speedup
+# of finding them through the grid over the O(n^2) pass is reported too.
+# Usage: python bench_collisions.py [--counts 100 500 1000] [--repeats 20]
+import argparse
+import random
+import time
+
+from bot_brawl import load_game
+
+
+def build_scene(bb, n_enemies, seed):
+    # Enemies scattered over the arena, one bullet per ten enemies and a
+    # mid-swing sword so every collision pass has work to do
+    random.seed(seed)
+    game = bb.Game(clock=bb.SimClock(), seed=seed)
+    game.game_state = bb.SINGLE_PLAYER
+    game.reset_game()
+    for _ in range(n_enemies):
+        x = random.uniform(-bb.ARENA_WIDTH/2, bb.ARENA_WIDTH/2)
+        y = random.uniform(-bb.ARENA_HEIGHT/2 + 50, bb.ARENA_HEIGHT/2 - 50)
+        game.add_enemy(x, y)
+    for _ in range(n_enemies // 10):
+        x = random.uniform(-bb.ARENA_WIDTH/2, bb.ARENA_WIDTH/2)
+        y = random.uniform(-bb.ARENA_HEIGHT/2 + 50, bb.ARENA_HEIGHT/2 - 50)
+        game.add_bullet(x, y, random.choice([-1, 1]), 1)
+    player = game.players[0]
+    player.weapon = bb.SWORD
+    player.sword_swinging = True
+    player.swing_angle = 60
+    return game
+
+
+def probes(bb, game):
+    # (x, y, reach beyond the enemy's half size, broad phase radius) for the
+    # swinging sword and each bullet, as check_collisions tests them
+    player = game.players[0]
+    sword = bb.PLAYER_SIZE * 1.5
+    found = [(player.x, player.y, sword, sword + bb.ENEMY_SIZE/2)]
+    found += [(bullet.x, bullet.y, 5, bb.ENEMY_SIZE/2 + 5) for bullet in game.bullets]
+    return found
+
+
+def hits(enemy, x, y, reach):
+    dx = x - enemy.x
+    dy = y - enemy.y
+    return dx*dx + dy*dy < (reach + enemy.size/2)**2
+
+
+def grid_pairs(game, probes):
+    enemies = game.enemies
+    grid = game.enemy_grid
+    grid.build(enemies)
+    return {(p, i) for p, (x, y, reach, radius) in enumerate(probes)
+            for i in grid.query(x, y, radius) if hits(enemies[i], x, y, reach)}
+
+
+def brute_pairs(game, probes):
+    return {(p, i) for p, (x, y, reach, radius) in enumerate(probes)
+            for i, enemy in enumerate(game.enemies) if hits(enemy, x, y, reach)}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def bench(bb, n_enemies, repeats):
+    # Best times of check_collisions and of the grid and brute-force pair
+    # passes, and the number of pairs on the last scene
+    best = [float("inf")] * 3
+    for r in range(repeats):
+        game = build_scene(bb, n_enemies, seed=r)
+        scene = probes(bb, game)
+        grid, grid_time = timed(grid_pairs, game, scene)
+        brute, brute_time = timed(brute_pairs, game, scene)
+        assert grid == brute, (f"seed {r}, {n_enemies} enemies: the grid missed {sorted(brute - grid)[:5]}, "
+                               f"found extra {sorted(grid - brute)[:5]}")
+        _, collide_time = timed(game.check_collisions)
+        best = [min(b, t) for b, t in zip(best, (collide_time, grid_time, brute_time))]
+    return best, len(brute)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Brawl collision benchmark")
+    parser.add_argument("--counts", type=int, nargs="+",
+                        default=[10, 100, 500, 1000, 2000, 5000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    bb = load_game()
+    print(f"{'enemies':>8} {'bullets':>8} {'best ms':>10} {'us/entity':>10} {'pairs':>6} "
+          f"{'grid ms':>8} {'brute ms':>9} {'speedup':>8}")
+    for n in args.counts:
+        (best, grid, brute), pairs = bench(bb, n, args.repeats)
+        entities = n + n // 10
+        print(f"{n:>8} {n // 10:>8} {best * 1000:>10.3f} {best * 1e6 / entities:>10.3f} {pairs:>6} "
+              f"{grid * 1000:>8.3f} {brute * 1000:>9.3f} {brute / grid:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
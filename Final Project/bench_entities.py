@@ -0,0 +1,49 @@
+# Measures Game.update cost with many live enemies for each entity backend.
+# Usage: python bench_entities.py [--counts 1000 10000] [--ticks 120]
+import argparse
+import random
+import time
+
+from bot_brawl import load_game
+
+
+def build_game(bb, backend, n_enemies, seed=0):
+    random.seed(seed)
+    game = bb.Game(clock=bb.SimClock(), backend=backend, seed=seed)
+    game.game_state = bb.SINGLE_PLAYER
+    game.reset_game()
+    # Keep the player alive so the whole run measures a full arena
+    game.players[0].health = float("inf")
+    for _ in range(n_enemies):
+        x = random.uniform(-bb.ARENA_WIDTH/2, bb.ARENA_WIDTH/2)
+        y = random.uniform(-bb.ARENA_HEIGHT/2 + 50, bb.ARENA_HEIGHT/2 - 50)
+        game.add_enemy(x, y)
+    return game
+
+
+def bench(bb, backend, n_enemies, ticks, dt=1/60.0):
+    game = build_game(bb, backend, n_enemies)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        game.clock.advance(dt)
+        game.update(dt)
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Brawl entity backend benchmark")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=120)
+    parser.add_argument("--backends", nargs="+", default=["objects", "numpy"])
+    args = parser.parse_args()
+
+    bb = load_game()
+    print(f"{'backend':>8} {'enemies':>8} {'ms/tick':>10} {'max Hz':>10}")
+    for backend in args.backends:
+        for n in args.counts:
+            per_tick = bench(bb, backend, n, args.ticks)
+            print(f"{backend:>8} {n:>8} {per_tick * 1000:>10.3f} {1 / per_tick:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
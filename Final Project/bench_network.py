@@ -0,0 +1,149 @@
+# Plays a networked match between a NetServer and two NetClients over real
+# 127.0.0.1 UDP sockets, with simulated latency, jitter and loss in front
+# of each socket. Everything runs on one virtual clock at 60 ticks/s, so a
+# minute of play takes a few seconds and the numbers are repeatable.
+# Clients press scripted random buttons.
+#
+# Per client it reports bandwidth both ways (payload + UDP/IP headers),
+# snapshot sizes, how far prediction was off when snapshots arrived and
+# how far the interpolated remote player was from the server's copy.
+# Usage: python bench_network.py [--seconds 60] [--latency-ms 50] [--jitter-ms 15]
+#            [--loss 0 0.05 0.2] [--snapshot-interval 3]
+import argparse
+import math
+import random
+
+import net_game
+from net_game import NetServer, NetClient, UdpTransport, LossyTransport, bb
+from input_queue import LEFT, RIGHT, JUMP, ATTACK
+from net_protocol import snapshot_baseline
+
+
+class Meter:
+    # Sits between a sender and its transport and notes every datagram
+    def __init__(self, inner):
+        self.inner = inner
+        self.address = inner.address
+        self.sizes = []
+        self.full = 0
+
+    def send(self, data, address):
+        self.sizes.append(len(data))
+        if snapshot_baseline(data) == 0:
+            self.full += 1
+        self.inner.send(data, address)
+
+    def receive(self):
+        return self.inner.receive()
+
+
+class ScriptedInput:
+    # Holds a random direction for a while, taps jump and attack now and then
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.held = 0
+        self.until = 0
+
+    def buttons(self, tick):
+        if tick >= self.until:
+            self.held = self.rng.choice([0, LEFT, RIGHT, LEFT, RIGHT])
+            self.until = tick + self.rng.randint(10, 60)
+        buttons = self.held
+        if self.rng.random() < 0.03:
+            buttons |= JUMP
+        if self.rng.random() < 0.05:
+            buttons |= ATTACK
+        return buttons
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def run(seconds, latency, jitter, loss, interval, seed=0):
+    clock = bb.SimClock()
+    server_socket = UdpTransport()
+    server_link = LossyTransport(server_socket, clock, latency, jitter, loss, seed)
+    server_meter = Meter(server_link)
+    game = bb.Game(seed=seed)
+    game.game_state = bb.MULTI_PLAYER
+    game.reset_game()
+    # Keep both players alive so the whole run is a full match
+    for p in game.players:
+        p.health = 10**6
+    server = NetServer(server_meter, game, interval)
+
+    clients = []
+    for player_id in (1, 2):
+        link = LossyTransport(UdpTransport(), clock, latency, jitter, loss, seed + player_id)
+        client = NetClient(link, server_socket.address, player_id, interp_delay=2 * interval)
+        clients.append((client, link, ScriptedInput(seed + 10 * player_id)))
+
+    truth = {}  # server tick -> {player_id: (x, y)}
+    errors = {1: [], 2: []}
+    jumps = {1: 0.0, 2: 0.0}
+    shown = {}
+    ticks = int(seconds / bb.FIXED_STEP)
+    for tick in range(ticks):
+        clock.advance(bb.FIXED_STEP)
+        for client, _, script in clients:
+            client.step(script.buttons(tick), bb.FIXED_STEP)
+            client.update_view()
+        server.step(bb.FIXED_STEP)
+        for p in game.players:
+            p.health = 10**6
+        truth[server.tick] = {p.player_id: (p.x, p.y) for p in game.players}
+        # Each client's view of the other player against the server's copy
+        # at the moment the client is showing
+        for client, _, _ in clients:
+            remote = client.game.players[2 - client.player_id]
+            at = round(client.server_time - client.interp_delay)
+            if at in truth and client.latest:
+                x, y = truth[at][remote.player_id]
+                errors[client.player_id].append(math.hypot(remote.x - x, remote.y - y))
+            last = shown.get(client.player_id)
+            if last is not None and tick > 60:
+                jumps[client.player_id] = max(jumps[client.player_id],
+                                              math.hypot(remote.x - last[0], remote.y - last[1]))
+            shown[client.player_id] = (remote.x, remote.y)
+
+    rows = []
+    for client, link, _ in clients:
+        up = sum(link.bytes_sent.values()) / seconds
+        down = server_link.bytes_sent.get(client.transport.address, 0) / seconds
+        rows.append((client.player_id, up, down, percentile(client.corrections, 50),
+                     percentile(client.corrections, 95), percentile(errors[client.player_id], 95),
+                     jumps[client.player_id]))
+    for s in [server_socket] + [link.inner for _, link, _ in clients]:
+        s.close()
+    sizes = server_meter.sizes
+    return rows, sum(sizes) / max(1, len(sizes)), max(sizes, default=0), server_meter.full, len(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Brawl network loopback benchmark")
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--latency-ms", type=float, default=50, help="one-way latency")
+    parser.add_argument("--jitter-ms", type=float, default=15)
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0, 0.05, 0.2])
+    parser.add_argument("--snapshot-interval", type=int, default=net_game.SNAPSHOT_INTERVAL,
+                        help="ticks between snapshots")
+    args = parser.parse_args()
+
+    print(f"{args.seconds:.0f}s match, {args.latency_ms:.0f}+-{args.jitter_ms:.0f} ms one way, "
+          f"snapshot every {args.snapshot_interval} ticks")
+    print(f"{'loss':>5} {'client':>6} {'up B/s':>8} {'down B/s':>9} {'snap avg':>9} {'max':>5} "
+          f"{'full':>9} {'corr p50':>9} {'p95':>6} {'remote err p95':>15} {'max step':>9}")
+    for loss in args.loss:
+        rows, mean, largest, full, sent = run(args.seconds, args.latency_ms / 1000,
+                                              args.jitter_ms / 1000, loss, args.snapshot_interval)
+        for player_id, up, down, c50, c95, err, jump in rows:
+            print(f"{loss:>5.0%} {player_id:>6} {up:>8.0f} {down:>9.0f} {mean:>9.1f} {largest:>5} "
+                  f"{full:>4}/{sent:<4} {c50:>9.2f} {c95:>6.2f} {err:>15.2f} {jump:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Compares the cost of PlatformTable with the original per-platform
+# landing loop as the number of platforms grows. The test suite checks
+# they agree (tests/test_platform_table.py, whose scenes this reuses).
+# Usage: python bench_platforms.py [--platforms 8 100 1000] [--bodies 10000]
+import argparse
+import random
+import time
+
+from bot_brawl import load_game
+from platform_table import PlatformTable, np
+from tests.test_platform_table import reference_land, random_arena, random_bodies
+
+
+def bench(bb, n_platforms, n_bodies, rng):
+    platforms = random_arena(bb, n_platforms, rng)
+    half_width = foot = bb.ENEMY_SIZE/2
+    table = PlatformTable(platforms, half_width, bb.PLATFORM_HEIGHT)
+    bodies = random_bodies(platforms, n_bodies, foot, bb.PLATFORM_HEIGHT, rng)
+
+    start = time.perf_counter()
+    for x, y, vy in bodies:
+        reference_land(platforms, x, y, vy, half_width, foot, bb.PLATFORM_HEIGHT)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for x, y, vy in bodies:
+        table.land(x, y, vy, foot)
+    single = time.perf_counter() - start
+
+    batch = float("nan")
+    if np is not None:
+        xs, ys, vys = (np.array(col) for col in zip(*bodies))
+        start = time.perf_counter()
+        table.land_batch(xs, ys, vys, foot)
+        batch = time.perf_counter() - start
+    return loop, single, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Brawl platform landing benchmark")
+    parser.add_argument("--platforms", type=int, nargs="+", default=[8, 100, 1000])
+    parser.add_argument("--bodies", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bb = load_game()
+    rng = random.Random(args.seed)
+    print(f"{'platforms':>9} {'loop us':>10} {'bisect us':>10} {'batch us':>10}  (per body)")
+    for n in args.platforms:
+        loop, single, batch = bench(bb, n, args.bodies, rng)
+        scale = 1e6 / args.bodies
+        print(f"{n:>9} {loop * scale:>10.3f} {single * scale:>10.3f} {batch * scale:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Frame-time comparison of Bot Brawl draw paths. Needs a display/GL context.
+# Usage: python bench_render.py [--frames 300] [--enemies 200] [--platforms 60]
+import argparse
+import os
+import random
+import time
+
+# Don't let vsync cap the measured frame rate
+os.environ.setdefault("vblank_mode", "0")
+os.environ.setdefault("__GL_SYNC_TO_VBLANK", "0")
+
+from OpenGL.GL import glFinish
+from OpenGL.GLUT import (glutInit, glutInitDisplayMode, glutInitWindowSize, glutCreateWindow,
+                         glutDisplayFunc, glutMainLoop, glutLeaveMainLoop,
+                         GLUT_DOUBLE, GLUT_RGB, GLUT_DEPTH)
+
+from bot_brawl import load_game
+
+
+def build_scene(bb, n_enemies, n_platforms, seed=0):
+    random.seed(seed)
+    game = bb.Game(clock=bb.SimClock(), seed=seed)
+    game.game_state = bb.SINGLE_PLAYER
+    game.reset_game()
+    for _ in range(n_platforms - len(game.platforms)):
+        x = random.uniform(-bb.ARENA_WIDTH, bb.ARENA_WIDTH)
+        y = random.uniform(-bb.ARENA_HEIGHT/2, bb.ARENA_HEIGHT/2)
+        game.platforms.append(bb.Platform(x, y, random.choice([100, 150, 200])))
+    game.build_platform_tables()
+    for weapon_type in (bb.SWORD, bb.GUN, bb.GRENADE):
+        weapon = bb.Weapon(random.uniform(-400, 400), random.uniform(-200, 200), 0)
+        weapon.type = weapon_type
+        game.weapons.append(weapon)
+    for _ in range(n_enemies):
+        game.add_enemy(random.uniform(-bb.ARENA_WIDTH/2, bb.ARENA_WIDTH/2),
+                       random.uniform(-bb.ARENA_HEIGHT/2, bb.ARENA_HEIGHT/2))
+    for _ in range(n_enemies // 4):
+        game.add_bullet(random.uniform(-400, 400), random.uniform(-250, 250),
+                        random.choice([-1, 1]), 1)
+    game.players[0].weapon = bb.GUN
+    return game
+
+
+def configurations(bb):
+    # (name, setup) pairs; setup switches the draw path under test
+    def immediate():
+        bb.geometry.enabled = False
+        bb.batches.enabled = False
+
+    def display_lists():
+        bb.geometry.enabled = True
+        bb.batches.enabled = False
+
+    def batched():
+        bb.geometry.enabled = True
+        bb.batches.enabled = True
+
+    return [("immediate", immediate), ("display lists", display_lists), ("batched", batched)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Brawl render benchmark")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--enemies", type=int, default=200)
+    parser.add_argument("--platforms", type=int, default=60)
+    args = parser.parse_args()
+
+    bb = load_game()
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
+    glutInitWindowSize(bb.SCREEN_WIDTH, bb.SCREEN_HEIGHT)
+    glutCreateWindow(b"Bot Brawl render benchmark")
+    game = build_scene(bb, args.enemies, args.platforms)
+    results = []
+
+    def display():
+        for name, setup in configurations(bb):
+            setup()
+            for _ in range(args.warmup):
+                game.draw()
+            glFinish()
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                game.draw()
+            glFinish()
+            results.append((name, (time.perf_counter() - start) / args.frames, bb.lod.triangles,
+                            bb.frustum.drawn, bb.frustum.culled))
+        glutLeaveMainLoop()
+
+    glutDisplayFunc(display)
+    glutMainLoop()
+
+    print(f"{'path':>16} {'ms/frame':>10} {'fps':>8} {'sphere tris':>12} {'drawn':>7} {'culled':>7}")
+    for name, frame_time, triangles, drawn, culled in results:
+        print(f"{name:>16} {frame_time * 1000:>10.3f} {1 / frame_time:>8.0f} {triangles:>12}"
+              f" {drawn:>7} {culled:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# "Final Project_3D.py" can't be imported by name because of the space in
+# the filename, so the headless tools load the game module through here.
+import importlib.util
+import os
+import sys
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_PATH = os.path.join(GAME_DIR, "Final Project_3D.py")
+MODULE_NAME = "bot_brawl_game"
+
+
+def load_game():
+    module = sys.modules.get(MODULE_NAME)
+    if module is not None:
+        return module
+    # The game imports its helper modules (spatial_hash, ...) as siblings
+    if GAME_DIR not in sys.path:
+        sys.path.insert(0, GAME_DIR)
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, GAME_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,154 @@
+# Binary checkpoints of a running Game, for rollback, crash recovery and
+# reproducible benchmarks. A checkpoint is a list of named sections, each
+# a flat column of one struct type: the fields of one entity kind, the
+# game's scalars, the state of one random stream.
+#
+# File layout (little endian): HEADER, n_sections SECTION entries, then
+# each section's data, 8-byte aligned, at the offset its entry gives.
+# Encoding writes each column straight from its buffer (a NumPy store's
+# arrays are not copied first). Decoding returns memoryviews into the
+# source bytes or into a memory-mapped file, so nothing is copied until
+# a column is read.
+import mmap
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # only Checkpoint.array needs NumPy
+    np = None
+
+MAGIC = b"BBCP"
+VERSION = 1
+BACKENDS = ("objects", "numpy")
+
+# magic, version, backend, section count
+HEADER = struct.Struct("<4sHBxI")
+# name, struct type code, item count, byte offset of the data
+SECTION = struct.Struct("<32scxxxIQ")
+ITEM_SIZES = {b"d": 8, b"q": 8, b"Q": 8, b"I": 4, b"B": 1}
+NUMPY_TYPES = {b"d": "<f8", b"q": "<i8", b"Q": "<u8", b"I": "<u4", b"B": "u1"}
+
+# Entity fields saved per kind, with their struct type: d float, q int,
+# B bool. Derived and cosmetic-only values (colours, bound radii) are
+# rebuilt on restore.
+KINDS = {
+    "platforms": (("x", "d"), ("y", "d"), ("width", "d")),
+    "players": (("x", "d"), ("y", "d"), ("prev_x", "d"), ("prev_y", "d"), ("z", "d"),
+                ("vx", "d"), ("vy", "d"), ("health", "d"), ("weapon_time", "d"),
+                ("swing_angle", "d"), ("last_shot", "d"), ("hit_effect", "d"),
+                ("player_id", "q"), ("weapon", "q"), ("swing_direction", "q"),
+                ("facing_right", "B"), ("sword_swinging", "B"), ("is_jumping", "B"),
+                ("on_ground", "B")),
+    "enemies": (("x", "d"), ("y", "d"), ("prev_x", "d"), ("prev_y", "d"), ("z", "d"),
+                ("vx", "d"), ("vy", "d"), ("size", "d"), ("attack_cooldown", "d"),
+                ("wing_phase", "d"), ("body_angle", "d"), ("eye_offset", "d"), ("speed", "d"),
+                ("net_id", "q"), ("on_ground", "B")),
+    "bullets": (("x", "d"), ("y", "d"), ("prev_x", "d"), ("prev_y", "d"), ("z", "d"),
+                ("vx", "d"), ("lifetime", "d"), ("owner_id", "q"), ("net_id", "q")),
+    "grenades": (("x", "d"), ("y", "d"), ("prev_x", "d"), ("prev_y", "d"), ("z", "d"),
+                 ("vx", "d"), ("vy", "d"), ("timer", "d"), ("rotation", "d"),
+                 ("owner_id", "q"), ("net_id", "q"), ("exploded", "B")),
+    "explosions": (("x", "d"), ("y", "d"), ("z", "d"), ("radius", "d"), ("max_radius", "d"),
+                   ("growth_rate", "d"), ("net_id", "q"), ("active", "B")),
+    "weapons": (("x", "d"), ("y", "d"), ("z", "d"), ("spawn_time", "d"), ("pulse", "d"),
+                ("rotation", "d"), ("type", "q"), ("net_id", "q"), ("growing", "B")),
+}
+
+
+def as_bytes(code, values):
+    # A flat byte view of a column: buffers (array, NumPy) are used as they
+    # are, anything else is packed into an array first
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = memoryview(array(code, values))
+    return view.cast("B") if view.format != "B" or view.ndim != 1 else view
+
+
+def layout(sections):
+    # (header bytes, [data views]) for [(name, code, values), ...]
+    entries = []
+    datas = []
+    offset = HEADER.size + SECTION.size * len(sections)
+    for name, code, values in sections:
+        code = code.encode()
+        data = as_bytes(code.decode(), values)
+        offset += -offset % 8
+        entries.append(SECTION.pack(name.encode(), code, len(data) // ITEM_SIZES[code], offset))
+        datas.append(data)
+        offset += len(data)
+    return entries, datas
+
+
+def encode(sections, backend="objects"):
+    entries, datas = layout(sections)
+    out = bytearray(HEADER.pack(MAGIC, VERSION, BACKENDS.index(backend), len(sections)))
+    for entry in entries:
+        out += entry
+    for data in datas:
+        out += bytes(-len(out) % 8)
+        out += data
+    return bytes(out)
+
+
+def save(path, sections, backend="objects"):
+    # Streams the sections to a file without building the whole checkpoint
+    # in memory first
+    entries, datas = layout(sections)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BACKENDS.index(backend), len(sections)))
+        for entry in entries:
+            f.write(entry)
+        written = HEADER.size + SECTION.size * len(sections)
+        for data in datas:
+            f.write(bytes(-written % 8))
+            written += -written % 8
+            f.write(data)
+            written += len(data)
+
+
+class Checkpoint:
+    def __init__(self, buffer, source=None):
+        # buffer: bytes, bytearray or mmap holding an encoded checkpoint
+        self.buffer = buffer
+        self.source = source
+        magic, version, backend, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} Bot Brawl checkpoint")
+        self.backend = BACKENDS[backend]
+        self.sections = {}  # name -> (code, count, offset)
+        for i in range(count):
+            name, code, n, offset = SECTION.unpack_from(buffer, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b"\0").decode()] = (code, n, offset)
+
+    @classmethod
+    def open(cls, path):
+        # Memory-maps the file; sections are paged in as they are read
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, mapped)
+
+    def close(self):
+        # Only needed for open(); views taken from the checkpoint must be
+        # released first
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+    def __contains__(self, name):
+        return name in self.sections
+
+    def column(self, name):
+        # Zero-copy memoryview of one section, typed by its struct code
+        code, n, offset = self.sections[name]
+        size = ITEM_SIZES[code]
+        return memoryview(self.buffer)[offset:offset + n * size].cast(code.decode())
+
+    def array(self, name):
+        # Zero-copy read-only NumPy view of one section
+        code, n, offset = self.sections[name]
+        return np.frombuffer(self.buffer, dtype=NUMPY_TYPES[code], count=n, offset=offset)
+
+    def names(self, prefix):
+        return [name for name in self.sections if name.startswith(prefix)]
@@ -0,0 +1,59 @@
+# Free-list pools for short-lived entities (bullets, grenades, explosions).
+# A released object is kept and re-initialised in place by the next
+# acquire(), so once the pool has warmed up, spawning allocates nothing.
+# The free list holds at most `capacity` objects; extras are left to the GC.
+from itertools import repeat
+
+
+class Pool:
+    def __init__(self, cls, capacity=256):
+        self.cls = cls
+        self.capacity = capacity
+        self.free = []
+        self.live = 0
+        self.high_water = 0  # most objects live at once
+        self.allocated = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        # Same arguments as cls(*args)
+        if self.free:
+            obj = self.free.pop()
+            obj.__init__(*args)
+            self.reused += 1
+        else:
+            obj = self.cls(*args)
+            self.allocated += 1
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return obj
+
+    def take(self, n):
+        # n objects whose every field the caller is about to set, as a
+        # checkpoint restore does: reused ones are not re-initialised and
+        # new ones are made without calling __init__
+        k = min(n, len(self.free))
+        objs = self.free[len(self.free) - k:]
+        del self.free[len(self.free) - k:]
+        objs += map(self.cls.__new__, repeat(self.cls, n - k))
+        self.reused += k
+        self.allocated += n - k
+        self.live += n
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return objs
+
+    def release(self, obj):
+        # obj must have come from acquire() and not be used afterwards
+        self.live -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(obj)
+
+    def release_all(self, objs):
+        for obj in objs:
+            self.release(obj)
+
+    def stats(self):
+        return {"live": self.live, "high_water": self.high_water,
+                "allocated": self.allocated, "reused": self.reused}
@@ -0,0 +1,129 @@
+# Structure-of-arrays entity storage for the optional NumPy backend.
+# Each field is one contiguous array; rows [0, count) are live. Entities are
+# exposed to the rest of the game through view objects that read and write
+# their row, so draw code written against the plain classes keeps working.
+# Views of removed rows go on a free list and are reused by add().
+try:
+    import numpy as np
+except ImportError:  # the NumPy backend is optional
+    np = None
+
+
+def store_field(name):
+    def get(self):
+        return getattr(self.store, name)[self.index].item()
+
+    def set(self, value):
+        getattr(self.store, name)[self.index] = value
+
+    return property(get, set)
+
+
+def view_class(base, fields, **constants):
+    # Subclass of an entity class whose fields live in an ArrayStore row.
+    # The store steps every row at once, so update() only reports the
+    # result the store computed for this row.
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def update(self, *args):
+        return bool(self.store.alive[self.index])
+
+    namespace = {"__init__": __init__, "update": update}
+    for name, _ in fields:
+        namespace[name] = store_field(name)
+    namespace.update(constants)
+    return type(base.__name__ + "View", (base,), namespace)
+
+
+class ArrayStore:
+    fields = ()
+    view_cls = None
+
+    def __init__(self, capacity=64, rng=None):
+        if np is None:
+            raise ImportError("the numpy entity backend needs numpy installed")
+        self.count = 0
+        self.capacity = capacity
+        self.views = []
+        self.free = []
+        self.high_water = 0
+        self.allocated = 0
+        self.reused = 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+        for name, dtype in self.fields:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def grow(self):
+        self.capacity *= 2
+        for name, dtype in self.fields:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, **values):
+        if self.count == self.capacity:
+            self.grow()
+        index = self.count
+        for name, _ in self.fields:
+            getattr(self, name)[index] = values.get(name, 0)
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        view = self.take_view(index)
+        self.views.append(view)
+        return view
+
+    def take_view(self, index):
+        if self.free:
+            view = self.free.pop()
+            view.index = index
+            self.reused += 1
+        else:
+            view = self.view_cls(self, index)
+            self.allocated += 1
+        return view
+
+    def restore(self, count, columns):
+        # Replaces every row with count rows copied from columns, a dict of
+        # field name -> array or scalar; fields not given are zeroed.
+        # Returns the views of the new rows, in row order.
+        self.clear()
+        while self.capacity < count:
+            self.grow()
+        for name, _ in self.fields:
+            getattr(self, name)[:count] = columns.get(name, 0)
+        self.views = [self.take_view(index) for index in range(count)]
+        self.count = count
+        if count > self.high_water:
+            self.high_water = count
+        return list(self.views)
+
+    def sync(self, survivors):
+        # Compacts the arrays down to the views still in the game's list.
+        # survivors must keep the order the views were added in.
+        if len(survivors) == self.count:
+            return
+        keep = np.fromiter((v.index for v in survivors), dtype=np.intp, count=len(survivors))
+        n = len(keep)
+        for name, _ in self.fields:
+            column = getattr(self, name)
+            column[:n] = column[keep]
+        alive = set(survivors)
+        self.free.extend(view for view in self.views if view not in alive)
+        for i, view in enumerate(survivors):
+            view.index = i
+        self.views = list(survivors)
+        self.count = n
+
+    def clear(self):
+        self.free.extend(self.views)
+        self.views = []
+        self.count = 0
+
+    def stats(self):
+        # Same keys as entity_pool.Pool.stats()
+        return {"live": self.count, "high_water": self.high_water,
+                "allocated": self.allocated, "reused": self.reused}
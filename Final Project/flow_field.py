@@ -0,0 +1,139 @@
+# Grid flow field that steers enemies around platforms towards a target.
+# The arena is cut into square cells. A cell is blocked if its centre lies
+# in a platform slab, widened by the body's half size to the sides and
+# below (bodies resting on top stay free). A Dijkstra search from the
+# target's cell gives each free cell its path length to the target, and
+# each cell keeps a unit vector towards its cheapest neighbour. An enemy
+# just reads the vector for its cell. The search only reruns when the
+# target moves to another cell, so pathing costs O(cells) per target move
+# plus O(enemies) per tick.
+#
+# A (0, 0) vector means "head straight for the target". That covers cells
+# whose path is no longer than the unobstructed grid distance, so the field
+# only bends movement where a platform is in the way. It also covers the
+# target's own cell, blocked cells and cells the target can't be reached
+# from.
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError:  # only the *_batch lookups need NumPy
+    np = None
+
+SQRT2 = math.sqrt(2)
+# Column step, row step, cost
+NEIGHBOURS = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+              (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2))
+
+
+class FlowField:
+    def __init__(self, left, bottom, width, height, cell_size):
+        self.left = left
+        self.bottom = bottom
+        self.cell_size = cell_size
+        self.cols = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+        n = self.cols * self.rows
+        self.blocked = [False] * n
+        self.distance = [math.inf] * n
+        self.dir_x = [0.0] * n
+        self.dir_y = [0.0] * n
+        self.target_cell = None
+        self.builds = 0
+
+    def block_platforms(self, platforms, half_size, thickness):
+        # Must be called again whenever the platforms change
+        for row in range(self.rows):
+            cy = self.bottom + (row + 0.5) * self.cell_size
+            for col in range(self.cols):
+                cx = self.left + (col + 0.5) * self.cell_size
+                self.blocked[row * self.cols + col] = any(
+                    p.x - p.width/2 - half_size <= cx <= p.x + p.width/2 + half_size and
+                    p.y - thickness/2 - half_size <= cy <= p.y + thickness/2
+                    for p in platforms)
+        self.target_cell = None
+
+    def cell_of(self, x, y):
+        # Positions outside the grid use the nearest edge cell
+        col = min(self.cols - 1, max(0, int((x - self.left) // self.cell_size)))
+        row = min(self.rows - 1, max(0, int((y - self.bottom) // self.cell_size)))
+        return row * self.cols + col
+
+    def update(self, x, y):
+        # Re-targets the field at (x, y); returns True if it was rebuilt
+        cell = self.cell_of(x, y)
+        if cell == self.target_cell:
+            return False
+        self.target_cell = cell
+        self.build(cell)
+        return True
+
+    def build(self, target):
+        cols, rows = self.cols, self.rows
+        blocked = self.blocked
+        distance = [math.inf] * (cols * rows)
+        distance[target] = 0.0
+        heap = [(0.0, target)]
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d > distance[cell]:
+                continue
+            row, col = divmod(cell, cols)
+            for dc, dr, cost in NEIGHBOURS:
+                c, r = col + dc, row + dr
+                if not (0 <= c < cols and 0 <= r < rows):
+                    continue
+                other = r * cols + c
+                # No cutting corners past a blocked cell
+                if blocked[other] or (dc and dr and (blocked[row * cols + c] or blocked[r * cols + col])):
+                    continue
+                if d + cost < distance[other]:
+                    distance[other] = d + cost
+                    heapq.heappush(heap, (d + cost, other))
+
+        dir_x = [0.0] * (cols * rows)
+        dir_y = [0.0] * (cols * rows)
+        target_row, target_col = divmod(target, cols)
+        for cell, d in enumerate(distance):
+            if d == 0.0 or d == math.inf:
+                continue
+            row, col = divmod(cell, cols)
+            across, up = abs(col - target_col), abs(row - target_row)
+            if d <= max(across, up) + (SQRT2 - 1) * min(across, up) + 1e-9:
+                continue
+            best, step = d, None
+            for dc, dr, cost in NEIGHBOURS:
+                c, r = col + dc, row + dr
+                if not (0 <= c < cols and 0 <= r < rows):
+                    continue
+                if dc and dr and (blocked[row * cols + c] or blocked[r * cols + col]):
+                    continue
+                if distance[r * cols + c] < best:
+                    best, step = distance[r * cols + c], (dc, dr, cost)
+            if step is not None:
+                dir_x[cell] = step[0] / step[2]
+                dir_y[cell] = step[1] / step[2]
+        self.distance = distance
+        self.dir_x = dir_x
+        self.dir_y = dir_y
+        if np is not None:
+            self.dir_x_array = np.array(dir_x)
+            self.dir_y_array = np.array(dir_y)
+        self.builds += 1
+
+    def direction(self, x, y):
+        # cell_of inlined; this runs once per enemy per tick
+        col = int((x - self.left) // self.cell_size)
+        row = int((y - self.bottom) // self.cell_size)
+        col = 0 if col < 0 else self.cols - 1 if col >= self.cols else col
+        row = 0 if row < 0 else self.rows - 1 if row >= self.rows else row
+        cell = row * self.cols + col
+        return self.dir_x[cell], self.dir_y[cell]
+
+    def direction_batch(self, x, y):
+        # direction() for arrays of positions; returns (dir_x, dir_y) arrays
+        col = np.clip((x - self.left) // self.cell_size, 0, self.cols - 1).astype(np.intp)
+        row = np.clip((y - self.bottom) // self.cell_size, 0, self.rows - 1).astype(np.intp)
+        cell = row * self.cols + col
+        return self.dir_x_array[cell], self.dir_y_array[cell]
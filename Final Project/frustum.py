@@ -0,0 +1,76 @@
+# View-frustum culling against bounding spheres. The six planes are built
+# from the same parameters passed to gluPerspective and gluLookAt, with
+# normals pointing into the frustum, so a sphere is outside as soon as its
+# centre is more than its radius behind any plane.
+import math
+
+try:
+    import numpy as np
+except ImportError:  # only the batch test needs NumPy
+    np = None
+
+
+def normalize(v):
+    length = math.sqrt(v[0]*v[0] + v[1]*v[1] + v[2]*v[2])
+    return (v[0]/length, v[1]/length, v[2]/length)
+
+
+def cross(a, b):
+    return (a[1]*b[2] - a[2]*b[1], a[2]*b[0] - a[0]*b[2], a[0]*b[1] - a[1]*b[0])
+
+
+def dot(a, b):
+    return a[0]*b[0] + a[1]*b[1] + a[2]*b[2]
+
+
+class Frustum:
+    def __init__(self):
+        self.planes = []
+        self.drawn = 0
+        self.culled = 0
+        self.last_frame = (0, 0)
+
+    def set_camera(self, eye, target, up, fovy, aspect, near, far):
+        f = normalize((target[0] - eye[0], target[1] - eye[1], target[2] - eye[2]))
+        s = normalize(cross(f, up))
+        u = cross(s, f)
+        tan_v = math.tan(math.radians(fovy) / 2)
+        tan_h = tan_v * aspect
+        normals = [
+            f,
+            (-f[0], -f[1], -f[2]),
+            normalize(tuple(f[i]*tan_h + s[i] for i in range(3))),  # left
+            normalize(tuple(f[i]*tan_h - s[i] for i in range(3))),  # right
+            normalize(tuple(f[i]*tan_v + u[i] for i in range(3))),  # bottom
+            normalize(tuple(f[i]*tan_v - u[i] for i in range(3))),  # top
+        ]
+        # Plane i keeps points p with dot(n, p) + d >= 0
+        offsets = [-dot(f, eye) - near, dot(f, eye) + far] + [-dot(n, eye) for n in normals[2:]]
+        self.planes = list(zip(normals, offsets))
+        if np is not None:
+            self.plane_array = np.array([n + (d,) for n, d in self.planes])
+
+    def begin_frame(self):
+        self.last_frame = (self.drawn, self.culled)
+        self.drawn = 0
+        self.culled = 0
+
+    def visible(self, x, y, z, radius):
+        for (nx, ny, nz), d in self.planes:
+            if nx*x + ny*y + nz*z + d < -radius:
+                self.culled += 1
+                return False
+        self.drawn += 1
+        return True
+
+    def visible_batch(self, x, y, z, radius):
+        # Boolean mask over arrays of sphere centres (radius may be an array)
+        if len(x) == 0:
+            return np.zeros(0, dtype=bool)
+        p = self.plane_array
+        dist = (np.outer(x, p[:, 0]) + np.outer(y, p[:, 1]) + np.outer(z, p[:, 2]) + p[:, 3])
+        keep = np.all(dist >= -np.asarray(radius, dtype=float).reshape(-1, 1), axis=1)
+        drawn = int(np.count_nonzero(keep))
+        self.drawn += drawn
+        self.culled += len(keep) - drawn
+        return keep
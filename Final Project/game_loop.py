@@ -0,0 +1,64 @@
+# Fixed-timestep loop for GLUT's idle callback. Real elapsed time goes into
+# an accumulator that is drained in whole simulation steps, so the world
+# always advances by the same dt no matter how fast frames are drawn.
+# Whatever is left over becomes alpha, the fraction of a step to blend
+# between the previous and current state when rendering.
+import time
+
+
+class FixedStepLoop:
+    def __init__(self, step=1/60.0, max_steps=5, max_fps=0,
+                 clock=time.perf_counter, sleep=time.sleep):
+        # max_steps caps catch-up per frame; after a long stall the backlog
+        # is dropped instead of simulated (the "spiral of death").
+        # max_fps=0 leaves the frame rate unlimited.
+        self.step = step
+        self.max_steps = max_steps
+        self.max_fps = max_fps
+        self.clock = clock
+        self.sleep = sleep
+        self.accumulator = 0.0
+        self.last = None
+        self.next_frame = None
+        self.alpha = 1.0
+        self.steps = 0
+        self.dropped = 0.0  # seconds of simulation skipped by the cap
+
+    def advance(self, update):
+        # Calls update(step) as many times as real time allows; returns the
+        # number of steps taken this frame
+        now = self.clock()
+        if self.last is not None:
+            self.accumulator += now - self.last
+        self.last = now
+        steps = 0
+        while self.accumulator >= self.step and steps < self.max_steps:
+            update(self.step)
+            self.accumulator -= self.step
+            steps += 1
+        if self.accumulator >= self.step:
+            behind = self.accumulator - self.accumulator % self.step
+            self.dropped += behind
+            self.accumulator -= behind
+        self.steps += steps
+        self.alpha = self.accumulator / self.step
+        return steps
+
+    def throttle(self):
+        # Sleeps until the next frame is due when max_fps is set
+        if not self.max_fps:
+            return
+        frame = 1.0 / self.max_fps
+        now = self.clock()
+        if self.next_frame is None or now > self.next_frame + frame:
+            self.next_frame = now  # first frame, or too far behind to catch up
+        elif now < self.next_frame:
+            self.sleep(self.next_frame - now)
+        self.next_frame += frame
+
+    def reset(self):
+        # Forget elapsed time, e.g. after a pause, so it is not simulated
+        self.accumulator = 0.0
+        self.last = None
+        self.next_frame = None
+        self.alpha = 1.0
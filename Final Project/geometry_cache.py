@@ -0,0 +1,43 @@
+# Compiles immediate-mode mesh functions into OpenGL display lists so a
+# mesh is sent vertex by vertex once and replayed with a single glCallList.
+# Keys are tuples whose first item is the mesh kind, e.g. ("platform", 200).
+from OpenGL.GL import glGenLists, glNewList, glEndList, glCallList, glDeleteLists, GL_COMPILE
+
+
+class GeometryCache:
+    def __init__(self):
+        self.lists = {}
+        self.enabled = True
+        self.builds = 0
+
+    def draw(self, key, build, *args):
+        # build(*args) issues the mesh's GL calls; it runs once per key
+        if not self.enabled:
+            build(*args)
+            return
+        handle = self.lists.get(key)
+        if handle is None:
+            handle = glGenLists(1)
+            glNewList(handle, GL_COMPILE)
+            build(*args)
+            glEndList()
+            self.lists[key] = handle
+            self.builds += 1
+        glCallList(handle)
+
+    def invalidate(self, kind, *params):
+        # Drops the lists for one key, or for every key of a kind when no
+        # params are given. Call this when a mesh's dimensions change.
+        if params:
+            keys = [(kind,) + params]
+        else:
+            keys = [key for key in self.lists if key[0] == kind]
+        for key in keys:
+            handle = self.lists.pop(key, None)
+            if handle is not None:
+                glDeleteLists(handle, 1)
+
+    def clear(self):
+        for handle in self.lists.values():
+            glDeleteLists(handle, 1)
+        self.lists.clear()
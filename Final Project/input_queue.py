@@ -0,0 +1,82 @@
+# Raw input events and the per-player commands they become. Input
+# callbacks only push (kind, code, state) into a fixed-size ring, stamped
+# with the time it arrived. At the start of each fixed step the game drains
+# the ring in arrival order and folds player keys into one PlayerCommand
+# per player, so input is applied in lock-step with the simulation. Live
+# play, replays, bots and the network server all feed the same path.
+import time
+from array import array
+
+# Buttons of a command; the network protocol sends the same bits
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+ATTACK = 8
+
+QUEUE_SIZE = 256
+
+
+class InputQueue:
+    def __init__(self, size=QUEUE_SIZE, clock=time.perf_counter):
+        self.kinds = array("B", bytes(size))
+        self.codes = array("H", bytes(2 * size))
+        self.states = array("B", bytes(size))
+        self.stamps = array("d", bytes(8 * size))
+        self.size = size
+        self.clock = clock
+        self.head = 0  # events ever read
+        self.tail = 0  # events ever pushed
+        self.dropped = 0  # oldest events overwritten while the ring was full
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def push(self, kind, code, state=0):
+        if self.tail - self.head == self.size:
+            self.head += 1
+            self.dropped += 1
+        i = self.tail % self.size
+        self.kinds[i] = kind
+        self.codes[i] = code
+        self.states[i] = state
+        self.stamps[i] = self.clock()
+        self.tail += 1
+
+    def drain(self):
+        # Queued events as (kind, code, state, stamp), oldest first
+        while self.head < self.tail:
+            i = self.head % self.size
+            self.head += 1
+            yield self.kinds[i], self.codes[i], self.states[i], self.stamps[i]
+
+
+class PlayerCommand:
+    # What one player does in one tick: buttons held when the tick starts,
+    # buttons pressed since the last tick (so a tap shorter than a tick
+    # still counts), and the arrival time of the earliest press
+    __slots__ = ("held", "pressed", "stamp")
+
+    def __init__(self):
+        self.held = 0
+        self.pressed = 0
+        self.stamp = None
+
+    def press(self, button, stamp):
+        self.held |= button
+        self.pressed |= button
+        if self.stamp is None:
+            self.stamp = stamp
+
+    def release(self, button):
+        self.held &= ~button
+
+    def clear(self):
+        # A new match starts with no buttons down
+        self.held = 0
+        self.pressed = 0
+        self.stamp = None
+
+    def consume(self):
+        # Ends the tick: presses are used up, held buttons stay held
+        self.pressed = 0
+        self.stamp = None
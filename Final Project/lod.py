@@ -0,0 +1,79 @@
+# Level-of-detail selection for spheres. The projected radius in pixels is
+# estimated from the perspective camera and used to pick one of a few
+# tessellations, so small or distant spheres cost a handful of triangles.
+import math
+
+from OpenGL.GLUT import glutSolidSphere, glutWireSphere
+
+try:
+    import numpy as np
+except ImportError:  # only the batch selection needs NumPy
+    np = None
+
+# (largest projected radius in pixels, slices, stacks), smallest first;
+# anything bigger than the last threshold uses the last level
+DEFAULT_LEVELS = (
+    (3, 6, 4),
+    (8, 8, 6),
+    (20, 10, 8),
+    (60, 14, 12),
+    (float("inf"), 20, 20),
+)
+
+
+def sphere_triangles(slices, stacks):
+    # Triangles glutSolidSphere emits: two fans at the poles plus quads
+    return 2 * slices * (stacks - 1)
+
+
+class SphereLOD:
+    def __init__(self, levels=DEFAULT_LEVELS):
+        self.set_levels(levels)
+        self.eye = (0.0, 0.0, 1.0)
+        self.focal = 1.0
+        self.triangles = 0
+        self.last_frame_triangles = 0
+
+    def set_levels(self, levels):
+        self.levels = sorted(levels)
+        self.thresholds = [level[0] for level in self.levels]
+
+    def set_camera(self, eye, fovy, viewport_height):
+        # Same parameters as the gluPerspective/gluLookAt pair in use
+        self.eye = eye
+        self.focal = (viewport_height / 2) / math.tan(math.radians(fovy) / 2)
+
+    def begin_frame(self):
+        self.last_frame_triangles = self.triangles
+        self.triangles = 0
+
+    def pixel_radius(self, radius, x, y, z):
+        ex, ey, ez = self.eye
+        distance = math.sqrt((x - ex)**2 + (y - ey)**2 + (z - ez)**2)
+        return radius * self.focal / max(distance, 1e-6)
+
+    def select(self, radius, x, y, z):
+        pixels = self.pixel_radius(radius, x, y, z)
+        for limit, slices, stacks in self.levels:
+            if pixels <= limit:
+                return slices, stacks
+        return self.levels[-1][1:]
+
+    def select_batch(self, instances):
+        # Level index per row of [x, y, z, radius, ...] instance data
+        ex, ey, ez = self.eye
+        d = np.sqrt((instances[:, 0] - ex)**2 + (instances[:, 1] - ey)**2 +
+                    (instances[:, 2] - ez)**2)
+        pixels = instances[:, 3] * self.focal / np.maximum(d, 1e-6)
+        level = np.searchsorted(self.thresholds, pixels, side="left")
+        return np.minimum(level, len(self.levels) - 1)
+
+    def solid_sphere(self, radius, x, y, z):
+        # glutSolidSphere at the current matrix; x/y/z is its world position
+        slices, stacks = self.select(radius, x, y, z)
+        self.triangles += sphere_triangles(slices, stacks)
+        glutSolidSphere(radius, slices, stacks)
+
+    def wire_sphere(self, radius, x, y, z):
+        slices, stacks = self.select(radius, x, y, z)
+        glutWireSphere(radius, slices, stacks)
@@ -0,0 +1,507 @@
+# Networked two-player Bot Brawl over UDP. The server owns the only real
+# Game and steps it at FIXED_STEP; clients send their buttons every tick
+# and receive delta-encoded snapshots (see net_protocol.py).
+#
+# Clients predict their own Player by running Player.update on their
+# inputs straight away. When a snapshot arrives they reset it to the
+# server's copy and replay the inputs the server hasn't processed yet.
+# Everything else is drawn interp_delay ticks in the past, blended
+# between the two snapshots around that time.
+#
+# Usage: python net_game.py server [--port 27960]
+#        python net_game.py client --player 1 [--host 127.0.0.1] [--port 27960]
+import argparse
+import heapq
+import math
+import random
+import socket
+import struct
+import time
+
+from bot_brawl import load_game
+from input_queue import LEFT, RIGHT, JUMP, ATTACK  # button bits, as in a PlayerCommand
+from net_protocol import (INPUT, SNAPSHOT, INPUT_REDUNDANCY, UDP_OVERHEAD, MAX_DATAGRAM, INPUT_HEADER,
+                          SNAPSHOT_HEADER, encode_input, decode_input, encode_snapshot, decode_snapshot,
+                          snapshot_baseline)
+
+bb = load_game()
+
+DEFAULT_PORT = 27960
+SNAPSHOT_INTERVAL = 3  # ticks between snapshots, 20 Hz at 60 Hz ticks
+HISTORY = 64  # snapshots kept as possible delta baselines
+INPUT_BUFFER = 2  # inputs queued before the server starts consuming
+MAX_INPUT_BACKLOG = 8  # older queued inputs are dropped to bound latency
+MAX_EXTRAPOLATION = 6  # ticks a remote player keeps moving without snapshots
+RESTART_DELAY = 3.0  # seconds a finished match stays on screen
+
+
+class UdpTransport:
+    def __init__(self, address=("127.0.0.1", 0)):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(address)
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+
+    def send(self, data, address):
+        self.sock.sendto(data, address)
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                packets.append(self.sock.recvfrom(MAX_DATAGRAM))
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+
+    def close(self):
+        self.sock.close()
+
+
+class LossyTransport:
+    # Stand-in for a bad network in front of another transport: outgoing
+    # datagrams are dropped with probability loss, or held back for
+    # latency +- jitter seconds, so they can also arrive out of order.
+    # Also counts what was sent, per destination.
+    def __init__(self, inner, clock=time.perf_counter, latency=0.0, jitter=0.0, loss=0.0, seed=0):
+        self.inner = inner
+        self.address = inner.address
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.queue = []
+        self.sequence = 0
+        self.bytes_sent = {}
+        self.packets_sent = {}
+        self.dropped = 0
+
+    def send(self, data, address):
+        self.bytes_sent[address] = self.bytes_sent.get(address, 0) + len(data) + UDP_OVERHEAD
+        self.packets_sent[address] = self.packets_sent.get(address, 0) + 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        due = self.clock() + max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        self.sequence += 1
+        heapq.heappush(self.queue, (due, self.sequence, data, address))
+        self.flush()
+
+    def flush(self):
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, data, address = heapq.heappop(self.queue)
+            self.inner.send(data, address)
+
+    def receive(self):
+        self.flush()
+        return self.inner.receive()
+
+
+def quantize(value, scale=4):
+    # Fixed point int16, clamped so runaway values can't break packing
+    return max(-32768, min(32767, int(round(value * scale))))
+
+
+def snapshot_state(game):
+    # The world as {kind: {net_id: tuple of int16}} for net_protocol
+    state = {"players": {}, "enemies": {}, "bullets": {}, "grenades": {},
+             "explosions": {}, "weapons": {}}
+    for p in game.players:
+        flags = (p.facing_right | p.on_ground << 1 | p.sword_swinging << 2 | p.is_jumping << 3
+                 | (p.swing_direction < 0) << 4)
+        state["players"][p.player_id] = (
+            quantize(p.x), quantize(p.y), quantize(p.vx), quantize(p.vy), flags, p.weapon,
+            quantize(p.health, 1), quantize(p.swing_angle, 1), quantize(p.weapon_time, 10),
+            quantize(p.hit_effect, 100))
+    for e in game.enemies:
+        state["enemies"][e.net_id] = (
+            quantize(e.x), quantize(e.y), quantize(e.z, 1), quantize(e.size, 1),
+            quantize(e.body_angle % 360, 1), quantize(e.wing_phase % (2*math.pi), 1000),
+            quantize(e.eye_offset % (2*math.pi), 1000))
+    for b in game.bullets:
+        state["bullets"][b.net_id] = (quantize(b.x), quantize(b.y), 1 if b.vx > 0 else -1)
+    for g in game.grenades:
+        state["grenades"][g.net_id] = (
+            quantize(g.x), quantize(g.y), quantize(g.rotation % 360, 1), quantize(g.timer, 100))
+    for e in game.explosions:
+        state["explosions"][e.net_id] = (quantize(e.x), quantize(e.y), quantize(e.radius))
+    for w in game.weapons:
+        state["weapons"][w.net_id] = (
+            quantize(w.x), quantize(w.y), quantize(w.z, 1), w.type, quantize(w.pulse, 100),
+            quantize(w.rotation % 360, 1))
+    return state
+
+
+def set_player(p, record):
+    x, y, vx, vy, flags, weapon, health, swing, weapon_time, hit = record
+    p.x, p.y, p.vx, p.vy = x / 4, y / 4, vx / 4, vy / 4
+    p.facing_right = bool(flags & 1)
+    p.on_ground = bool(flags & 2)
+    p.sword_swinging = bool(flags & 4)
+    p.is_jumping = bool(flags & 8)
+    p.swing_direction = -1 if flags & 16 else 1
+    p.weapon = weapon
+    p.health = health
+    p.swing_angle = swing
+    p.weapon_time = weapon_time / 10
+    p.hit_effect = hit / 100
+
+
+def make_entity(kind, record):
+    # Client-side object for a snapshot record; set_entity fills it in
+    if kind == "enemies":
+        return bb.Enemy(0, 0)
+    if kind == "bullets":
+        return bb.Bullet(0, 0, record[2], 0)
+    if kind == "grenades":
+        return bb.Grenade(0, 0, 1, 0)
+    if kind == "explosions":
+        return bb.Explosion(0, 0)
+    return bb.Weapon(0, 0, 0)
+
+
+def set_entity(kind, e, record):
+    e.x, e.y = record[0] / 4, record[1] / 4
+    if kind in ("enemies", "bullets", "grenades"):
+        e.prev_x, e.prev_y = e.x, e.y
+    if kind == "enemies":
+        e.z, e.size, e.body_angle = record[2], record[3], record[4]
+        e.wing_phase, e.eye_offset = record[5] / 1000, record[6] / 1000
+    elif kind == "bullets":
+        e.vx = record[2] * bb.BULLET_SPEED
+    elif kind == "grenades":
+        e.rotation, e.timer = record[2], record[3] / 100
+    elif kind == "explosions":
+        e.radius = record[2] / 4
+    else:
+        e.z, e.type, e.pulse, e.rotation = record[2], record[3], record[4] / 100, record[5]
+
+
+def predict_move(player, buttons, previous):
+    # The movement the server will make of these buttons; attacks are
+    # left to the server
+    bb.steer_player(player, buttons, buttons & ~previous)
+
+
+class RemoteClient:
+    def __init__(self, player_id, address):
+        self.player_id = player_id
+        self.address = address
+        self.pending = {}  # input tick -> buttons
+        self.last_input = 0  # newest input tick applied
+        self.buttons = 0
+        self.ack = 0  # newest snapshot tick the client decoded
+        self.started = False
+
+
+class NetServer:
+    def __init__(self, transport, game, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.transport = transport
+        self.game = game
+        self.snapshot_interval = snapshot_interval
+        self.clients = {}
+        self.sent = {}  # tick -> state, kept as delta baselines
+        self.tick = 0
+        self.game_over_time = None
+
+    def receive(self):
+        # Stray, truncated or garbled datagrams are skipped, so one bad
+        # packet can't stop the server
+        for data, address in self.transport.receive():
+            if len(data) < INPUT_HEADER.size or data[0] != INPUT:
+                continue
+            try:
+                player_id, tick, ack, buttons = decode_input(data)
+            except struct.error as error:
+                print(f"dropped a malformed input from {address}: {error}")
+                continue
+            if player_id not in (1, 2):
+                continue
+            client = self.clients.get(player_id)
+            if client is None:
+                client = self.clients[player_id] = RemoteClient(player_id, address)
+            client.address = address
+            client.ack = max(client.ack, ack)
+            first = tick - len(buttons) + 1
+            for i, b in enumerate(buttons):
+                if first + i > client.last_input:
+                    client.pending[first + i] = b
+
+    def next_buttons(self, client):
+        # One input per tick. Until a couple are queued the server waits,
+        # so jitter doesn't starve it; if the next one never arrived the
+        # held buttons carry on.
+        if not client.started:
+            if len(client.pending) < INPUT_BUFFER:
+                return client.buttons
+            client.started = True
+            client.last_input = min(client.pending) - 1
+        while len(client.pending) > MAX_INPUT_BACKLOG:
+            oldest = min(client.pending)
+            client.last_input = oldest
+            client.buttons = client.pending.pop(oldest)
+        if not client.pending:
+            return client.buttons
+        nxt = min(client.pending)
+        if nxt > client.last_input + 1 and len(client.pending) < INPUT_BUFFER:
+            return client.buttons  # a gap; give the redundant copy time to arrive
+        client.last_input = nxt
+        return client.pending.pop(nxt)
+
+    def step(self, dt):
+        self.receive()
+        game = self.game
+        if game.game_state == bb.GAME_OVER:
+            if self.game_over_time is None:
+                self.game_over_time = game.clock()
+            elif game.clock() - self.game_over_time > RESTART_DELAY:
+                game.game_state = bb.MULTI_PLAYER
+                game.reset_game()
+                self.game_over_time = None
+        for client in self.clients.values():
+            buttons = self.next_buttons(client)
+            # Fed through the same PlayerCommand a local keyboard fills
+            command = game.commands[client.player_id - 1]
+            command.held = buttons
+            command.pressed |= buttons & ~client.buttons
+            client.buttons = buttons
+        game.apply_commands()
+        game.clock.advance(dt)
+        game.save_previous()
+        game.update(dt)
+        self.tick += 1
+        if self.tick % self.snapshot_interval == 0:
+            self.send_snapshots()
+
+    def send_snapshots(self):
+        game = self.game
+        state = snapshot_state(game)
+        self.sent[self.tick] = state
+        self.sent.pop(self.tick - HISTORY * self.snapshot_interval, None)
+        winner = game.winner if game.winner is not None else -1
+        for client in self.clients.values():
+            base = client.ack if client.ack in self.sent else 0
+            header = (client.last_input, game.game_state, winner, game.score[0], game.score[1],
+                      int(game.game_time * 10))
+            try:
+                data = encode_snapshot(self.tick, base, header, state, self.sent.get(base, {}))
+            except ValueError as error:
+                # The client catches up from the next snapshot that fits
+                print(f"skipped snapshot {self.tick} for player {client.player_id}: {error}")
+                continue
+            self.transport.send(data, client.address)
+
+
+class NetClient:
+    def __init__(self, transport, server_address, player_id, interp_delay=2 * SNAPSHOT_INTERVAL):
+        self.transport = transport
+        self.server_address = server_address
+        self.player_id = player_id
+        self.interp_delay = interp_delay
+        # A local Game holds the arena for prediction and the objects drawn
+        self.game = bb.Game()
+        self.game.game_state = bb.MULTI_PLAYER
+        self.game.reset_game()
+        self.player = self.game.players[player_id - 1]
+        self.tick = 0
+        self.inputs = {}  # input tick -> buttons
+        self.predicted = {}  # input tick -> predicted (x, y) after it
+        self.states = {}  # snapshot tick -> state, possible baselines
+        self.latest = 0  # newest snapshot tick decoded
+        self.server_time = 0.0  # estimate of the server's current tick
+        self.entities = {}  # kind -> {net_id: object} for drawing
+        self.corrections = []  # prediction error at each reconcile, world units
+
+    def step(self, buttons, dt):
+        self.tick += 1
+        self.inputs[self.tick] = buttons
+        predict_move(self.player, buttons, self.inputs.get(self.tick - 1, 0))
+        self.player.update(dt, self.game.player_ground)
+        self.predicted[self.tick] = (self.player.x, self.player.y)
+        recent = [self.inputs.get(t, 0) for t in range(max(1, self.tick - INPUT_REDUNDANCY + 1), self.tick + 1)]
+        self.transport.send(encode_input(self.player_id, self.tick, self.latest, recent),
+                            self.server_address)
+        self.server_time += 1
+        self.receive(dt)
+
+    def receive(self, dt):
+        newest = None
+        for data, address in self.transport.receive():
+            if len(data) < SNAPSHOT_HEADER.size or data[0] != SNAPSHOT:
+                continue
+            base = snapshot_baseline(data)
+            if base and base not in self.states:
+                continue  # baseline already forgotten; a later snapshot will do
+            try:
+                tick, header, state = decode_snapshot(data, self.states.get(base, {}))
+            except struct.error as error:
+                print(f"dropped a malformed snapshot from {address}: {error}")
+                continue
+            self.states[tick] = state
+            if tick > self.latest:
+                self.latest = tick
+                newest = (tick, header, state)
+        if newest is None:
+            return
+        for tick in [t for t in self.states if t < self.latest - HISTORY * SNAPSHOT_INTERVAL]:
+            del self.states[tick]
+        tick, header, state = newest
+        # Track the server clock loosely; snap if far off
+        if abs(tick - self.server_time) > 4 * SNAPSHOT_INTERVAL:
+            self.server_time = float(tick)
+        else:
+            self.server_time += (tick - self.server_time) * 0.1
+        self.reconcile(header, state, dt)
+
+    def reconcile(self, header, state, dt):
+        input_ack, game_state, winner, score0, score1, game_time = header
+        game = self.game
+        game.game_state = game_state
+        game.winner = winner if winner >= 0 else None
+        game.score = [score0, score1]
+        game.game_time = game_time / 10
+        record = state["players"].get(self.player_id)
+        if record is None:
+            return
+        predicted = self.predicted.get(input_ack)
+        set_player(self.player, record)
+        if predicted is not None:
+            self.corrections.append(math.hypot(predicted[0] - self.player.x, predicted[1] - self.player.y))
+        for t in range(input_ack + 1, self.tick + 1):
+            predict_move(self.player, self.inputs.get(t, 0), self.inputs.get(t - 1, 0))
+            self.player.update(dt, game.player_ground)
+            self.predicted[t] = (self.player.x, self.player.y)
+        for t in [t for t in self.inputs if t < input_ack - INPUT_REDUNDANCY]:
+            del self.inputs[t]
+            self.predicted.pop(t, None)
+
+    def render_state(self):
+        # Snapshot state interp_delay ticks behind the server, positions
+        # blended between the two snapshots around that moment
+        ticks = sorted(self.states)
+        if not ticks:
+            return {}
+        at = self.server_time - self.interp_delay
+        older = [t for t in ticks if t <= at]
+        newer = [t for t in ticks if t > at]
+        if not older:
+            return self.states[newer[0]]
+        if not newer:
+            # Ran past the newest snapshot (lost packets): carry players on
+            # along their velocity for a few ticks rather than freezing them
+            tick = older[-1]
+            state = dict(self.states[tick])
+            ahead = min(at - tick, MAX_EXTRAPOLATION) * bb.FIXED_STEP
+            state["players"] = {net_id: (round(r[0] + r[2] * ahead), round(r[1] + r[3] * ahead)) + r[2:]
+                                for net_id, r in state.get("players", {}).items()}
+            return state
+        a, b = older[-1], newer[0]
+        f = (at - a) / (b - a)
+        state = {}
+        for kind, records in self.states[b].items():
+            before = self.states[a].get(kind, {})
+            blended = {}
+            for net_id, record in records.items():
+                old = before.get(net_id)
+                if old is None:
+                    blended[net_id] = record
+                else:
+                    blended[net_id] = (round(old[0] + (record[0] - old[0]) * f),
+                                       round(old[1] + (record[1] - old[1]) * f)) + record[2:]
+            state[kind] = blended
+        return state
+
+    def update_view(self):
+        # Points the local Game's entity lists at the interpolated world
+        state = self.render_state()
+        game = self.game
+        for p in game.players:
+            record = state.get("players", {}).get(p.player_id)
+            if record is not None and p is not self.player:
+                set_player(p, record)
+                p.prev_x, p.prev_y = p.x, p.y
+        for kind in ("enemies", "bullets", "grenades", "explosions", "weapons"):
+            objects = self.entities.setdefault(kind, {})
+            records = state.get(kind, {})
+            for net_id in [i for i in objects if i not in records]:
+                del objects[net_id]
+            for net_id, record in records.items():
+                e = objects.get(net_id)
+                if e is None:
+                    e = objects[net_id] = make_entity(kind, record)
+                set_entity(kind, e, record)
+            setattr(game, kind, list(objects.values()))
+
+
+def run_server(port, latency, jitter, loss):
+    transport = LossyTransport(UdpTransport(("0.0.0.0", port)), latency=latency,
+                               jitter=jitter, loss=loss)
+    game = bb.Game()
+    game.game_state = bb.MULTI_PLAYER
+    game.reset_game()
+    server = NetServer(transport, game)
+    loop = bb.FixedStepLoop(bb.FIXED_STEP, bb.MAX_CATCHUP_STEPS, max_fps=1 / bb.FIXED_STEP)
+    print(f"Bot Brawl server on port {port}")
+    while True:
+        loop.throttle()
+        loop.advance(server.step)
+
+
+def run_client(host, port, player_id, latency, jitter, loss):
+    from OpenGL.GLUT import (glutInit, glutInitDisplayMode, glutInitWindowSize, glutCreateWindow,
+                             glutDisplayFunc, glutKeyboardFunc, glutKeyboardUpFunc,
+                             glutMainLoop, glutLeaveMainLoop, GLUT_DOUBLE, GLUT_RGB, GLUT_DEPTH)
+    from OpenGL.GL import glClearColor
+    from redraw import RedrawScheduler
+
+    transport = LossyTransport(UdpTransport(), latency=latency, jitter=jitter, loss=loss)
+    client = NetClient(transport, (socket.gethostbyname(host), port), player_id)
+    loop = bb.FixedStepLoop(bb.FIXED_STEP, bb.MAX_CATCHUP_STEPS)
+    keys = {b"a": LEFT, b"d": RIGHT, b"w": JUMP, b" ": ATTACK}
+    held = [0]
+
+    def key_down(key, x, y):
+        if key == b"\x1b":
+            glutLeaveMainLoop()
+        held[0] |= keys.get(key.lower(), 0)
+
+    def key_up(key, x, y):
+        held[0] &= ~keys.get(key.lower(), 0)
+
+    def frame(resumed):
+        loop.advance(lambda dt: client.step(held[0], dt))
+        client.update_view()
+        return True  # snapshots keep the view moving
+
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
+    glutInitWindowSize(bb.SCREEN_WIDTH, bb.SCREEN_HEIGHT)
+    glutCreateWindow(f"Bot Brawl 3D - player {player_id}".encode())
+    glutDisplayFunc(client.game.draw)
+    glutKeyboardFunc(key_down)
+    glutKeyboardUpFunc(key_up)
+    RedrawScheduler(frame).start()
+    glClearColor(0.1, 0.1, 0.5, 1.0)
+    glutMainLoop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Networked two-player Bot Brawl")
+    parser.add_argument("role", choices=["server", "client"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--player", type=int, choices=[1, 2], default=1)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="extra one-way delay in seconds on this side's packets")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    args = parser.parse_args()
+    if args.role == "server":
+        run_server(args.port, args.latency, args.jitter, args.loss)
+    else:
+        run_client(args.host, args.port, args.player, args.latency, args.jitter, args.loss)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Wire format for networked Bot Brawl. Everything is little endian and fits
+# in one UDP datagram.
+#
+# Client -> server INPUT: the client's newest input tick, the last snapshot
+# tick it decoded (the ack) and its button bytes for the last few ticks,
+# oldest first. The redundancy lets the server ride out lost packets.
+#
+# Server -> client SNAPSHOT: the world as quantized integer records,
+# {kind: {net_id: (field, ...)}}, encoded against a baseline snapshot the
+# client has acknowledged. A byte of flags says which kinds follow; each
+# lists changed records as id + bitmask of changed fields + those fields,
+# then removed ids. Records and kinds that didn't change cost nothing.
+# Baseline 0 means a full snapshot.
+import struct
+
+INPUT = 1
+SNAPSHOT = 2
+
+# type, player id, newest input tick, snapshot ack, count
+INPUT_HEADER = struct.Struct("<BBIIB")
+INPUT_REDUNDANCY = 4
+
+# Entity kinds in wire order, and the number of int16 fields per record
+KINDS = (
+    ("players", 10),
+    ("enemies", 7),
+    ("bullets", 3),
+    ("grenades", 4),
+    ("explosions", 3),
+    ("weapons", 6),
+)
+
+# type, tick, baseline tick, last input tick processed for this client,
+# game state, winner (-1 for none), score, score, game time in tenths
+SNAPSHOT_HEADER = struct.Struct("<BIIIBbIII")
+KIND_FLAGS = struct.Struct("<B")
+COUNTS = struct.Struct("<HH")  # changed, removed
+# Net ids are 32-bit: a long game spawns far more than 65536 entities, and
+# wrapped ids would let two live entities share a record
+RECORD_HEAD = struct.Struct("<IH")  # net id, field mask
+ID = struct.Struct("<I")
+FIELD = struct.Struct("<h")
+
+# Bytes an IPv4 + UDP header adds to every datagram, for bandwidth figures
+UDP_OVERHEAD = 28
+# Largest UDP payload over IPv4. Receivers read this much, so a datagram
+# is never cut short, and encode_snapshot refuses anything bigger.
+MAX_DATAGRAM = 65507
+
+
+def encode_input(player_id, tick, ack, buttons):
+    # buttons: button bytes for ticks tick-len+1 .. tick, oldest first
+    buttons = buttons[-INPUT_REDUNDANCY:]
+    return INPUT_HEADER.pack(INPUT, player_id, tick, ack, len(buttons)) + bytes(buttons)
+
+
+def decode_input(data):
+    # Raises struct.error for a datagram too short to be an input
+    _, player_id, tick, ack, count = INPUT_HEADER.unpack_from(data)
+    buttons = data[INPUT_HEADER.size:INPUT_HEADER.size + count]
+    return player_id, tick, ack, list(buttons)
+
+
+def encode_snapshot(tick, baseline_tick, header, state, baseline):
+    # header: (input_ack, game_state, winner, score0, score1, game_time_tenths)
+    # state/baseline: {kind: {net_id: tuple of ints}}; baseline is {} for a
+    # full snapshot
+    parts = []
+    flags = 0
+    for bit, (kind, n_fields) in enumerate(KINDS):
+        records = state.get(kind, {})
+        old = baseline.get(kind, {})
+        changed = []
+        for net_id, values in records.items():
+            before = old.get(net_id)
+            if before == values:
+                continue
+            mask = 0
+            fields = []
+            for i in range(n_fields):
+                if before is None or before[i] != values[i]:
+                    mask |= 1 << i
+                    fields.append(values[i])
+            changed.append(RECORD_HEAD.pack(net_id, mask) + struct.pack(f"<{len(fields)}h", *fields))
+        removed = [net_id for net_id in old if net_id not in records]
+        if changed or removed:
+            flags |= 1 << bit
+            parts.append(COUNTS.pack(len(changed), len(removed)))
+            parts.extend(changed)
+            parts.extend(ID.pack(net_id) for net_id in removed)
+    head = SNAPSHOT_HEADER.pack(SNAPSHOT, tick, baseline_tick, *header) + KIND_FLAGS.pack(flags)
+    data = head + b"".join(parts)
+    if len(data) > MAX_DATAGRAM:
+        raise ValueError(f"snapshot of {len(data)} bytes doesn't fit in one datagram")
+    return data
+
+
+def snapshot_baseline(data):
+    # Baseline tick a snapshot was encoded against, without decoding it
+    return SNAPSHOT_HEADER.unpack_from(data)[2]
+
+
+def decode_snapshot(data, baseline):
+    # Rebuilds the full state from a snapshot and the baseline state it
+    # names (pass {} for a full snapshot). Returns (tick, header, state);
+    # raises struct.error if the datagram is truncated.
+    _, tick, _, *header = SNAPSHOT_HEADER.unpack_from(data)
+    offset = SNAPSHOT_HEADER.size
+    flags = KIND_FLAGS.unpack_from(data, offset)[0]
+    offset += KIND_FLAGS.size
+    state = {}
+    for bit, (kind, n_fields) in enumerate(KINDS):
+        records = dict(baseline.get(kind, {}))
+        if not flags & (1 << bit):
+            state[kind] = records
+            continue
+        n_changed, n_removed = COUNTS.unpack_from(data, offset)
+        offset += COUNTS.size
+        for _ in range(n_changed):
+            net_id, mask = RECORD_HEAD.unpack_from(data, offset)
+            offset += RECORD_HEAD.size
+            values = list(records.get(net_id, (0,) * n_fields))
+            for i in range(n_fields):
+                if mask & (1 << i):
+                    values[i] = FIELD.unpack_from(data, offset)[0]
+                    offset += FIELD.size
+            records[net_id] = tuple(values)
+        for _ in range(n_removed):
+            records.pop(ID.unpack_from(data, offset)[0], None)
+            offset += ID.size
+        state[kind] = records
+    return tick, tuple(header), state
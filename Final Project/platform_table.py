@@ -0,0 +1,80 @@
+# Precomputed platform lookup for landing checks. Platform x-intervals
+# (widened by the body's half width) are cut into sorted elementary segments,
+# each listing the platforms that cover it in platform-list order. A body
+# finds its segment with one bisect and then only tests those platforms.
+import bisect
+
+try:
+    import numpy as np
+except ImportError:  # only land_batch needs NumPy
+    np = None
+
+
+class PlatformTable:
+    def __init__(self, platforms, half_width, thickness):
+        self.half_width = half_width
+        # Same expressions as the original per-entity loops so results match
+        self.lefts = [p.x - p.width/2 for p in platforms]
+        self.rights = [p.x + p.width/2 for p in platforms]
+        self.tops = [p.y + thickness/2 for p in platforms]
+        self.bottoms = [p.y - thickness/2 for p in platforms]
+
+        # Slightly widened bounds so segment lookup never misses a platform
+        # the exact comparison would accept because of float rounding
+        spans = []
+        for left, right in zip(self.lefts, self.rights):
+            lo = left - half_width
+            hi = right + half_width
+            slack = 1e-9 * max(1.0, abs(lo), abs(hi))
+            spans.append((lo - slack, hi + slack))
+        self.edges = sorted({edge for span in spans for edge in span})
+
+        # segments[k] covers edges[k-1] <= x < edges[k]
+        self.segments = [[]]
+        for k in range(1, len(self.edges)):
+            lo, hi = self.edges[k-1], self.edges[k]
+            self.segments.append([i for i, (a, b) in enumerate(spans) if a <= lo and b >= hi])
+        self.segments.append([])
+
+        if np is not None:
+            self.build_arrays()
+
+    def build_arrays(self):
+        # Segments padded into a rectangle; the padding index points at a
+        # sentinel platform that no body can land on
+        count = len(self.tops)
+        width = max(1, max(len(seg) for seg in self.segments))
+        table = np.full((len(self.segments), width), count, dtype=np.intp)
+        for k, seg in enumerate(self.segments):
+            table[k, :len(seg)] = seg
+        self.table = table
+        self.edge_array = np.array(self.edges, dtype=float)
+        self.left_array = np.array(self.lefts + [np.inf])
+        self.right_array = np.array(self.rights + [-np.inf])
+        self.top_array = np.array(self.tops + [-np.inf])
+        self.bottom_array = np.array(self.bottoms + [np.inf])
+
+    def land(self, x, y, vy, foot):
+        # Index of the first platform (in list order) the body lands on, or -1
+        if not vy < 0:
+            return -1
+        hw = self.half_width
+        feet = y - foot
+        for i in self.segments[bisect.bisect_right(self.edges, x)]:
+            if (x + hw > self.lefts[i] and x - hw < self.rights[i] and
+                    feet <= self.tops[i] and feet >= self.bottoms[i]):
+                return i
+        return -1
+
+    def land_batch(self, x, y, vy, foot):
+        # land() for arrays of bodies; returns an int array with -1 for misses
+        hw = self.half_width
+        cand = self.table[np.searchsorted(self.edge_array, x, side="right")]
+        xs = x[:, None]
+        feet = (y - foot)[:, None]
+        hit = ((xs + hw > self.left_array[cand]) & (xs - hw < self.right_array[cand]) &
+               (feet <= self.top_array[cand]) & (feet >= self.bottom_array[cand]) &
+               (vy < 0)[:, None])
+        first = hit.argmax(axis=1)
+        rows = np.arange(len(x))
+        return np.where(hit[rows, first], cand[rows, first], -1)
@@ -0,0 +1,172 @@
+# Frame-time profiler. Named scopes record their durations into fixed-size
+# ring buffers, so memory stays constant and percentiles describe the most
+# recent frames. While disabled, scope() and sections() hand back shared
+# no-op objects and nothing is timed.
+import csv
+import json
+import time
+from array import array
+
+DEFAULT_WINDOW = 600  # samples kept per scope, ten seconds at 60 fps
+
+
+class RingBuffer:
+    def __init__(self, size):
+        self.samples = array("d", bytes(8 * size))
+        self.size = size
+        self.index = 0
+        self.count = 0  # total samples ever added
+
+    def add(self, value):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+
+    def values(self):
+        return self.samples[:min(self.count, self.size)]
+
+    def percentiles(self, *ps):
+        # Nearest-rank percentiles of the samples currently held
+        ordered = sorted(self.values())
+        if not ordered:
+            return [0.0] * len(ps)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(p / 100 * len(ordered)))] for p in ps]
+
+
+class Scope:
+    # Reused context manager for one name; scopes with the same name must
+    # not nest
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Sections:
+    # Times consecutive phases of one function without re-indenting it:
+    # each split(name) records the time since the previous split
+    def __init__(self, profiler, prefix):
+        self.profiler = profiler
+        self.prefix = prefix
+        self.last = 0.0
+
+    def start(self):
+        self.last = time.perf_counter()
+        return self
+
+    def split(self, name):
+        now = time.perf_counter()
+        self.profiler.record(self.prefix + name, now - self.last)
+        self.last = now
+
+
+class NullScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def split(self, name):
+        pass
+
+
+NULL_SCOPE = NullScope()
+
+
+class Profiler:
+    def __init__(self, window=DEFAULT_WINDOW, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self.show = False
+        self.buffers = {}
+        self.scopes = {}
+        self.sections_by_prefix = {}
+        self.last_frame = None
+
+    def scope(self, name):
+        if not self.enabled:
+            return NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = Scope(self, name)
+        return scope
+
+    def sections(self, prefix):
+        if not self.enabled:
+            return NULL_SCOPE
+        sections = self.sections_by_prefix.get(prefix)
+        if sections is None:
+            sections = self.sections_by_prefix[prefix] = Sections(self, prefix + ".")
+        return sections.start()
+
+    def record(self, name, seconds):
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = RingBuffer(self.window)
+        buffer.add(seconds)
+
+    def mark_frame(self):
+        # Call once per displayed frame; records the interval between frames
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.record("frame", now - self.last_frame)
+        self.last_frame = now
+
+    def toggle_overlay(self):
+        # Showing the overlay starts collection; hiding it leaves collection on
+        self.show = not self.show
+        if self.show:
+            self.enabled = True
+
+    def reset(self):
+        self.buffers.clear()
+        self.last_frame = None
+
+    def stats(self):
+        # One row per scope, times in milliseconds
+        rows = []
+        for name in sorted(self.buffers):
+            buffer = self.buffers[name]
+            values = buffer.values()
+            p50, p95, p99 = buffer.percentiles(50, 95, 99)
+            rows.append({
+                "scope": name,
+                "samples": buffer.count,
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p50_ms": p50 * 1000,
+                "p95_ms": p95 * 1000,
+                "p99_ms": p99 * 1000,
+                "max_ms": max(values) * 1000,
+            })
+        return rows
+
+    def overlay_lines(self):
+        lines = [f"{'scope':<22}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for row in self.stats():
+            lines.append(f"{row['scope']:<22}{row['p50_ms']:>7.2f}{row['p95_ms']:>7.2f}{row['p99_ms']:>7.2f}")
+        return lines
+
+    def dump(self, path):
+        # JSON when the path ends in .json, CSV otherwise
+        rows = self.stats()
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"window": self.window, "scopes": rows}, f, indent=2)
+        else:
+            fields = ["scope", "samples", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(rows)
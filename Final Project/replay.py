@@ -0,0 +1,69 @@
+# Input logs for deterministic replays. A log holds the match seed and
+# backend, every key/mouse event tagged with the fixed-step tick it was
+# applied before, and a state hash every hash_interval ticks. Re-running
+# the same events from the same seed must reproduce every hash.
+#
+# File layout (little endian): HEADER, then n_events EVENT records, then
+# n_hashes HASH records.
+import struct
+
+MAGIC = b"BBRL"
+VERSION = 1
+BACKENDS = ("objects", "numpy")
+
+# magic, version, seed, backend, step, ticks, hash_interval, n_events, n_hashes
+HEADER = struct.Struct("<4sHQBdIIII")
+# tick, kind, code (key byte, GLUT special key or mouse button), state
+EVENT = struct.Struct("<IBHB")
+# tick, 8-byte state digest
+HASH = struct.Struct("<I8s")
+
+KEY_DOWN = 0
+KEY_UP = 1
+SPECIAL_DOWN = 2
+SPECIAL_UP = 3
+MOUSE = 4
+
+
+class InputLog:
+    def __init__(self, seed, backend="objects", step=1/60.0, hash_interval=60):
+        self.seed = seed
+        self.backend = backend
+        self.step = step
+        self.hash_interval = hash_interval
+        self.ticks = 0
+        self.events = []  # (tick, kind, code, state)
+        self.hashes = []  # (tick, digest)
+
+    def record(self, kind, code, state=0):
+        # Applies before the next step, i.e. after self.ticks steps
+        self.events.append((self.ticks, kind, code, state))
+
+    def end_tick(self, game):
+        self.ticks += 1
+        if self.ticks % self.hash_interval == 0:
+            self.hashes.append((self.ticks, game.state_hash()))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.seed, BACKENDS.index(self.backend),
+                                self.step, self.ticks, self.hash_interval,
+                                len(self.events), len(self.hashes)))
+            f.write(b"".join(EVENT.pack(*event) for event in self.events))
+            f.write(b"".join(HASH.pack(*h) for h in self.hashes))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        (magic, version, seed, backend, step, ticks, hash_interval,
+         n_events, n_hashes) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Bot Brawl replay")
+        log = cls(seed, BACKENDS[backend], step, hash_interval)
+        log.ticks = ticks
+        offset = HEADER.size
+        log.events = [EVENT.unpack_from(data, offset + i * EVENT.size) for i in range(n_events)]
+        offset += n_events * EVENT.size
+        log.hashes = [HASH.unpack_from(data, offset + i * HASH.size) for i in range(n_hashes)]
+        return log
@@ -0,0 +1,85 @@
+# Named random streams derived from one match seed. Each subsystem draws
+# from its own stream, so a match is reproducible from the seed alone and
+# an extra random call in one subsystem doesn't shift the numbers any
+# other subsystem sees.
+import math
+import random
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # numpy() streams are only used by the NumPy backend
+    np = None
+
+
+def derive_seed(seed, name):
+    # Stable across runs and Python versions, unlike hash()
+    return (seed << 32) | zlib.crc32(name.encode())
+
+
+MASK64 = (1 << 64) - 1
+
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        self.seed = seed
+        self.streams = {}
+        self.numpy_streams = {}
+
+    def stream(self, name):
+        # random.Random with the same interface as the random module
+        rng = self.streams.get(name)
+        if rng is None:
+            rng = self.streams[name] = random.Random(derive_seed(self.seed, name))
+        return rng
+
+    def numpy(self, name):
+        # numpy Generator for vectorised code; independent of stream(name)
+        rng = self.numpy_streams.get(name)
+        if rng is None:
+            rng = self.numpy_streams[name] = np.random.default_rng(derive_seed(self.seed, "np:" + name))
+        return rng
+
+    def checkpoint_sections(self):
+        # (name, struct code, values) sections for checkpoint.py: the seed,
+        # each stream's Mersenne Twister state and each NumPy stream's
+        # PCG64 state split into 64-bit words
+        sections = [("rng.seed", "Q", [self.seed])]
+        for name, rng in self.streams.items():
+            _, internal, gauss = rng.getstate()
+            sections.append((f"random:{name}", "I", internal))
+            sections.append((f"random:{name}:gauss", "d", [math.nan if gauss is None else gauss]))
+        for name, rng in self.numpy_streams.items():
+            state = rng.bit_generator.state
+            value, inc = state["state"]["state"], state["state"]["inc"]
+            sections.append((f"numpy:{name}", "Q", [value & MASK64, value >> 64, inc & MASK64, inc >> 64,
+                                                     state["has_uint32"], state["uinteger"]]))
+        return sections
+
+    def restore_checkpoint(self, checkpoint):
+        # Streams are restored in place, so Generators held elsewhere (the
+        # NumPy stores) follow. Streams the checkpoint doesn't have had not
+        # been drawn from yet, so they start over from the seed.
+        self.seed = checkpoint.column("rng.seed")[0]
+        streams = {}
+        for section in checkpoint.names("random:"):
+            if section.endswith(":gauss"):
+                continue
+            name = section[len("random:"):]
+            rng = streams[name] = self.streams.get(name) or random.Random()
+            gauss = checkpoint.column(section + ":gauss")[0]
+            rng.setstate((3, tuple(checkpoint.column(section)), None if math.isnan(gauss) else gauss))
+        self.streams = streams
+        names = set(self.numpy_streams) | {s[len("numpy:"):] for s in checkpoint.names("numpy:")}
+        for name in names:
+            rng = self.numpy(name)
+            section = "numpy:" + name
+            if section not in checkpoint:
+                rng.bit_generator.state = np.random.PCG64(derive_seed(self.seed, "np:" + name)).state
+                continue
+            lo, hi, inc_lo, inc_hi, has_uint32, uinteger = checkpoint.column(section).tolist()
+            rng.bit_generator.state = {"bit_generator": "PCG64",
+                                       "state": {"state": lo | hi << 64, "inc": inc_lo | inc_hi << 64},
+                                       "has_uint32": has_uint32, "uinteger": uinteger}
@@ -0,0 +1,61 @@
+import math
+
+
+class SpatialHash:
+    # Uniform grid over the x/y plane used as a collision broad phase.
+    # Items are stored by their index in the list that was indexed, so a
+    # query hands back indices and the caller keeps its own list order.
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, index, x, y):
+        key = self.cell(x, y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [index]
+        else:
+            bucket.append(index)
+
+    def build(self, items):
+        # Rebuilds the grid from anything with x/y attributes
+        self.cells.clear()
+        for i, item in enumerate(items):
+            self.insert(i, item.x, item.y)
+
+    def query(self, x, y, radius):
+        # Candidate indices whose cell overlaps the circle's bounding box,
+        # sorted so callers see them in the same order as the indexed list
+        size = self.cell_size
+        min_cx = math.floor((x - radius) / size)
+        max_cx = math.floor((x + radius) / size)
+        min_cy = math.floor((y - radius) / size)
+        max_cy = math.floor((y + radius) / size)
+        cells = self.cells
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        found.sort()
+        return found
+
+    def build_xy(self, xs, ys):
+        # Same as build() for parallel coordinate lists (e.g. NumPy columns)
+        self.cells.clear()
+        size = self.cell_size
+        cells = self.cells
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            key = (math.floor(x / size), math.floor(y / size))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [i]
+            else:
+                bucket.append(i)
@@ -0,0 +1,233 @@
+# Plays many headless single-player matches in a multiprocessing pool,
+# one match per task, over a grid of the game's tuning constants (see
+# TUNABLES). Results go to a columnar file: one typed column per field, in
+# the section layout of checkpoint.py, so a column is read with
+# Checkpoint.open(path).column("score") (or .array() for NumPy). The file
+# is rewritten every --flush-every matches, so a stopped sweep keeps what
+# it finished. An --out ending in .csv streams one row per match instead.
+# Usage: python sweep_matches.py --param ENEMY_SPAWN_RATE=1,2,3 --param ENEMY_SPEED=10,20
+#            [--matches 20] [--workers 4] [--bot chaser] [--out sweep.cols]
+import argparse
+import ast
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from array import array
+
+import checkpoint
+from bot_brawl import load_game
+
+# Game constants a sweep may vary; they are read each tick, so setting them
+# on the module between matches takes effect
+TUNABLES = ("GRAVITY", "JUMP_FORCE", "PLAYER_SPEED", "PLAYER_SIZE", "BULLET_SPEED",
+            "GRENADE_SPEED", "WEAPON_LIFETIME", "BLAST_RADIUS", "MAX_HEALTH",
+            "ENEMY_SPAWN_RATE", "ENEMY_SPEED", "ENEMY_SIZE", "ENEMY_DAMAGE", "ENEMY_JUMP_CHANCE")
+
+# Result field, struct type of its column (swept constants are stored as d)
+RESULT_FIELDS = (("seed", "q"), ("bot", "B"), ("result", "B"), ("ticks", "q"), ("survival_s", "d"),
+                 ("score", "q"), ("peak_enemies", "q"), ("peak_bullets", "q"),
+                 ("peak_grenades", "q"), ("peak_explosions", "q"), ("ticks_per_sec", "q"))
+# In a columnar file, bot holds an index into sorted(BOTS) and result one
+# into RESULTS
+RESULTS = ("died", "timeout")
+
+# Set in each worker by init_worker
+bb = None
+defaults = {}
+
+
+def parse_param(text):
+    # "NAME=1,2.5,3" -> ("NAME", [1, 2.5, 3])
+    name, _, values = text.partition("=")
+    if not name or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=v1,v2,... got {text!r}")
+    return name, [ast.literal_eval(v) for v in values.split(",")]
+
+
+class ChaserBot:
+    # Heads for a pickup while unarmed, otherwise for the nearest enemy, and
+    # attacks when the held weapon would connect. It presses keys through
+    # the game's own keyboard handler, like a player would.
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.held = None
+
+    def press(self, key):
+        if key != self.held:
+            if self.held is not None:
+                bb.keyboard_up(self.held, 0, 0)
+            if key is not None:
+                bb.keyboard(key, 0, 0)
+            self.held = key
+
+    def act(self, game):
+        player = game.players[0]
+        if player.weapon == bb.NO_WEAPON and game.weapons:
+            targets = game.weapons
+        else:
+            targets = game.enemies
+        if not targets:
+            self.press(None)
+            return
+        target = min(targets, key=lambda t: (t.x - player.x)**2 + (t.y - player.y)**2)
+        dx = target.x - player.x
+        dy = target.y - player.y
+        if dx > 10:
+            self.press(b"d")
+        elif dx < -10:
+            self.press(b"a")
+        else:
+            self.press(None)
+        if dy > 40 and player.on_ground and self.rng.random() < 0.2:
+            bb.keyboard(b"w", 0, 0)
+        facing = (dx > 0) == player.facing_right
+        if player.weapon == bb.SWORD and abs(dx) < bb.PLAYER_SIZE * 2 and abs(dy) < bb.PLAYER_SIZE:
+            bb.keyboard(b" ", 0, 0)
+        elif player.weapon == bb.GUN and facing and abs(dy) < bb.ENEMY_SIZE:
+            bb.keyboard(b" ", 0, 0)
+        elif player.weapon == bb.GRENADE and facing and abs(dx) < bb.BLAST_RADIUS / 2:
+            bb.keyboard(b" ", 0, 0)
+
+
+class IdleBot:
+    # Never touches the controls; a baseline for how long the arena alone
+    # takes to win
+    def __init__(self, seed):
+        pass
+
+    def act(self, game):
+        pass
+
+
+BOTS = {"chaser": ChaserBot, "idle": IdleBot}
+
+
+def init_worker():
+    global bb, defaults
+    bb = load_game()
+    defaults = {name: getattr(bb, name) for name in TUNABLES}
+
+
+def play_match(task):
+    # One match with the given constant overrides; returns a result row
+    overrides, seed, bot_name, max_ticks, backend = task
+    for name, value in defaults.items():
+        setattr(bb, name, value)
+    for name, value in overrides.items():
+        setattr(bb, name, value)
+    bb.game = bb.Game(backend=backend, seed=seed)
+    bot = BOTS[bot_name](seed)
+    bb.keyboard(b"1", 0, 0)
+    bb.process_input()  # start the match now rather than on the first tick
+    game = bb.game
+    peaks = {"enemies": 0, "bullets": 0, "grenades": 0, "explosions": 0}
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < max_ticks and game.game_state == bb.SINGLE_PLAYER:
+        bot.act(game)
+        bb.step(bb.FIXED_STEP)
+        ticks += 1
+        for kind in peaks:
+            peaks[kind] = max(peaks[kind], len(getattr(game, kind)))
+    elapsed = time.perf_counter() - start
+    row = dict(overrides)
+    row.update(seed=seed, bot=bot_name,
+               result="died" if game.game_state == bb.GAME_OVER else "timeout",
+               ticks=ticks, survival_s=round(game.game_time, 3), score=game.score[0],
+               ticks_per_sec=round(ticks / elapsed) if elapsed > 0 else 0)
+    row.update({"peak_" + kind: count for kind, count in peaks.items()})
+    return row
+
+
+class ColumnResults:
+    # Collects results column by column and rewrites the file every
+    # flush_every matches, via a temporary file so the previous version
+    # stays readable until the new one is complete
+    def __init__(self, path, names, backend, flush_every):
+        self.path = path
+        self.backend = backend
+        self.flush_every = flush_every
+        self.columns = {name: ("d", array("d")) for name in names}
+        self.columns.update((name, (code, array(code))) for name, code in RESULT_FIELDS)
+        self.rows = 0
+
+    def add(self, row):
+        row = dict(row, bot=sorted(BOTS).index(row["bot"]), result=RESULTS.index(row["result"]))
+        for name, (code, values) in self.columns.items():
+            values.append(row[name])
+        self.rows += 1
+        if self.rows % self.flush_every == 0:
+            self.save()
+
+    def save(self):
+        sections = [(name, code, values) for name, (code, values) in self.columns.items()]
+        checkpoint.save(self.path + ".tmp", sections, self.backend)
+        os.replace(self.path + ".tmp", self.path)
+
+    def close(self):
+        self.save()
+
+
+class CsvResults:
+    # One row per match, flushed as it arrives
+    def __init__(self, path, names):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=names + [name for name, _ in RESULT_FIELDS])
+        self.writer.writeheader()
+
+    def add(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Brawl parallel match sweep")
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        metavar="NAME=V1,V2", help="game constant to sweep (repeatable)")
+    parser.add_argument("--matches", type=int, default=10,
+                        help="matches per parameter combination, one seed each")
+    parser.add_argument("--seed", type=int, default=0, help="first match seed")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="chaser")
+    parser.add_argument("--max-ticks", type=int, default=60 * 300)
+    parser.add_argument("--backend", choices=["objects", "numpy"], default="objects")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="sweep.cols", help="columnar results, or rows if it ends in .csv")
+    parser.add_argument("--flush-every", type=int, default=50,
+                        help="matches between rewrites of a columnar results file")
+    args = parser.parse_args()
+
+    for name, _ in args.param:
+        if name not in TUNABLES:
+            parser.error(f"{name} is not a tunable constant; choose from {', '.join(TUNABLES)}")
+    names = [name for name, _ in args.param]
+    grid = [dict(zip(names, combo)) for combo in itertools.product(*(v for _, v in args.param))]
+    tasks = [(overrides, args.seed + i, args.bot, args.max_ticks, args.backend)
+             for overrides in grid for i in range(args.matches)]
+
+    start = time.perf_counter()
+    total_ticks = 0
+    if args.out.lower().endswith(".csv"):
+        results = CsvResults(args.out, names)
+    else:
+        results = ColumnResults(args.out, names, args.backend, args.flush_every)
+    try:
+        with multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+            for done, row in enumerate(pool.imap_unordered(play_match, tasks), 1):
+                results.add(row)
+                total_ticks += row["ticks"]
+                print(f"\r{done}/{len(tasks)} matches", end="", flush=True)
+    finally:
+        results.close()
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(tasks)} matches, {total_ticks} ticks in {elapsed:.1f}s on {args.workers} "
+          f"worker(s): {total_ticks / elapsed:.0f} ticks/sec overall -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+# The game and its helper modules live one folder up; "Final Project_3D.py"
+# is loaded through bot_brawl because of the space in its name.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_brawl import load_game
+
+
+@pytest.fixture
+def bb():
+    return load_game()
@@ -0,0 +1,15 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_renderer import sphere_triangles
+from lod import DEFAULT_LEVELS, sphere_triangles as glut_triangles
+
+
+@pytest.mark.parametrize("slices, stacks", [(slices, stacks) for _, slices, stacks in DEFAULT_LEVELS])
+def test_batched_sphere_submits_what_the_counter_counts(slices, stacks):
+    corners = sphere_triangles(slices, stacks).reshape(-1, 3, 3).astype(float)
+    # The same triangles glutSolidSphere draws, none of them degenerate
+    assert len(corners) == glut_triangles(slices, stacks)
+    areas = np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1)
+    assert areas.min() > 1e-6
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from checkpoint import Checkpoint
+
+
+def spawn(game, enemies, projectiles):
+    for _ in range(enemies):
+        game.add_enemy(random.uniform(-400, 400), random.uniform(-200, 200))
+    for _ in range(projectiles):
+        game.add_bullet(random.uniform(-400, 400), random.uniform(-200, 200), random.choice([-1, 1]), 1)
+        game.add_grenade(random.uniform(-400, 400), random.uniform(-200, 200), random.choice([-1, 1]), 1)
+
+
+def busy_game(bb, backend, seed, enemies):
+    # A match with enemies, bullets, grenades and explosions all live: a
+    # first wave of grenades has gone off, a second is in the air and
+    # fresh enemies replace the ones the blasts took
+    random.seed(seed)
+    game = bb.Game(clock=bb.SimClock(), backend=backend, seed=seed)
+    game.game_state = bb.SINGLE_PLAYER
+    game.reset_game()
+    game.players[0].health = float("inf")
+    spawn(game, enemies, enemies // 5)
+    run(bb, game, 60)
+    spawn(game, 0, enemies // 5)
+    run(bb, game, 65)
+    spawn(game, enemies, 0)
+    return game
+
+
+def run(bb, game, ticks):
+    hashes = []
+    for _ in range(ticks):
+        game.clock.advance(bb.FIXED_STEP)
+        game.update(bb.FIXED_STEP)
+        hashes.append(game.state_hash())
+    return hashes
+
+
+@pytest.mark.parametrize("backend", ["objects", "numpy"])
+@pytest.mark.parametrize("enemies", [0, 20, 300])
+def test_restore_plays_on_like_the_original(bb, backend, enemies):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    game = busy_game(bb, backend, seed=1, enemies=100)
+    assert game.enemies and game.bullets and game.grenades and game.explosions
+    data = game.checkpoint()
+    expected = run(bb, game, 60)
+
+    # Restored over a game with fewer and more entities than the
+    # checkpoint, so its pooled and reused objects hold stale fields
+    target = busy_game(bb, backend, seed=2, enemies=enemies)
+    target.restore(Checkpoint(data))
+    assert run(bb, target, 60) == expected
@@ -0,0 +1,30 @@
+# Buttons from before a reset must not act in the new match
+
+
+def start_match(bb):
+    bb.game = bb.Game(clock=bb.SimClock(), seed=0)
+    bb.keyboard(b"1", 0, 0)
+    bb.process_input()
+    return bb.game
+
+
+def test_attack_pressed_before_reset_does_not_attack(bb):
+    game = start_match(bb)
+    game.commands[0].press(bb.ATTACK | bb.RIGHT, 0.0)
+    game.reset_game()
+    player = game.players[0]
+    player.weapon = bb.SWORD
+    bb.step(bb.FIXED_STEP)
+    assert not player.sword_swinging
+    assert game.commands[0].held == 0
+
+
+def test_attack_pressed_in_match_attacks(bb):
+    # The same press without the reset does swing, so the test above
+    # isn't passing for some other reason
+    game = start_match(bb)
+    player = game.players[0]
+    player.weapon = bb.SWORD
+    game.commands[0].press(bb.ATTACK, 0.0)
+    bb.step(bb.FIXED_STEP)
+    assert player.sword_swinging
@@ -0,0 +1,105 @@
+# A NetServer and two NetClients playing over a lossy in-memory network,
+# headless, on one simulated clock
+import math
+import random
+
+import pytest
+
+
+class MemoryTransport:
+    # Datagrams go straight into the receiving transport's inbox
+    def __init__(self, network, address):
+        self.network = network
+        self.address = address
+        self.inbox = []
+        network[address] = self
+
+    def send(self, data, address):
+        self.network[address].inbox.append((data, self.address))
+
+    def receive(self):
+        packets, self.inbox = self.inbox, []
+        return packets
+
+
+@pytest.fixture
+def net(bb):
+    import net_game
+    return net_game
+
+
+def play(bb, net, seconds, buttons, latency=0.05, jitter=0.015, loss=0.05):
+    clock = bb.SimClock()
+    network = {}
+    server_link = net.LossyTransport(MemoryTransport(network, ("server", 0)), clock, latency, jitter, loss, 1)
+    game = bb.Game(clock=clock, seed=0)
+    game.game_state = bb.MULTI_PLAYER
+    game.reset_game()
+    server = net.NetServer(server_link, game)
+    clients = []
+    for player_id in (1, 2):
+        link = net.LossyTransport(MemoryTransport(network, ("client", player_id)), clock,
+                                  latency, jitter, loss, 1 + player_id)
+        clients.append(net.NetClient(link, ("server", 0), player_id))
+    for tick in range(int(seconds / bb.FIXED_STEP)):
+        clock.advance(bb.FIXED_STEP)
+        for client in clients:
+            client.step(buttons(client.player_id, tick), bb.FIXED_STEP)
+            client.update_view()
+        server.step(bb.FIXED_STEP)
+        for p in game.players:
+            p.health = bb.MAX_HEALTH  # keep the match going
+    return game, clients
+
+
+def test_prediction_converges_on_the_server(bb, net):
+    rng = random.Random(0)
+    held = {1: 0, 2: 0}
+    moves = [0, net.LEFT, net.RIGHT]
+
+    def buttons(player_id, tick):
+        # Three seconds of random running and jumping, then hands off
+        if tick >= 180:
+            return 0
+        if tick % 20 == 0:
+            held[player_id] = rng.choice(moves)
+        return held[player_id] | (net.JUMP if rng.random() < 0.05 else 0)
+
+    game, clients = play(bb, net, 5.0, buttons)
+    for client in clients:
+        assert client.latest > 0 and client.corrections, "no snapshot was reconciled"
+        server_player = game.players[client.player_id - 1]
+        # Positions travel as fixed point with 1/4 unit steps
+        assert math.hypot(client.player.x - server_player.x, client.player.y - server_player.y) <= 0.25
+        # With nothing pressed the last corrections are just quantization
+        assert max(client.corrections[-10:]) <= 0.5
+        # The other player, as this client draws it, has settled where the server has it
+        remote = client.game.players[2 - client.player_id]
+        other = game.players[2 - client.player_id]
+        assert math.hypot(remote.x - other.x, remote.y - other.y) <= 0.5
+
+
+def test_malformed_datagrams_are_skipped(bb, net):
+    network = {}
+    game = bb.Game(clock=bb.SimClock(), seed=0)
+    game.game_state = bb.MULTI_PLAYER
+    game.reset_game()
+    server = net.NetServer(MemoryTransport(network, ("server", 0)), game)
+    client = net.NetClient(MemoryTransport(network, ("client", 1)), ("server", 0), 1)
+    stray = MemoryTransport(network, ("stray", 0))
+    for _ in range(6):
+        client.step(net.RIGHT, bb.FIXED_STEP)
+        server.step(bb.FIXED_STEP)
+    good = network[("client", 1)].inbox[-1][0]
+    for junk in (b"", b"\x01", b"\x01\x01", bytes([net.INPUT]) + bytes(8), b"\x02\x00\x00",
+                 good[:len(good) - 3]):
+        stray.send(junk, ("server", 0))
+        stray.send(junk, ("client", 1))
+    server.step(bb.FIXED_STEP)
+    client.step(net.RIGHT, bb.FIXED_STEP)
+    # Both carry on with the real traffic
+    for _ in range(6):
+        client.step(net.RIGHT, bb.FIXED_STEP)
+        server.step(bb.FIXED_STEP)
+    client.step(net.RIGHT, bb.FIXED_STEP)
+    assert client.latest == server.tick - server.tick % net.SNAPSHOT_INTERVAL
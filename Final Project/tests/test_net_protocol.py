@@ -0,0 +1,34 @@
+# Snapshot encoding round trips
+import pytest
+
+from net_protocol import encode_snapshot, decode_snapshot
+
+HEADER = (0, 2, -1, 0, 0, 0)  # input ack, game state, winner, scores, game time
+
+
+def round_trip(state, baseline=None, header=HEADER):
+    data = encode_snapshot(7, 0, header, state, baseline or {})
+    return decode_snapshot(data, baseline or {})
+
+
+def test_net_ids_past_16_bits_stay_distinct():
+    bullets = {1: (10, 20, 1), 65537: (30, 40, -1), 2**31 + 5: (50, 60, 1)}
+    _, _, state = round_trip({"bullets": bullets})
+    assert state["bullets"] == bullets
+    # and a delta against that baseline removes only the right one
+    later = {"bullets": {1: (11, 20, 1), 2**31 + 5: (50, 60, 1)}}
+    data = encode_snapshot(10, 7, HEADER, later, state)
+    _, _, decoded = decode_snapshot(data, state)
+    assert decoded["bullets"] == later["bullets"]
+
+
+def test_large_scores_fit_in_the_header():
+    header = (3, 2, 1, 40000, 2**31, 1234)
+    _, decoded, _ = round_trip({}, header=header)
+    assert decoded == header
+
+
+def test_snapshots_too_big_for_a_datagram_are_refused():
+    bullets = {net_id: (net_id, -net_id, 1) for net_id in range(1, 7000)}
+    with pytest.raises(ValueError):
+        encode_snapshot(7, 0, HEADER, {"bullets": bullets}, {})
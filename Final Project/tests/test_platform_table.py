@@ -0,0 +1,59 @@
+# PlatformTable against the per-platform landing loop it replaced, on
+# random arenas and bodies (many of them exactly on platform edges).
+# bench_platforms.py times the same loop against the table.
+import random
+
+from platform_table import PlatformTable, np
+
+
+def reference_land(platforms, x, y, vy, half_width, foot, thickness):
+    # The landing loop Player/Enemy/Grenade.update used to carry
+    for i, platform in enumerate(platforms):
+        if (x + half_width > platform.x - platform.width/2 and
+            x - half_width < platform.x + platform.width/2):
+            if (y - foot <= platform.y + thickness/2 and
+                y - foot >= platform.y - thickness/2 and
+                vy < 0):
+                return i
+    return -1
+
+
+def random_arena(bb, n_platforms, rng):
+    platforms = [bb.Platform(0, -bb.ARENA_HEIGHT/2 + 50, bb.ARENA_WIDTH * 1.5)]
+    while len(platforms) < n_platforms:
+        x = rng.uniform(-bb.ARENA_WIDTH, bb.ARENA_WIDTH)
+        y = rng.choice(range(-250, 300, 25))
+        platforms.append(bb.Platform(x, y, rng.choice([50, 100, 200])))
+    return platforms
+
+
+def random_bodies(platforms, n_bodies, foot, thickness, rng):
+    # Mix of random bodies and bodies sitting exactly on platform edges
+    bodies = []
+    for _ in range(n_bodies):
+        p = rng.choice(platforms)
+        if rng.random() < 0.5:
+            x = rng.choice([p.x - p.width/2, p.x + p.width/2, rng.uniform(-1200, 1200)])
+            y = rng.choice([p.y + thickness/2 + foot, p.y - thickness/2 + foot,
+                            p.y + rng.uniform(-thickness, thickness) + foot])
+        else:
+            x = rng.uniform(-1200, 1200)
+            y = rng.uniform(-350, 350)
+        bodies.append((x, y, rng.choice([-5.0, 0.0, 3.0, -300.0])))
+    return bodies
+
+
+def test_landing_matches_the_reference_loop(bb):
+    rng = random.Random(0)
+    kinds = [(bb.PLAYER_SIZE/2, bb.PLAYER_SIZE/2), (bb.ENEMY_SIZE/2, bb.ENEMY_SIZE/2), (0, 8)]
+    for n_platforms in (1, 8, 40, 200):
+        platforms = random_arena(bb, n_platforms, rng)
+        for half_width, foot in kinds:
+            table = PlatformTable(platforms, half_width, bb.PLATFORM_HEIGHT)
+            bodies = random_bodies(platforms, 500, foot, bb.PLATFORM_HEIGHT, rng)
+            expected = [reference_land(platforms, x, y, vy, half_width, foot, bb.PLATFORM_HEIGHT)
+                        for x, y, vy in bodies]
+            assert [table.land(x, y, vy, foot) for x, y, vy in bodies] == expected
+            if np is not None:
+                xs, ys, vys = (np.array(column) for column in zip(*bodies))
+                assert table.land_batch(xs, ys, vys, foot).tolist() == expected
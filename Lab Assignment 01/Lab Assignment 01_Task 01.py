@@ -1,7 +1,16 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+import os
 import random
+import sys
+
+# redraw.py is shared with the other labs and the Final Project, from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from redraw import RedrawScheduler
 
 
 def build_house():
@@ -115,9 +124,9 @@ def keyboardListener(key, x, y):
     glutPostRedisplay()
 
 
-def animate():
+def animate(resumed):
     raindrop_falls()
-    glutPostRedisplay()
+    return True  # the rain never stops
 
 
 def iterate():
@@ -140,13 +149,19 @@ def showScreen():
     glutSwapBuffers()
 
 
-glutInit()
-glutInitDisplayMode(GLUT_RGBA)
-glutInitWindowSize(750, 600)
-glutInitWindowPosition(0, 0)
-wind = glutCreateWindow(b"Building a House in Rainfall")
-glutDisplayFunc(showScreen)
-glutKeyboardFunc(keyboardListener)
-glutIdleFunc(animate)
-glutSpecialFunc(specialKeyListener)
-glutMainLoop()
\ No newline at end of file
+def main():
+    glutInit()
+    glutInitDisplayMode(GLUT_RGBA)
+    glutInitWindowSize(750, 600)
+    glutInitWindowPosition(0, 0)
+    glutCreateWindow(b"Building a House in Rainfall")
+    glutDisplayFunc(showScreen)
+    glutKeyboardFunc(keyboardListener)
+    glutSpecialFunc(specialKeyListener)
+    RedrawScheduler(animate).start()
+    glutMainLoop()
+
+
+# Imported without a window by the benchmarks
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,7 +1,16 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+import os
 import random
+import sys
+
+# redraw.py is shared with the other labs and the Final Project, from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from redraw import RedrawScheduler
 
 width, height = 700, 500
 pts = []
@@ -15,9 +24,13 @@ def display():
     draw_pts()
     glutSwapBuffers()
 
-def timespan(value):
-    glutPostRedisplay()
-    glutTimerFunc(16, timespan, 0)
+def step_pts(resumed):
+    # Redraws stop while paused or empty; input wakes them up again
+    if not pause:
+        move_pts()
+    return bool(pts) and not pause
+
+redraw = RedrawScheduler(step_pts)
 
 def mouse_button(button, sts, x, y):
     global pts, blnk
@@ -27,25 +40,28 @@ def mouse_button(button, sts, x, y):
         pts.append((x, height-y, n_x, n_y, clr))
     elif button == GLUT_LEFT_BUTTON and sts == GLUT_DOWN:
         blnk = not blnk
+    redraw.wake()
 
 def draw_pts():
-    global pts
     glPointSize(5)
     glBegin(GL_POINTS)
-    for i in range(len(pts)):
-        x, y, n_x, n_y, clr = pts[i]
+    for x, y, n_x, n_y, clr in pts:
         glColor3f(*clr if not blnk else [0, 0, 0])
         glVertex2f(x, y)
-        if not pause:
-            x += n_x * sped
-            y += n_y * sped
-            if x < 0 or x > width:
-                n_x = -n_x
-            if y < 0 or y > height:
-                n_y = -n_y
-            pts[i] = (x, y, n_x, n_y, clr)
     glEnd()
 
+def move_pts():
+    # Points bounce off the window edges
+    for i in range(len(pts)):
+        x, y, n_x, n_y, clr = pts[i]
+        x += n_x * sped
+        y += n_y * sped
+        if x < 0 or x > width:
+            n_x = -n_x
+        if y < 0 or y > height:
+            n_y = -n_y
+        pts[i] = (x, y, n_x, n_y, clr)
+
 def keyboard_keys(key, x, y):
     global sped
     if key == GLUT_KEY_UP:
@@ -57,15 +73,21 @@ def pause_resume(key, x, y):
     global pause
     if key == b' ':
         pause = not pause
+        redraw.wake()
+
+def main():
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB)
+    glutInitWindowSize(width, height)
+    glutCreateWindow(b"Amazing Box")
+    glOrtho(0, width, 0, height, -1, 1)
+    glutDisplayFunc(display)
+    glutSpecialFunc(keyboard_keys)
+    glutMouseFunc(mouse_button)
+    glutKeyboardFunc(pause_resume)
+    redraw.start()
+    glutMainLoop()
 
-glutInit()
-glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB)
-glutInitWindowSize(width, height)
-glutCreateWindow(b"Amazing Box")
-glOrtho(0, width, 0, height, -1, 1)
-glutDisplayFunc(display)
-glutSpecialFunc(keyboard_keys)
-glutMouseFunc(mouse_button)
-glutKeyboardFunc(pause_resume)
-glutTimerFunc(0, timespan, 0)
-glutMainLoop()
\ No newline at end of file
+# Imported without a window by the benchmarks
+if __name__ == "__main__":
+    main()
\ No newline at end of file
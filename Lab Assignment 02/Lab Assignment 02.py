@@ -1,9 +1,20 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+import os
 import random
+import sys
 import time
 
+# redraw.py is shared with the other labs and the Final Project, from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from point_batch import PointBatch
+from shape_cache import ShapeCache
+from redraw import RedrawScheduler
+
 class GameState:
     def __init__(self):
         self.catcher_left = 180
@@ -28,6 +39,9 @@ class GameState:
         self.exit_button_pos = (400, 450)
 game = GameState()
 
+# Every midpoint_line pixel of a frame, drawn at once by display()
+points = PointBatch(point_size=3)
+
 def draw_point(x, y):
     glPointSize(3)
     glBegin(GL_POINTS)
@@ -92,7 +106,12 @@ def convert_from_zone0(zone, x, y):
     elif zone == 7:
         return x, -y
 
-def midpoint_line(x0, y0, x1, y1):
+def midpoint_line(x0, y0, x1, y1, plot=None):
+    # plot(x, y) is called for each pixel of the line; by default the
+    # pixels go into the frame's point batch in the current glColor
+    if plot is None:
+        points.use_current_color()
+        plot = points.add
     zone = find_zone(x0, y0, x1, y1)
     n_x0, n_y0 = convert_to_zone0(zone, x0, y0)
     n_x1, n_y1 = convert_to_zone0(zone, x1, y1)
@@ -105,7 +124,7 @@ def midpoint_line(x0, y0, x1, y1):
     y = n_y0
     while x <= n_x1:
         orig_x, orig_y = convert_from_zone0(zone, x, y)
-        draw_point(orig_x, orig_y)
+        plot(orig_x, orig_y)
         if d <= 0:
             d += incE
             x += 1
@@ -114,56 +133,119 @@ def midpoint_line(x0, y0, x1, y1):
             x += 1
             y += 1
 
+def circle_points(cx, cy, x, y, plot):
+    # 8-way symmetry: pixel (x, y) of one octant gives one in each octant
+    plot(cx + x, cy + y)
+    plot(cx + y, cy + x)
+    plot(cx + y, cy - x)
+    plot(cx + x, cy - y)
+    plot(cx - x, cy - y)
+    plot(cx - y, cy - x)
+    plot(cx - y, cy + x)
+    plot(cx - x, cy + y)
+
+def circle_octant(r):
+    # Midpoint circle pixels from (0, r) going right until x meets y,
+    # relative to the centre
+    x = 0
+    y = r
+    d = 1 - r
+    octant = [(x, y)]
+    while x < y:
+        if d < 0:
+            d += 2 * x + 3
+        else:
+            d += 2 * (x - y) + 5
+            y -= 1
+        x += 1
+        octant.append((x, y))
+    return octant
+
+def midpoint_circle(cx, cy, r, plot=None):
+    # Like midpoint_line, plots into the frame's point batch by default
+    if plot is None:
+        points.use_current_color()
+        plot = points.add
+    for x, y in circle_octant(r):
+        circle_points(cx, cy, x, y, plot)
+
+def midpoint_disc(cx, cy, r, plot=None):
+    # Filled circle: every row from the bottom up, out to the circle's edge
+    if plot is None:
+        points.use_current_color()
+        plot = points.add
+    half_width = [0] * (r + 1)
+    for x, y in circle_octant(r):
+        half_width[y] = max(half_width[y], x)
+        half_width[x] = max(half_width[x], y)
+    for dy in range(-r, r + 1):
+        w = half_width[abs(dy)]
+        for x in range(cx - w, cx + w + 1):
+            plot(x, cy + dy)
+
+# Pixels of each shape drawn so far, rasterized by midpoint_line
+shapes = ShapeCache(midpoint_line)
+
+def draw_shape(key, x, y, segments):
+    # Draws a shape made of midpoint lines, segments ((x0, y0, x1, y1), ...)
+    # given relative to (x, y), in the current glColor. key names the
+    # shape's geometry: once a key has been rasterized, its pixels are
+    # reused and segments is ignored.
+    xs, ys = shapes.pixels(key, segments)
+    points.use_current_color()
+    points.add_pixels(xs, ys, x, y)
+
 def draw_catcher():
     glColor3f(*game.catcher_color)
-    midpoint_line(game.catcher_left, game.catcher_top, 
-                 game.catcher_right, game.catcher_top) 
-    midpoint_line(game.catcher_left, game.catcher_top, 
-                 (game.catcher_left-70 + game.catcher_right) // 2, game.catcher_bottom)  
-    midpoint_line(game.catcher_right, game.catcher_top, 
-                 (game.catcher_left+70 + game.catcher_right) // 2, game.catcher_bottom) 
-    midpoint_line((game.catcher_left + game.catcher_right) // 2 - 35, game.catcher_bottom, 
-                 (game.catcher_left + game.catcher_right) // 2 + 35, game.catcher_bottom) 
+    width = game.catcher_right - game.catcher_left
+    depth = game.catcher_bottom - game.catcher_top
+    draw_shape(("catcher", width, depth), game.catcher_left, game.catcher_top, (
+        (0, 0, width, 0),
+        (0, 0, (width - 70) // 2, depth),
+        (width, 0, (width + 70) // 2, depth),
+        (width // 2 - 35, depth, width // 2 + 35, depth)))
 
 def draw_diamond():
     if not game.diamond_falling:
         return
     glColor3f(*game.diamond_color)
     size = game.diamond_size
-    center_x = game.diamond_x
-    center_y = game.diamond_y
-    midpoint_line(center_x, center_y - size-10, center_x + size, center_y)  
-    midpoint_line(center_x + size, center_y, center_x, center_y + size+10)  
-    midpoint_line(center_x, center_y + size+10, center_x - size, center_y)  
-    midpoint_line(center_x - size, center_y, center_x, center_y - size-10)  
+    draw_shape(("diamond", size), game.diamond_x, game.diamond_y, (
+        (0, -size-10, size, 0),
+        (size, 0, 0, size+10),
+        (0, size+10, -size, 0),
+        (-size, 0, 0, -size-10)))
 
 def draw_restart_button():
     glColor3f(0.0, 1.0, 0.5)  
     x, y = game.restart_button_pos
     size = game.button_size
-    midpoint_line(x, y, x + size, y) 
-    midpoint_line(x + 10, y + 10, x, y)  
-    midpoint_line(x + 10, y - 10, x, y) 
+    draw_shape(("restart", size), x, y, (
+        (0, 0, size, 0),
+        (10, 10, 0, 0),
+        (10, -10, 0, 0)))
 
 def draw_play_pause_button():
     x, y = game.play_pause_button_pos
     size = game.button_size
+    glColor3f(0.5, 0.5, 1)  
     if game.paused:
-        glColor3f(0.5, 0.5, 1)  
-        midpoint_line(x, y - size//2, x, y + size//2)
-        midpoint_line(x, y + size//2, x + size//2, y)
-        midpoint_line(x, y - size//2, x + size//2, y)
+        draw_shape(("play", size), x, y, (
+            (0, -size//2, 0, size//2),
+            (0, size//2, size//2, 0),
+            (0, -size//2, size//2, 0)))
     else:
-        glColor3f(0.5, 0.5, 1)  
-        midpoint_line(x - size//4, y - size//2, x - size//4, y + size//2)
-        midpoint_line(x + size//4, y - size//2, x + size//4, y + size//2)
+        draw_shape(("pause", size), x, y, (
+            (-size//4, -size//2, -size//4, size//2),
+            (size//4, -size//2, size//4, size//2)))
 
 def draw_exit_button():
     glColor3f(1.0, 0.0, 0.0)  
     x, y = game.exit_button_pos
     size = game.button_size
-    midpoint_line(x - size//2, y - size//2, x + size//2, y + size//2)
-    midpoint_line(x - size//2, y + size//2, x + size//2, y - size//2)
+    draw_shape(("exit", size), x, y, (
+        (-size//2, -size//2, size//2, size//2),
+        (-size//2, size//2, size//2, -size//2)))
 
 def check_collision():
     diamond_left = game.diamond_x - game.diamond_size
@@ -228,7 +310,7 @@ def keyboard_special(key, x, y):
         if game.catcher_right + move_speed <= 500:
             game.catcher_left += move_speed
             game.catcher_right += move_speed
-    glutPostRedisplay()
+    redraw.wake()
 
 def mouse_click(button, state, x, y):
     if button == GLUT_LEFT_BUTTON and state == GLUT_DOWN:
@@ -250,8 +332,9 @@ def mouse_click(button, state, x, y):
         if (btn_x - size//2 <= x <= btn_x + size//2 and 
             btn_y - size//2 <= gl_y <= btn_y + size//2):
             print(f"Goodbye! Final Score: {game.score}")
+            print(f"Shape cache: {shapes.stats()}")
             glutLeaveMainLoop()
-    glutPostRedisplay()
+    redraw.wake()
 
 def display():
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -267,20 +350,32 @@ def display():
     draw_restart_button()
     draw_play_pause_button()
     draw_exit_button()
+    points.flush()
     glutSwapBuffers()
 
-def idle():
+def idle(resumed):
+    # Paused and game-over screens don't change, so they sleep until a
+    # click or key wakes them; the time asleep doesn't move the diamond
+    if resumed:
+        game.last_time = time.time()
     update_diamond_position()
-    glutPostRedisplay()
+    return not (game.paused or game.game_over)
+
+redraw = RedrawScheduler(idle)
+
+def main():
+    glutInit()
+    glutInitDisplayMode(GLUT_RGBA | GLUT_DOUBLE | GLUT_DEPTH)
+    glutInitWindowSize(500, 500)
+    glutInitWindowPosition(0, 0)
+    glutCreateWindow(b"Catch the Diamonds!") 
+    glutDisplayFunc(display)
+    glutSpecialFunc(keyboard_special)
+    glutMouseFunc(mouse_click)
+    spawn_new_diamond()
+    redraw.start()
+    glutMainLoop()
 
-glutInit()
-glutInitDisplayMode(GLUT_RGBA | GLUT_DOUBLE | GLUT_DEPTH)
-glutInitWindowSize(500, 500)
-glutInitWindowPosition(0, 0)
-glutCreateWindow(b"Catch the Diamonds!") 
-glutDisplayFunc(display)
-glutSpecialFunc(keyboard_special)
-glutMouseFunc(mouse_click)
-glutIdleFunc(idle)
-spawn_new_diamond()
-glutMainLoop()
\ No newline at end of file
+# Imported without a window by the benchmarks
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,102 @@
+# Times three ways of drawing a frame of random circles (the pixels are
+# checked against the lab in tests/test_midpoint_circles.py):
+#   per-pixel   midpoint_circle into draw_point, a GL_POINTS
+#               glBegin/glEnd for every pixel
+#   batched     midpoint_circle into the frame's PointBatch, one glDrawArrays
+#   vectorized  midpoint_circles into the PointBatch, one glDrawArrays
+# With --backend gl the frames are drawn in a window (glFinish after each);
+# --backend software draws them with software_gl, for machines without a
+# display.
+# Usage: python bench_circles.py [--backend gl] [--circles 10 1000] [--radius 5 50] [--filled]
+import argparse
+import os
+import random
+import sys
+import time
+
+from OpenGL.GL import glColor3f, glFinish, glOrtho
+from OpenGL.GLUT import glutInit, glutInitDisplayMode, glutInitWindowSize, glutCreateWindow, GLUT_RGB, GLUT_SINGLE
+
+# midpoint_batch.py and software_gl.py come from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from bench_midpoint import load_lab
+from midpoint_batch import midpoint_circles, midpoint_discs, np
+
+SIZE = 800
+
+
+def setup_backend(backend, lab):
+    if backend == "gl":
+        glutInit()
+        glutInitDisplayMode(GLUT_RGB | GLUT_SINGLE)
+        glutInitWindowSize(SIZE, SIZE)
+        glutCreateWindow(b"Circle benchmark")
+        glOrtho(0, SIZE, 0, SIZE, -1, 1)
+        return
+    from software_gl import Framebuffer, SoftwareGL, bind
+    import point_batch
+    gl = SoftwareGL(Framebuffer(SIZE, SIZE))
+    bind(gl, sys.modules[__name__], lab, point_batch)
+    gl.glOrtho(0, SIZE, 0, SIZE, -1, 1)
+
+
+def methods(lab, filled):
+    scalar = lab.midpoint_disc if filled else lab.midpoint_circle
+    batch = midpoint_discs if filled else midpoint_circles
+
+    def per_pixel(circles):
+        for cx, cy, r in circles:
+            scalar(cx, cy, r, lab.draw_point)
+
+    def batched(circles):
+        for cx, cy, r in circles:
+            scalar(cx, cy, r)
+        lab.points.flush()
+
+    def vectorized(circles):
+        lab.points.use_current_color()
+        lab.points.add_array(batch(np.array(circles)))
+        lab.points.flush()
+    return (("per-pixel", per_pixel), ("batched", batched), ("vectorized", vectorized))
+
+
+def time_frame(draw, circles, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        glColor3f(1.0, 0.8, 0.2)
+        draw(circles)
+        glFinish()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Midpoint circle drawing benchmark")
+    parser.add_argument("--backend", choices=["gl", "software"], default="gl")
+    parser.add_argument("--circles", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--radius", type=int, nargs="+", default=[5, 50])
+    parser.add_argument("--filled", action="store_true", help="discs instead of outlines")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lab = load_lab()
+    rng = random.Random(0)
+    setup_backend(args.backend, lab)
+    shape = "discs" if args.filled else "circles"
+    print(f"{args.backend} backend, {shape}")
+    print(f"{'circles':>8} {'radius':>7} {'pixels':>9} {'method':>11} {'ms/frame':>10} {'circles/s':>11}")
+    for n in args.circles:
+        for radius in args.radius:
+            circles = [(rng.randint(0, SIZE), rng.randint(0, SIZE), radius) for _ in range(n)]
+            pixels = len((midpoint_discs if args.filled else midpoint_circles)(circles))
+            for name, draw in methods(lab, args.filled):
+                best = time_frame(draw, circles, args.repeat)
+                print(f"{n:>8} {radius:>7} {pixels:>9} {name:>11} {best * 1000:>10.3f} {n / best:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
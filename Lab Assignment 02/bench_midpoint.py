@@ -0,0 +1,65 @@
+# Compares the speed of midpoint_lines with the lab's per-line
+# midpoint_line, in lines per second. tests/test_midpoint_lines.py checks
+# they draw the same pixels.
+# Usage: python bench_midpoint.py [--lines 100000] [--lengths 10 100]
+import argparse
+import importlib.util
+import math
+import os
+import random
+import sys
+import time
+
+# midpoint_batch.py comes from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from midpoint_batch import midpoint_lines, np
+
+LAB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Lab Assignment 02.py")
+
+
+def load_lab():
+    spec = importlib.util.spec_from_file_location("lab02", LAB)
+    lab = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lab)
+    return lab
+
+
+def random_lines(n, length, rng):
+    # n lines of about length pixels at uniform angles, so all zones are hit
+    lines = []
+    for _ in range(n):
+        x0, y0 = rng.randint(0, 500), rng.randint(0, 500)
+        angle = rng.uniform(0, 2 * math.pi)
+        lines.append((x0, y0, x0 + round(length * math.cos(angle)), y0 + round(length * math.sin(angle))))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized midpoint line benchmark")
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100])
+    args = parser.parse_args()
+
+    lab = load_lab()
+    rng = random.Random(0)
+    print(f"{'length':>7} {'lines':>8} {'pixels':>10} {'scalar lines/s':>15} {'batch lines/s':>14} {'speedup':>8}")
+    for length in args.lengths:
+        lines = random_lines(args.lines, length, rng)
+        array = np.array(lines)
+        # The scalar path is timed on a sample; it is too slow for them all
+        sample = lines[:max(1, min(len(lines), 2000000 // (length + 1)))]
+        start = time.perf_counter()
+        for line in sample:
+            lab.midpoint_line(*line, lambda x, y: None)
+        scalar = len(sample) / (time.perf_counter() - start)
+        start = time.perf_counter()
+        pixels = midpoint_lines(array)
+        batch = len(lines) / (time.perf_counter() - start)
+        print(f"{length:>7} {len(lines):>8} {len(pixels):>10} {scalar:>15.0f} {batch:>14.0f} {batch / scalar:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
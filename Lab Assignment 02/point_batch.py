@@ -0,0 +1,63 @@
+# Collects the pixels a frame plots into packed client-side arrays, x, y
+# and r, g, b as 32-bit floats, and draws them all with one glDrawArrays
+# at the end of the frame. Plotting a pixel is two array appends instead
+# of a glPointSize/glBegin/glVertex2f/glEnd round trip through PyOpenGL.
+from array import array
+
+from OpenGL.GL import (glGetFloatv, glPointSize, glEnableClientState, glDisableClientState,
+                       glVertexPointer, glColorPointer, glDrawArrays, GL_CURRENT_COLOR,
+                       GL_VERTEX_ARRAY, GL_COLOR_ARRAY, GL_FLOAT, GL_POINTS)
+
+
+class PointBatch:
+    def __init__(self, point_size=3):
+        self.point_size = point_size
+        self.coords = array("f")
+        self.colors = array("f")
+        self.color = (1.0, 1.0, 1.0)
+        self.flushes = 0
+
+    def __len__(self):
+        return len(self.coords) // 2
+
+    def set_color(self, r, g, b):
+        self.color = (r, g, b)
+
+    def use_current_color(self):
+        # Takes the color last set with glColor3f, so code that colors the
+        # immediate-mode way can plot into the batch unchanged
+        self.color = tuple(glGetFloatv(GL_CURRENT_COLOR)[:3])
+
+    def add(self, x, y):
+        self.coords.extend((x, y))
+        self.colors.extend(self.color)
+
+    def add_pixels(self, xs, ys, dx=0, dy=0):
+        # Adds a run of pixels, each moved by (dx, dy), in the current color
+        packed = [0.0] * (2 * len(xs))
+        packed[0::2] = [x + dx for x in xs]
+        packed[1::2] = [y + dy for y in ys]
+        self.coords.extend(packed)
+        self.colors.extend(self.color * len(xs))
+
+    def add_array(self, xy):
+        # Adds an (N, 2) NumPy array of pixels in the current color
+        self.coords.frombytes(xy.astype("float32").tobytes())
+        self.colors.extend(array("f", self.color) * len(xy))
+
+    def flush(self):
+        # Draws and empties the batch. GL reads the arrays through
+        # memoryviews, so fresh arrays are started instead of resizing these.
+        if not self.coords:
+            return
+        coords, colors = self.coords, self.colors
+        self.coords, self.colors = array("f"), array("f")
+        glPointSize(self.point_size)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, memoryview(coords))
+        glColorPointer(3, GL_FLOAT, 0, memoryview(colors))
+        glDrawArrays(GL_POINTS, 0, len(coords) // 2)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        self.flushes += 1
@@ -0,0 +1,48 @@
+# Rasterizes each Lab 02 shape once, in coordinates relative to the
+# shape's origin, and keeps its pixels keyed by the shape's geometry. The
+# shapes only ever move, and the midpoint algorithm plots the same pixels,
+# shifted, for a shifted line, so a shape seen before is drawn as its
+# cached pixels plus an offset. Past capacity the least recently drawn
+# shape is evicted (each new diamond size is a new shape).
+from collections import OrderedDict
+
+
+class ShapeCache:
+    def __init__(self, rasterize, capacity=32):
+        # rasterize(x0, y0, x1, y1, plot) plots one segment pixel by pixel
+        self.rasterize = rasterize
+        self.capacity = capacity
+        self.shapes = OrderedDict()  # key -> (xs, ys)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.pixels_reused = 0  # pixels drawn without rasterizing them again
+
+    def pixels(self, key, segments):
+        # (xs, ys) of a shape made of segments ((x0, y0, x1, y1), ...) in
+        # local coordinates; they are only rasterized the first time key
+        # is seen
+        shape = self.shapes.get(key)
+        if shape is not None:
+            self.shapes.move_to_end(key)
+            self.hits += 1
+            self.pixels_reused += len(shape[0])
+            return shape
+        xs, ys = [], []
+
+        def plot(x, y):
+            xs.append(x)
+            ys.append(y)
+
+        for x0, y0, x1, y1 in segments:
+            self.rasterize(x0, y0, x1, y1, plot)
+        shape = self.shapes[key] = (xs, ys)
+        self.misses += 1
+        if len(self.shapes) > self.capacity:
+            self.shapes.popitem(last=False)
+            self.evictions += 1
+        return shape
+
+    def stats(self):
+        return {"shapes": len(self.shapes), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "pixels_reused": self.pixels_reused}
@@ -0,0 +1,16 @@
+# Lab 02's modules live one folder up; bench_midpoint puts the repo's
+# shared folder on sys.path and loads "Lab Assignment 02.py" by path
+# because of the spaces in its name.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_midpoint import load_lab
+
+
+@pytest.fixture(scope="session")
+def lab():
+    return load_lab()
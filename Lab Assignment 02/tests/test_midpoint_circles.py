@@ -0,0 +1,23 @@
+# midpoint_circles and midpoint_discs against the lab's midpoint_circle
+# and midpoint_disc, including radius 0, 1 and 2 and centres at negative
+# coordinates
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from midpoint_batch import midpoint_circles, midpoint_discs
+
+
+@pytest.mark.parametrize("batch, scalar", [(midpoint_circles, "midpoint_circle"),
+                                           (midpoint_discs, "midpoint_disc")])
+def test_batch_matches_the_lab(lab, batch, scalar):
+    rng = random.Random(0)
+    for _ in range(100):
+        circles = [(rng.randint(-50, 50), rng.randint(-50, 50), rng.choice([0, 1, 2, rng.randint(0, 80)]))
+                   for _ in range(rng.randint(1, 10))]
+        expected = []
+        for circle in circles:
+            getattr(lab, scalar)(*circle, lambda x, y: expected.append([x, y]))
+        assert batch(circles).tolist() == expected, circles
@@ -0,0 +1,28 @@
+# midpoint_lines against the lab's per-line midpoint_line on random lines
+# of every zone and length, including single pixels and lines through
+# negative coordinates
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from midpoint_batch import midpoint_lines
+
+
+def reference_pixels(lab, lines):
+    pixels = []
+    for x0, y0, x1, y1 in lines:
+        lab.midpoint_line(x0, y0, x1, y1, lambda x, y: pixels.append([x, y]))
+    return pixels
+
+
+def test_midpoint_lines_matches_midpoint_line(lab):
+    rng = random.Random(0)
+    for _ in range(300):
+        reach = rng.choice([0, 1, 2, 5, 50, 500])
+        lines = [[rng.randint(-reach, reach) for _ in range(4)] for _ in range(rng.randint(1, 20))]
+        pixels, counts = midpoint_lines(lines, return_counts=True)
+        expected = reference_pixels(lab, lines)
+        assert pixels.tolist() == expected, lines
+        assert counts.sum() == len(expected)
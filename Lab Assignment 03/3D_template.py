@@ -1,6 +1,15 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+import os
+import sys
+
+# redraw.py is shared with the other labs and the Final Project, from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from redraw import RedrawScheduler
 
 # Camera-related variables
 camera_pos = (0,500,500)
@@ -84,6 +93,8 @@ def keyboardListener(key, x, y):
     # # Reset the game if R key is pressed
     # if key == b'r':
 
+    redraw.wake()  # draw the change
+
 
 def specialKeyListener(key, x, y):
     """
@@ -106,6 +117,7 @@ def specialKeyListener(key, x, y):
         x += 1  # Small angle increment for smooth movement
 
     camera_pos = (x, y, z)
+    redraw.wake()  # draw the change
 
 
 def mouseListener(button, state, x, y):
@@ -118,6 +130,8 @@ def mouseListener(button, state, x, y):
         # # Right mouse button toggles camera tracking mode
         # if button == GLUT_RIGHT_BUTTON and state == GLUT_DOWN:
 
+    redraw.wake()  # draw the change
+
 
 def setupCamera():
     """
@@ -139,13 +153,17 @@ def setupCamera():
               0, 0, 1)  # Up vector (z-axis)
 
 
-def idle():
+def idle(resumed):
     """
-    Idle function that runs continuously:
-    - Triggers screen redraw for real-time updates.
+    Runs once before each redraw:
+    - Move anything that animates here.
+    - Return True while something animates; otherwise the program sleeps
+      until input calls redraw.wake(), instead of redrawing nonstop.
     """
-    # Ensure the screen updates with the latest changes
-    glutPostRedisplay()
+    return False
+
+
+redraw = RedrawScheduler(idle)  # frames at 60 per second while idle() returns True
 
 
 def showScreen():
@@ -216,7 +234,7 @@ def main():
     glutKeyboardFunc(keyboardListener)  # Register keyboard listener
     glutSpecialFunc(specialKeyListener)
     glutMouseFunc(mouseListener)
-    glutIdleFunc(idle)  # Register the idle function to move the bullet automatically
+    redraw.start()  # Start calling idle() and redrawing, see RedrawScheduler
 
     glutMainLoop()  # Enter the GLUT main loop
 
@@ -2,7 +2,18 @@ from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
 import math
+import os
 import random
+import sys
+
+# redraw.py and text_atlas.py are shared with the other labs and the Final
+# Project, from the repo's shared folder
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+
+from redraw import RedrawScheduler
+from text_atlas import TextAtlas, CachedLine
 
 # === Game State ===
 player_pos = [0, 0]  
@@ -24,7 +35,9 @@ cheat_fire_delay = 0.5
 cheat_last_shot_time=0  
 
 # === Constants ===
-bullet_speed = 3
+bullet_speed = 180  # units per second
+gun_turn_speed = 300  # degrees per second while cheat mode aims
+MAX_DT = 0.1  # longest step taken after a stall
 enemy_speed = 20 
 enemy_size = 30
 fovY = 120
@@ -143,6 +156,25 @@ def move_enemies(dt):
             enemy['x'] += enemy_speed * dt * math.cos(angle)
             enemy['y'] += enemy_speed * dt * math.sin(angle)
 
+def move_bullets(dt):
+    global bullets, missed_bullets, game_over
+    for b in bullets:
+        rad = math.radians(b['angle'])
+        b['x'] += bullet_speed * dt * math.cos(rad)
+        b['y'] += bullet_speed * dt * math.sin(rad)
+
+    # Remove bullets that go out of bounds and count as missed
+    active_bullets = []
+    for b in bullets:
+        dist = math.hypot(b['x'] - player_pos[0], b['y'] - player_pos[1])
+        if dist > GRID_LENGTH:
+            missed_bullets += 1
+            if missed_bullets >= MAX_MISSES:
+                game_over = True
+        else:
+            active_bullets.append(b)
+    bullets = active_bullets
+
 def check_collisions():
     global bullets, enemies, score
     if game_over:
@@ -216,6 +248,11 @@ def draw_walls():
         glVertex3f(x1, y1, h)
     glEnd()
 
+# Glyphs come from a texture atlas built on the first frame; the HUD line
+# is only re-formatted when one of its numbers changes
+hud_text = TextAtlas([GLUT_BITMAP_HELVETICA_18, GLUT_BITMAP_TIMES_ROMAN_24])
+hud_line = CachedLine(lambda lives, score, missed: f"Lives: {lives}  Score: {score}  Missed: {missed}")
+
 def draw_text(x, y, text, font=GLUT_BITMAP_HELVETICA_18):
     glColor3f(1,1,1)
     glMatrixMode(GL_PROJECTION)
@@ -225,9 +262,7 @@ def draw_text(x, y, text, font=GLUT_BITMAP_HELVETICA_18):
     glMatrixMode(GL_MODELVIEW)
     glPushMatrix()
     glLoadIdentity()
-    glRasterPos2f(x, y)
-    for ch in text:
-        glutBitmapCharacter(font, ord(ch))
+    hud_text.draw(x, y, text, font)
     glPopMatrix()
     glMatrixMode(GL_PROJECTION)
     glPopMatrix()
@@ -248,30 +283,21 @@ def setupCamera():
         gluLookAt(x, y, z, player_pos[0], player_pos[1], 0, 0, 0, 1)
 
 # === Game Logic ===
-def idle():
-    global bullets, missed_bullets, start_time, last_frame_time, game_over
+def idle(resumed):
+    # Runs once per frame; returns False once the game is over, so the
+    # game-over screen sleeps until a key wakes it
+    global start_time, last_frame_time
     if game_over:
-        return
+        return False
     current_time = glutGet(GLUT_ELAPSED_TIME) / 1000
-    dt = current_time - last_frame_time
+    if resumed:
+        # The time spent asleep doesn't move anything
+        last_frame_time = current_time
+    # Movement scales with real elapsed time, so speed doesn't depend on fps
+    dt = min(current_time - last_frame_time, MAX_DT)
     last_frame_time = current_time
 
-    for b in bullets:
-        rad = math.radians(b['angle'])
-        b['x'] += bullet_speed * math.cos(rad)
-        b['y'] += bullet_speed * math.sin(rad)
-
-    # Remove bullets that go out of bounds and count as missed
-    active_bullets = []
-    for b in bullets:
-        dist = math.hypot(b['x'] - player_pos[0], b['y'] - player_pos[1])
-        if dist > GRID_LENGTH:
-            missed_bullets += 1
-            if missed_bullets >= MAX_MISSES:
-                game_over = True
-        else:
-            active_bullets.append(b)
-    bullets = active_bullets
+    move_bullets(dt)
 
     global player_gun_angle, cheat_last_shot_time
     if cheat_mode and not game_over and enemies:
@@ -283,10 +309,11 @@ def idle():
 
     # Smoothly rotate gun toward enemy
        angle_diff = (target_angle - player_gun_angle + 360) % 360
+       turn = gun_turn_speed * dt
        if angle_diff > 180:
-          player_gun_angle -= min(5, 360 - angle_diff)
+          player_gun_angle -= min(turn, 360 - angle_diff)
        else:
-          player_gun_angle += min(5, angle_diff)
+          player_gun_angle += min(turn, angle_diff)
        player_gun_angle %= 360
 
     # If aligned within 5 degrees and enemy in sight, shoot
@@ -300,7 +327,9 @@ def idle():
         check_player_collision()
 
     check_collisions()
-    glutPostRedisplay()
+    return not game_over
+
+redraw = RedrawScheduler(idle)
 
 def keyboardListener(key, x, y):
     global player_pos, player_gun_angle, first_person_view, cheat_mode, cheat_vision
@@ -326,6 +355,7 @@ def keyboardListener(key, x, y):
     elif key == b'v':
         if cheat_mode and first_person_view:
            cheat_vision = not cheat_vision
+    redraw.wake()
 
 def specialKeyListener(key, x, y):
     global camera_pos, camera_angle
@@ -339,6 +369,7 @@ def specialKeyListener(key, x, y):
     elif key == GLUT_KEY_DOWN:
         cz += 10
     camera_pos = [math.cos(math.radians(camera_angle)) * 500, math.sin(math.radians(camera_angle)) * 500, cz]
+    redraw.wake()
 
 def mouseListener(button, state, x, y):
     if game_over:
@@ -349,9 +380,11 @@ def mouseListener(button, state, x, y):
     elif button == GLUT_RIGHT_BUTTON and state == GLUT_DOWN:
         global first_person_view
         first_person_view = not first_person_view
+    redraw.wake()
 
 # === Display ===
 def showScreen():
+    hud_text.prepare()
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
     glViewport(0, 0, 1000, 800)
@@ -362,7 +395,7 @@ def showScreen():
     draw_enemies()
     # draw_text(10, 770, f"Player position: {player_pos}")
     # draw_text(10, 740, f"Gun angle: {player_gun_angle}")
-    draw_text(10, 700, f"Lives: {lives}  Score: {score}  Missed: {missed_bullets}")
+    draw_text(10, 700, hud_line(lives, score, missed_bullets))
     if game_over:
         draw_text(400, 400, "GAME OVER - Press R to Restart", GLUT_BITMAP_TIMES_ROMAN_24)
     glutSwapBuffers()
@@ -405,7 +438,7 @@ def main():
     glutKeyboardFunc(keyboardListener)
     glutSpecialFunc(specialKeyListener)
     glutMouseFunc(mouseListener)
-    glutIdleFunc(idle)
+    redraw.start()
     glutMainLoop()
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+# Loads the course programs as modules without opening a window. Their
+# file names have spaces, so they are loaded by path; each one's folder
+# goes on sys.path for its sibling imports. The GLUT setup of every
+# program only runs under __main__.
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMS = {
+    "rain": "Lab Assignment 01/Lab Assignment 01_Task 01.py",
+    "points": "Lab Assignment 01/Lab Assignment 01_Task 02.py",
+    "lines": "Lab Assignment 02/Lab Assignment 02.py",
+    "frenzy": "Lab Assignment 03/Lab Assignment 03.py",
+    "brawl": "Final Project/Final Project_3D.py",
+}
+
+
+def load_program(name):
+    if name == "brawl":
+        # The game has its own loader, shared with its headless tools
+        folder = os.path.join(ROOT, "Final Project")
+        if folder not in sys.path:
+            sys.path.insert(0, folder)
+        from bot_brawl import load_game
+        return load_game()
+    module_name = "program_" + name
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    path = os.path.join(ROOT, PROGRAMS[name])
+    folder = os.path.dirname(path)
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,114 @@
+# Renders frames of the 2D lab programs without a window or GPU: the
+# program's own display function draws into a software framebuffer (see
+# shared/software_gl.py) and the frames can be saved as a PNG or PPM
+# sequence. Frames are stepped on a fixed 60 fps clock, so a run is as
+# fast as the CPU allows and the same every time.
+# Usage: python benchmarks/render_offline.py rain [--frames 120] [--out frames/rain_%04d.png]
+import argparse
+import os
+import random
+import sys
+import time
+
+from programs import load_program
+
+STEP = 1/60.0
+
+
+class FrameClock:
+    # Stands in for the time module of programs that read time.time()
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+def setup_rain(rain, gl, points):
+    # The 350 drops and the angle the program starts with, whatever ran
+    # before (renderer() has just seeded random)
+    rain.raindrop_pos = [(random.uniform(0, 750), random.uniform(100, 600)) for _ in range(350)]
+    rain.rain_angle = 0.25
+    gl.glViewport(0, 0, 750, 600)
+    return rain.showScreen, lambda: rain.animate(False), []
+
+
+def setup_points(box, gl, points):
+    # main() sets the projection once; the points are clicked in
+    gl.glOrtho(0, box.width, 0, box.height, -1, 1)
+    box.pts = [(random.uniform(0, box.width), random.uniform(0, box.height),
+                random.choice([-1, 1]), random.choice([-1, 1]),
+                (random.random(), random.random(), random.random())) for _ in range(points)]
+    return box.display, lambda: box.step_pts(False), []
+
+
+def setup_lines(lab, gl, points):
+    clock = FrameClock()
+    saved = [(lab, {"time": lab.time})]
+    lab.time = clock
+    lab.reset_game()
+    lab.game.last_time = clock.now
+
+    def step():
+        clock.now += STEP
+        lab.idle(False)
+    return lab.display, step, saved
+
+
+# program: (window size, setup(module, gl, points) -> (display, step, saved)),
+# saved being module globals to put back afterwards, as unbind() takes them
+RENDERERS = {
+    "rain": ((750, 600), setup_rain),
+    "points": ((700, 500), setup_points),
+    "lines": ((500, 500), setup_lines),
+}
+
+
+def renderer(program, points=100, seed=0):
+    # (module, framebuffer, render(frames, pattern=None)) for a program.
+    # The program's GL names point at the software renderer until the
+    # returned render function has run.
+    module = load_program(program)
+    from software_gl import Framebuffer, SoftwareGL, bind, unbind
+    (width, height), setup = RENDERERS[program]
+    fb = Framebuffer(width, height)
+    gl = SoftwareGL(fb)
+    # Lab 02 draws its pixels through a PointBatch, which has its own GL names
+    helpers = [sys.modules[name] for name in ("point_batch",) if name in sys.modules]
+    saved = bind(gl, module, *helpers)
+    random.seed(seed)
+    display, step, restore = setup(module, gl, points)
+    saved += restore
+
+    def render(frames, pattern=None):
+        try:
+            for frame in range(frames):
+                step()
+                display()
+                if pattern:
+                    fb.save(pattern % frame)
+        finally:
+            unbind(saved)
+    return module, fb, render
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render lab program frames without a GPU")
+    parser.add_argument("program", choices=sorted(RENDERERS))
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--out", help="file name pattern, e.g. frames/rain_%%04d.png (or .ppm)")
+    parser.add_argument("--points", type=int, default=100, help="bouncing points for the points program")
+    args = parser.parse_args()
+
+    if args.out and os.path.dirname(args.out):
+        os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    module, fb, render = renderer(args.program, args.points)
+    start = time.perf_counter()
+    render(args.frames, args.out)
+    elapsed = time.perf_counter() - start
+    print(f"{args.program}: {args.frames} frames of {fb.width}x{fb.height} in {elapsed:.3f} s, "
+          f"{args.frames / elapsed:.1f} frames/s" + (f", written to {args.out}" if args.out else ""))
+
+
+if __name__ == "__main__":
+    main()
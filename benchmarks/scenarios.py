@@ -0,0 +1,171 @@
+# Workloads for the benchmark suite, one or more per program. A scenario
+# has a parameter grid and a setup(module, **params) that builds the
+# program's state from a fixed seed and returns the function to time.
+# Only program logic is timed; nothing here makes a GL call.
+import itertools
+import math
+import random
+
+DT = 1/60.0  # step for the programs that take a dt
+
+
+def rain_fall(rain, drops, ticks):
+    random.seed(0)
+    rain.raindrop_pos = [(random.uniform(0, 750), random.uniform(100, 600)) for _ in range(drops)]
+    rain.rain_angle = 0.25
+
+    def run():
+        for _ in range(ticks):
+            rain.raindrop_falls()
+    return run
+
+
+def points_bounce(points, count, ticks):
+    random.seed(0)
+    points.pts = [(random.uniform(0, points.width), random.uniform(0, points.height),
+                   random.choice([-1, 1]), random.choice([-1, 1]),
+                   (random.random(), random.random(), random.random())) for _ in range(count)]
+    points.sped = 1.0
+
+    def run():
+        for _ in range(ticks):
+            points.move_pts()
+    return run
+
+
+def lines_midpoint(lines, length, count):
+    # count lines of about length pixels at random angles, so all eight
+    # zones are covered; pixels go to a no-op plot
+    random.seed(0)
+    segments = []
+    for _ in range(count):
+        x0, y0 = random.randint(0, 500), random.randint(0, 500)
+        angle = random.uniform(0, 2 * math.pi)
+        segments.append((x0, y0, x0 + round(length * math.cos(angle)), y0 + round(length * math.sin(angle))))
+
+    def plot(x, y):
+        pass
+
+    def run():
+        for x0, y0, x1, y1 in segments:
+            lines.midpoint_line(x0, y0, x1, y1, plot)
+    return run
+
+
+def lines_batch(lines, length, count):
+    # The lines_midpoint workload through the NumPy midpoint_lines
+    from midpoint_batch import midpoint_lines, np
+    if np is None:
+        raise ImportError("midpoint_lines needs NumPy")
+    random.seed(0)
+    segments = []
+    for _ in range(count):
+        x0, y0 = random.randint(0, 500), random.randint(0, 500)
+        angle = random.uniform(0, 2 * math.pi)
+        segments.append((x0, y0, x0 + round(length * math.cos(angle)), y0 + round(length * math.sin(angle))))
+    segments = np.array(segments)
+
+    def run():
+        midpoint_lines(segments)
+    return run
+
+
+def frenzy_tick(frenzy, enemies, bullets, ticks):
+    # The idle() step without its clock: bullets fly, enemies chase, hits
+    # are resolved. Lives and misses are unlimited so the round never
+    # ends, and bullets that leave the arena are fired again.
+    random.seed(0)
+    frenzy.player_pos = [0, 0]
+    frenzy.game_over = False
+    frenzy.lives = math.inf
+    frenzy.MAX_MISSES = math.inf
+    frenzy.missed_bullets = 0
+    frenzy.score = 0
+    frenzy.enemies.clear()
+    for _ in range(enemies):
+        frenzy.add_enemy()
+    frenzy.bullets = []
+
+    def run():
+        for _ in range(ticks):
+            while len(frenzy.bullets) < bullets:
+                frenzy.player_gun_angle = random.uniform(0, 360)
+                frenzy.mouseListener(frenzy.GLUT_LEFT_BUTTON, frenzy.GLUT_DOWN, 0, 0)
+            frenzy.move_bullets(DT)
+            frenzy.move_enemies(DT)
+            frenzy.check_player_collision()
+            frenzy.check_collisions()
+    return run
+
+
+def brawl_crowd(bb, backend, enemies, ticks):
+    # Game.update with a crowd of enemies and an immortal player
+    random.seed(0)
+    game = bb.Game(clock=bb.SimClock(), backend=backend, seed=0)
+    game.game_state = bb.SINGLE_PLAYER
+    game.reset_game()
+    game.players[0].health = math.inf
+    for _ in range(enemies):
+        game.add_enemy(random.uniform(-bb.ARENA_WIDTH/2, bb.ARENA_WIDTH/2),
+                       random.uniform(-bb.ARENA_HEIGHT/2 + 50, bb.ARENA_HEIGHT/2 - 50))
+
+    def run():
+        for _ in range(ticks):
+            game.clock.advance(bb.FIXED_STEP)
+            game.update(bb.FIXED_STEP)
+    return run
+
+
+def brawl_match(bb, backend, mode, ticks):
+    # Idle matches as run_headless plays them, restarted when one ends
+    mode = {"single": bb.SINGLE_PLAYER, "multi": bb.MULTI_PLAYER}[mode]
+    game = bb.Game(clock=bb.SimClock(), backend=backend, seed=0)
+    game.game_state = mode
+    game.reset_game()
+
+    def run():
+        for _ in range(ticks):
+            game.clock.advance(bb.FIXED_STEP)
+            game.update(bb.FIXED_STEP)
+            if game.game_state == bb.GAME_OVER:
+                game.game_state = mode
+                game.reset_game()
+    return run
+
+
+def software_render(program):
+    # Frames of a 2D program drawn by the software renderer, see
+    # render_offline.py; nothing is saved
+    def setup(module, frames):
+        from render_offline import renderer
+        _, _, render = renderer(program)
+        return lambda: render(frames)
+    return setup
+
+
+# name, program (see programs.PROGRAMS), parameter grid, setup
+SCENARIOS = [
+    ("rain.fall", "rain", {"drops": [350, 5000, 50000], "ticks": [100]}, rain_fall),
+    ("points.bounce", "points", {"count": [100, 1000, 10000], "ticks": [100]}, points_bounce),
+    ("lines.midpoint", "lines", {"length": [10, 100, 1000], "count": [200]}, lines_midpoint),
+    ("lines.batch", "lines", {"length": [10, 100, 1000], "count": [200, 5000]}, lines_batch),
+    ("rain.render", "rain", {"frames": [30]}, software_render("rain")),
+    ("points.render", "points", {"frames": [30]}, software_render("points")),
+    ("lines.render", "lines", {"frames": [30]}, software_render("lines")),
+    ("frenzy.tick", "frenzy", {"enemies": [5, 100, 1000], "bullets": [10, 100], "ticks": [60]}, frenzy_tick),
+    ("brawl.crowd", "brawl", {"backend": ["objects", "numpy"], "enemies": [10, 100, 1000],
+                              "ticks": [120]}, brawl_crowd),
+    ("brawl.match", "brawl", {"backend": ["objects", "numpy"], "mode": ["single", "multi"],
+                              "ticks": [1800]}, brawl_match),
+]
+
+
+def expand(grid):
+    # {"a": [1, 2], "b": [3]} -> [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def case_key(name, params):
+    # Identifies one case across result files, e.g. "rain.fall[drops=350,ticks=100]"
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
@@ -0,0 +1,107 @@
+# Benchmark suite for the lab programs and the final project. Each case
+# of each scenario (see scenarios.py) is set up afresh and timed --repeat
+# times; the best and median times go to a JSON results file. compare
+# checks a results file against a saved baseline and exits with status 1
+# if any case got slower than the threshold allows.
+# Usage: python benchmarks/suite.py run [--only brawl lines] [--repeat 5] [--out results.json]
+#        python benchmarks/suite.py compare baseline.json results.json [--threshold 0.1]
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+from programs import load_program
+from scenarios import SCENARIOS, expand, case_key
+
+
+def time_case(module, setup, params, repeat):
+    times = []
+    for _ in range(repeat):
+        run = setup(module, **params)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_suite(only, repeat):
+    results = []
+    for name, program, grid, setup in SCENARIOS:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        module = load_program(program)
+        for params in expand(grid):
+            key = case_key(name, params)
+            try:
+                times = time_case(module, setup, params, repeat)
+            except ImportError as e:  # the NumPy backend is optional
+                print(f"{key:<60} skipped: {e}")
+                continue
+            best, median = min(times), statistics.median(times)
+            print(f"{key:<60} best {best * 1000:>10.3f} ms  median {median * 1000:>10.3f} ms")
+            results.append({"key": key, "scenario": name, "program": program, "params": params,
+                            "best": best, "median": median, "times": times})
+    return results
+
+
+def compare(baseline, current, threshold):
+    # Cases are matched by key and judged on their best time, the least
+    # noisy of the numbers. Returns the keys that regressed.
+    old = {r["key"]: r for r in baseline["results"]}
+    regressed = []
+    print(f"{'case':<60} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for r in current["results"]:
+        base = old.pop(r["key"], None)
+        if base is None:
+            print(f"{r['key']:<60} {'-':>12} {r['best'] * 1000:>11.3f}      new")
+            continue
+        change = r["best"] / base["best"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(r["key"])
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{r['key']:<60} {base['best'] * 1000:>12.3f} {r['best'] * 1000:>11.3f} {change:>+8.1%}{flag}")
+    for key in old:
+        print(f"{key:<60} missing from the current results")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the lab programs and Bot Brawl")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="time every case and save the results")
+    run.add_argument("--only", nargs="+", help="scenarios whose name contains one of these")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--out", default="benchmark_results.json")
+    check = commands.add_parser("compare", help="flag regressions against a baseline")
+    check.add_argument("baseline")
+    check.add_argument("current")
+    check.add_argument("--threshold", type=float, default=0.10,
+                       help="allowed slowdown as a fraction of the baseline time")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_suite(args.only, args.repeat)
+        with open(args.out, "w") as f:
+            json.dump({"python": sys.version.split()[0], "machine": platform.platform(),
+                       "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": args.repeat,
+                       "results": results}, f, indent=2)
+        print(f"wrote {len(results)} results to {args.out}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressed = compare(baseline, current, args.threshold)
+        if regressed:
+            print(f"{len(regressed)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
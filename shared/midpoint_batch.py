@@ -0,0 +1,155 @@
+# Rasterizes many midpoint lines at once with NumPy. midpoint_lines takes
+# an (N, 4) array of x0, y0, x1, y1 rows and returns every pixel of every
+# line as one (M, 2) array, line after line and in the same order
+# midpoint_line plots them.
+#
+# Zones and the zone 0 transforms come from tables indexed by zone, so a
+# whole array of lines is classified and converted at once. In zone 0
+# (0 <= dy <= dx) the decision variable never has to be stepped: after k
+# steps the line has taken NE ceil((2*dy*k - dx) / (2*dx)) times, the
+# true y rounded half down, which is what d <= 0 choosing E gives. Every
+# pixel is then computed independently. Endpoints must be whole numbers.
+#
+# midpoint_circles and midpoint_discs do the same for (N, 3) arrays of
+# cx, cy, r circles. The circle decision variable has no closed form, so
+# all circles step through their octant together, one NumPy operation
+# per step for all of them, and the octant is mirrored eight ways.
+try:
+    import numpy as np
+except ImportError:  # the per-line midpoint_line doesn't need NumPy
+    np = None
+
+# ZONES[steep, x_back, y_down], the zone find_zone gives a line. x_back is
+# dx < 0, or dx <= 0 going down, so a vertical line falls in zone 1 going
+# up and zone 5 going down.
+ZONES = (((0, 7), (3, 4)),
+         ((1, 6), (2, 5)))
+# (x, y) -> (a*x + b*y, c*x + d*y) as rows (a, b, c, d), indexed by zone
+TO_ZONE0 = ((1, 0, 0, 1), (0, 1, 1, 0), (0, 1, -1, 0), (-1, 0, 0, 1),
+            (-1, 0, 0, -1), (0, -1, -1, 0), (0, -1, 1, 0), (1, 0, 0, -1))
+FROM_ZONE0 = ((1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+              (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1))
+# The eight mirror images of an octant pixel (x, y), in the same form and
+# in the order circle_points plots them
+MIRRORS = ((1, 0, 0, 1), (0, 1, 1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, -1, 1, 0), (-1, 0, 0, 1))
+
+if np is not None:
+    ZONE_TABLE = np.array(ZONES, dtype=np.int8)
+    TO_TABLE = np.array(TO_ZONE0, dtype=np.int64)
+    FROM_TABLE = np.array(FROM_ZONE0, dtype=np.int64)
+    MIRROR_TABLE = np.array(MIRRORS, dtype=np.int64)
+
+
+def find_zones(dx, dy):
+    steep = np.abs(dx) <= np.abs(dy)
+    y_down = dy < 0
+    x_back = np.where(y_down, dx <= 0, dx < 0)
+    return ZONE_TABLE[steep.astype(np.intp), x_back.astype(np.intp), y_down.astype(np.intp)]
+
+
+def transform(table, zones, x, y):
+    a, b, c, d = table[zones].T
+    return a*x + b*y, c*x + d*y
+
+
+def whole_numbers(array, columns, what):
+    array = np.asarray(array)
+    if array.ndim != 2 or array.shape[1] != columns:
+        raise ValueError(f"expected an (N, {columns}) array of {what}, got shape {array.shape}")
+    if array.dtype.kind != "i" and not np.array_equal(array, np.round(array)):
+        raise ValueError(f"{what} need whole numbers")
+    return array.astype(np.int64, copy=False)
+
+
+def midpoint_lines(lines, return_counts=False):
+    # With return_counts, also returns each line's pixel count, e.g. to
+    # split the pixels with np.split(pixels, np.cumsum(counts)[:-1])
+    lines = whole_numbers(lines, 4, "lines")
+    x0, y0, x1, y1 = lines.T
+    zones = find_zones(x1 - x0, y1 - y0)
+    # The transforms are linear, so only the deltas need converting
+    dx, dy = transform(TO_TABLE, zones, x1 - x0, y1 - y0)
+    counts = dx + 1
+
+    # Line number and step k of every pixel
+    line = np.repeat(np.arange(len(lines)), counts)
+    starts = np.cumsum(counts) - counts
+    k = np.arange(len(line)) - starts[line]
+    # j = ceil((2*dy*k - dx) / (2*dx)) NE steps; a line of one pixel has
+    # dx == 0, k == 0 and j == 0
+    j = (2 * dy[line] * k + np.maximum(dx - 1, 0)[line]) // np.maximum(2 * dx, 1)[line]
+    # Pixel = start + the (k, j) step converted back out of zone 0
+    a, b, c, d = FROM_TABLE[zones].T
+    pixels = np.empty((len(line), 2), dtype=np.int64)
+    pixels[:, 0] = x0[line] + a[line] * k + b[line] * j
+    pixels[:, 1] = y0[line] + c[line] * k + d[line] * j
+    if return_counts:
+        return pixels, counts
+    return pixels
+
+
+def circle_octants(radii):
+    # circle_octant for every radius at once: (Y, counts), where octant
+    # pixel s of circle i is (s, Y[i, s]) for s < counts[i]
+    if (radii < 0).any():
+        raise ValueError("circle radii can't be negative")
+    y = radii.copy()
+    d = 1 - radii
+    counts = np.ones(len(radii), dtype=np.int64)
+    rows = [y.copy()]
+    x = 0
+    while True:
+        active = x < y
+        if not active.any():
+            break
+        down = active & (d >= 0)
+        d += np.where(down, 2 * (x - y) + 5, 2 * x + 3) * active
+        y -= down
+        counts += active
+        x += 1
+        rows.append(y.copy())
+    return np.stack(rows, axis=1), counts
+
+
+def midpoint_circles(circles, return_counts=False):
+    # Every pixel midpoint_circle plots, in the same order, circle after
+    # circle; counts are per circle
+    cx, cy, r = whole_numbers(circles, 3, "circles").T
+    Y, counts = circle_octants(r)
+    X = np.arange(Y.shape[1])
+    a, b, c, d = MIRROR_TABLE.T
+    # (circle, step, mirror)
+    xs = cx[:, None, None] + a * X[None, :, None] + b * Y[:, :, None]
+    ys = cy[:, None, None] + c * X[None, :, None] + d * Y[:, :, None]
+    valid = X[None, :] < counts[:, None]
+    pixels = np.stack((xs[valid], ys[valid]), axis=-1).reshape(-1, 2)
+    if return_counts:
+        return pixels, 8 * counts
+    return pixels
+
+
+def midpoint_discs(circles, return_counts=False):
+    # Every pixel midpoint_disc plots, in the same order, disc after disc
+    cx, cy, r = whole_numbers(circles, 3, "circles").T
+    Y, counts = circle_octants(r)
+    circle, step = np.nonzero(np.arange(Y.shape[1])[None, :] < counts[:, None])
+    # Half width of each row above (and mirrored below) the centre
+    half_width = np.zeros((len(r), r.max(initial=0) + 1), dtype=np.int64)
+    np.maximum.at(half_width, (circle, Y[circle, step]), step)
+    np.maximum.at(half_width, (circle, step), Y[circle, step])
+
+    # Rows from cy - r to cy + r, then the pixels of each row left to right
+    row_counts = 2 * r + 1
+    row_circle = np.repeat(np.arange(len(r)), row_counts)
+    dy = np.arange(len(row_circle)) - (np.cumsum(row_counts) - row_counts)[row_circle] - r[row_circle]
+    w = half_width[row_circle, np.abs(dy)]
+    widths = 2 * w + 1
+    row = np.repeat(np.arange(len(row_circle)), widths)
+    k = np.arange(len(row)) - (np.cumsum(widths) - widths)[row]
+    pixels = np.empty((len(row), 2), dtype=np.int64)
+    pixels[:, 0] = cx[row_circle][row] - w[row] + k
+    pixels[:, 1] = cy[row_circle][row] + dy[row]
+    if return_counts:
+        return pixels, np.bincount(row_circle, weights=widths, minlength=len(r)).astype(np.int64)
+    return pixels
@@ -0,0 +1,90 @@
+# Redraw scheduling for GLUT programs. An idle callback that posts a
+# redisplay on every pass redraws as fast as the machine allows, even on a
+# menu, paused or game-over screen that isn't changing, and keeps a CPU
+# core busy. Instead, frames are driven by glutTimerFunc at fixed
+# deadlines while the program animates. When nothing animates the timer
+# stops and GLUT's main loop sleeps until input arrives. Input handlers
+# call wake() to get a frame for the change (and to resume animating, if
+# update() says so).
+#
+# mode="spin" brings back the old idle-callback behaviour for comparison.
+# With report set, the CPU time used per second of wall time is printed
+# every report seconds. Both default to the REDRAW_MODE and REDRAW_REPORT
+# environment variables, so programs without a command line can be
+# measured too.
+import os
+import time
+
+from OpenGL.GLUT import glutIdleFunc, glutPostRedisplay, glutTimerFunc
+
+DEFAULT_FPS = 60
+
+
+class RedrawScheduler:
+    def __init__(self, update, fps=DEFAULT_FPS, mode=None, report=None,
+                 clock=time.perf_counter, cpu_clock=time.process_time):
+        # update(resumed) runs once per frame before the redraw and returns
+        # True while the program animates, i.e. needs frames without input.
+        # resumed is True on the first frame after sleeping.
+        self.update = update
+        self.period = 1.0 / fps
+        self.mode = mode or os.environ.get("REDRAW_MODE", "timer")
+        self.report = report if report is not None else float(os.environ.get("REDRAW_REPORT", 0))
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.deadline = None  # when the next frame is due; None while asleep
+        self.running = False  # start() has been called
+        self.pending = False  # a frame timer is registered
+        self.frames = 0
+        self.report_start = None
+
+    def start(self):
+        # Call once the window and its callbacks are set up, before glutMainLoop
+        self.running = True
+        if self.mode == "spin":
+            glutIdleFunc(self.spin)
+        else:
+            self.wake()
+        if self.report:
+            self.report_start = (self.clock(), self.cpu_clock(), self.frames)
+            glutTimerFunc(round(self.report * 1000), self.print_report, 0)
+
+    def wake(self):
+        # Schedules a frame now unless one is already due. Does nothing
+        # before start(), e.g. when the program is driven without a window.
+        if self.running and not self.pending and self.mode != "spin":
+            self.pending = True
+            glutTimerFunc(0, self.tick, 0)
+
+    def tick(self, value):
+        # pending stays set while update() runs: a wake() from inside it is
+        # covered by this frame
+        resumed = self.deadline is None
+        animating = self.update(resumed)
+        # Redrawn even when this is the last frame, to show where update() left things
+        glutPostRedisplay()
+        self.frames += 1
+        if not animating:
+            self.pending = False
+            self.deadline = None
+            return
+        now = self.clock()
+        if resumed or now > self.deadline + self.period:
+            self.deadline = now  # first frame, or too far behind to catch up
+        self.deadline += self.period
+        glutTimerFunc(max(0, round((self.deadline - now) * 1000)), self.tick, 0)
+
+    def spin(self):
+        # The old behaviour: update and redraw on every pass of the main loop
+        self.update(False)
+        glutPostRedisplay()
+        self.frames += 1
+
+    def print_report(self, value):
+        now, cpu = self.clock(), self.cpu_clock()
+        start, start_cpu, start_frames = self.report_start
+        wall = now - start
+        print(f"redraw ({self.mode}): {1000 * (cpu - start_cpu) / wall:.1f} ms CPU per second, "
+              f"{(self.frames - start_frames) / wall:.1f} frames/s")
+        self.report_start = (now, cpu, self.frames)
+        glutTimerFunc(round(self.report * 1000), self.print_report, 0)
@@ -0,0 +1,291 @@
+# Software 2D renderer for the lab programs, so their frames can be drawn
+# without a GL context (on a machine with no GPU or display) and saved as
+# PNG or PPM files. SoftwareGL has the immediate-mode subset of GL the labs
+# use, under the same names: bind() swaps them into a program's module, and
+# its own drawing code then runs unchanged against a NumPy framebuffer.
+#
+# Framebuffer draws points as size x size squares, lines with the midpoint
+# algorithm (see midpoint_batch.py), thickened across their major axis, and
+# triangles as the pixels whose centres they cover. Colors are interpolated
+# between vertices as GL's default smooth shading does. Pixels are counted
+# from the bottom left, like GL window coordinates.
+import struct
+import zlib
+
+import numpy as np
+
+from midpoint_batch import midpoint_lines
+
+# GL enums, by value so PyOpenGL's constants compare equal to them
+GL_POINTS = 0x0000
+GL_LINES = 0x0001
+GL_TRIANGLES = 0x0004
+GL_CURRENT_COLOR = 0x0B00
+GL_MODELVIEW = 0x1700
+GL_PROJECTION = 0x1701
+
+
+class Framebuffer:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)  # row 0 is the bottom
+
+    def clear(self, color):
+        self.pixels[:] = to_bytes(color)
+
+    def stamp(self, xs, ys, colors, dxs, dys):
+        # Sets pixel (x + dx, y + dy) for every pixel and every offset,
+        # clipped to the framebuffer; later pixels win
+        for dx in dxs:
+            for dy in dys:
+                x = xs + dx
+                y = ys + dy
+                inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+                self.pixels[y[inside], x[inside]] = colors[inside]
+
+    def points(self, xy, colors, size):
+        # xy: (N, 2) window coordinates; colors: (N, 3) floats in 0-1
+        size = max(1, int(round(size)))
+        corner = np.floor(xy - size / 2 + 0.5).astype(np.int64)
+        offsets = range(size)
+        self.stamp(corner[:, 0], corner[:, 1], to_bytes(colors), offsets, offsets)
+
+    def lines(self, ends, colors, width):
+        # ends: (N, 4) window x0, y0, x1, y1; colors: (N, 2, 3) at each end
+        ends = np.floor(ends).astype(np.int64)
+        pixels, counts = midpoint_lines(ends, return_counts=True)
+        line = np.repeat(np.arange(len(ends)), counts)
+        step = np.arange(len(line)) - (np.cumsum(counts) - counts)[line]
+        t = (step / np.maximum(counts - 1, 1)[line])[:, None]
+        rgb = to_bytes(colors[line, 0] * (1 - t) + colors[line, 1] * t)
+        width = max(1, int(round(width)))
+        offsets = range(-((width - 1) // 2), width // 2 + 1)
+        x_major = (np.abs(ends[:, 2] - ends[:, 0]) >= np.abs(ends[:, 3] - ends[:, 1]))[line]
+        for major, dxs, dys in ((True, (0,), offsets), (False, offsets, (0,))):
+            pick = x_major == major
+            self.stamp(pixels[pick, 0], pixels[pick, 1], rgb[pick], dxs, dys)
+
+    def triangle(self, xy, colors):
+        # xy: (3, 2) window coordinates; colors: (3, 3)
+        lo = np.maximum(np.floor(xy.min(axis=0)).astype(int), 0)
+        hi = np.minimum(np.ceil(xy.max(axis=0)).astype(int), (self.width, self.height))
+        if (hi <= lo).any():
+            return
+        (ax, ay), (bx, by), (cx, cy) = xy
+        area = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        if area == 0:
+            return
+        px, py = np.meshgrid(np.arange(lo[0], hi[0]) + 0.5, np.arange(lo[1], hi[1]) + 0.5)
+        # Barycentric weights of each pixel centre, all >= 0 inside
+        wa = ((bx - px) * (cy - py) - (by - py) * (cx - px)) / area
+        wb = ((cx - px) * (ay - py) - (cy - py) * (ax - px)) / area
+        wc = 1 - wa - wb
+        inside = (wa >= 0) & (wb >= 0) & (wc >= 0)
+        weights = np.stack((wa[inside], wb[inside], wc[inside]), axis=1)
+        self.pixels[py[inside].astype(int), px[inside].astype(int)] = to_bytes(weights @ colors)
+
+    def image(self):
+        # Rows top to bottom, as image files store them
+        return self.pixels[::-1]
+
+    def save(self, path):
+        # PPM or PNG by the file extension, written with one write call
+        if path.lower().endswith(".png"):
+            data = encode_png(self.image())
+        else:
+            data = encode_ppm(self.image())
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def to_bytes(colors):
+    return np.clip(np.asarray(colors, dtype=np.float64) * 255 + 0.5, 0, 255).astype(np.uint8)
+
+
+def encode_ppm(image):
+    height, width, _ = image.shape
+    return b"P6\n%d %d\n255\n" % (width, height) + np.ascontiguousarray(image).tobytes()
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(image, level=6):
+    # 8-bit RGB, every row with filter type 0 (none)
+    height, width, _ = image.shape
+    rows = np.zeros((height, 1 + width * 3), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, -1)
+    return (b"\x89PNG\r\n\x1a\n"
+            + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level))
+            + png_chunk(b"IEND", b""))
+
+
+def ortho(left, right, bottom, top):
+    # glOrtho's x and y as (scale x, offset x, scale y, offset y)
+    return (2 / (right - left), -(right + left) / (right - left),
+            2 / (top - bottom), -(top + bottom) / (top - bottom))
+
+
+IDENTITY = (1.0, 0.0, 1.0, 0.0)
+
+
+class SoftwareGL:
+    # The GL calls the 2D labs make, drawing into a Framebuffer. Only x/y
+    # orthographic transforms are modelled: glOrtho and glLoadIdentity on
+    # the modelview and projection matrices, and glViewport.
+    # Primitives are GL_POINTS, GL_LINES and GL_TRIANGLES, and glGetFloatv
+    # only knows GL_CURRENT_COLOR; anything else raises ValueError.
+    def __init__(self, framebuffer):
+        self.fb = framebuffer
+        self.matrices = {GL_MODELVIEW: IDENTITY, GL_PROJECTION: IDENTITY}
+        self.matrix_mode = GL_MODELVIEW
+        self.viewport = (0, 0, framebuffer.width, framebuffer.height)
+        self.color = (1.0, 1.0, 1.0)
+        self.clear_color = (0.0, 0.0, 0.0)
+        self.point_size = 1.0
+        self.line_width = 1.0
+        self.mode = None
+        self.vertices = []
+        self.colors = []
+        # glBegin(GL_POINTS) blocks are held back and drawn together (one
+        # point per block is common) before anything else is drawn or the
+        # point size or transform changes
+        self.queued_points = []
+        self.queued_colors = []
+        self.arrays = {}
+        self.frames = 0
+
+    def to_window(self, xy):
+        # (N, 2) object coordinates -> window coordinates
+        mx, ox, my, oy = self.matrices[GL_MODELVIEW]
+        px, qx, py, qy = self.matrices[GL_PROJECTION]
+        vx, vy, vw, vh = self.viewport
+        x = px * (mx * xy[:, 0] + ox) + qx
+        y = py * (my * xy[:, 1] + oy) + qy
+        return np.stack((vx + (x + 1) * vw / 2, vy + (y + 1) * vh / 2), axis=1)
+
+    def flush_points(self):
+        if self.queued_points:
+            points, colors = self.queued_points, self.queued_colors
+            self.queued_points, self.queued_colors = [], []
+            self.draw(GL_POINTS, points, colors)
+
+    def draw(self, mode, vertices, colors):
+        self.flush_points()
+        xy = self.to_window(np.asarray(vertices, dtype=np.float64).reshape(-1, 2))
+        colors = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+        if mode == GL_POINTS:
+            self.fb.points(xy, colors, self.point_size)
+        elif mode == GL_LINES:
+            n = len(xy) // 2 * 2
+            self.fb.lines(xy[:n].reshape(-1, 4), colors[:n].reshape(-1, 2, 3), self.line_width)
+        elif mode == GL_TRIANGLES:
+            for i in range(0, len(xy) - 2, 3):
+                self.fb.triangle(xy[i:i + 3], colors[i:i + 3])
+        else:
+            raise ValueError(f"SoftwareGL can't draw primitive mode {mode}")
+
+    # Immediate mode
+    def glBegin(self, mode):
+        self.mode = mode
+        self.vertices = []
+        self.colors = []
+
+    def glVertex2f(self, x, y):
+        self.vertices.append((x, y))
+        self.colors.append(self.color)
+
+    def glEnd(self):
+        if self.mode == GL_POINTS:
+            self.queued_points += self.vertices
+            self.queued_colors += self.colors
+        elif self.vertices:
+            self.draw(self.mode, self.vertices, self.colors)
+        self.mode = None
+
+    def glColor3f(self, r, g, b):
+        self.color = (r, g, b)
+
+    def glGetFloatv(self, name):
+        if name != GL_CURRENT_COLOR:
+            raise ValueError(f"SoftwareGL can't get {name}")
+        return [*self.color, 1.0]
+
+    def glPointSize(self, size):
+        if size != self.point_size:
+            self.flush_points()
+        self.point_size = size
+
+    def glLineWidth(self, width):
+        self.line_width = width
+
+    # Client-side vertex arrays, as PointBatch draws them
+    def glEnableClientState(self, array):
+        pass
+
+    def glDisableClientState(self, array):
+        pass
+
+    def glVertexPointer(self, size, kind, stride, data):
+        self.arrays["vertex"] = np.frombuffer(data, dtype=np.float32).reshape(-1, size)[:, :2]
+
+    def glColorPointer(self, size, kind, stride, data):
+        self.arrays["color"] = np.frombuffer(data, dtype=np.float32).reshape(-1, size)[:, :3]
+
+    def glDrawArrays(self, mode, first, count):
+        self.draw(mode, self.arrays["vertex"][first:first + count], self.arrays["color"][first:first + count])
+
+    # Frame and transform state
+    def glClearColor(self, r, g, b, a=1.0):
+        self.clear_color = (r, g, b)
+
+    def glClear(self, mask):
+        self.flush_points()
+        self.fb.clear(self.clear_color)
+
+    def glViewport(self, x, y, width, height):
+        self.flush_points()
+        self.viewport = (x, y, width, height)
+
+    def glMatrixMode(self, mode):
+        self.matrix_mode = mode
+
+    def glLoadIdentity(self):
+        self.flush_points()
+        self.matrices[self.matrix_mode] = IDENTITY
+
+    def glOrtho(self, left, right, bottom, top, near, far):
+        self.flush_points()
+        sx, ox, sy, oy = ortho(left, right, bottom, top)
+        mx, mox, my, moy = self.matrices[self.matrix_mode]
+        self.matrices[self.matrix_mode] = (mx * sx, mx * ox + mox, my * sy, my * oy + moy)
+
+    def glFinish(self):
+        self.flush_points()
+
+    def glutSwapBuffers(self):
+        self.flush_points()
+        self.frames += 1
+
+    def glutPostRedisplay(self):
+        pass
+
+
+def bind(gl, *modules):
+    # Points each module's GL names that SoftwareGL has at gl's methods.
+    # Returns what they were, for unbind().
+    saved = []
+    for module in modules:
+        names = {name: getattr(gl, name) for name in vars(module)
+                 if name.startswith("gl") and hasattr(SoftwareGL, name)}
+        saved.append((module, {name: vars(module)[name] for name in names}))
+        vars(module).update(names)
+    return saved
+
+
+def unbind(saved):
+    for module, names in saved:
+        vars(module).update(names)
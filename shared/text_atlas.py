@@ -0,0 +1,214 @@
+# Draws GLUT bitmap-font text from a texture atlas instead of one
+# glutBitmapCharacter call per character per frame. Each font is drawn
+# once with glutBitmapCharacter, read back with glReadPixels and uploaded
+# as an alpha texture. After that each distinct string is compiled once
+# into a display list of textured quads, and its pixel width is cached
+# next to it. Both are keyed by (font, text).
+#
+# The one-off rasterization draws into the back buffer, so call prepare()
+# every frame just before glClear. A font seen for the first time falls
+# back to glutBitmapCharacter until the next prepare() has built it.
+from collections import OrderedDict
+
+from OpenGL.GL import (glGenTextures, glBindTexture, glTexImage2D, glTexParameteri, glDeleteTextures,
+                       glGenLists, glNewList, glEndList, glCallList, glDeleteLists, GL_COMPILE,
+                       glReadPixels, glPixelStorei, glGetIntegerv, glGetFloatv, glClearColor, glClear,
+                       glPushAttrib, glPopAttrib, glMatrixMode, glPushMatrix, glPopMatrix, glLoadIdentity,
+                       glTranslatef, glRasterPos2i, glRasterPos2f, glColor3f, glEnable, glDisable, glBlendFunc,
+                       glBegin, glEnd, glTexCoord2f, glVertex2f, GL_TEXTURE_2D, GL_ALPHA, GL_RED,
+                       GL_UNSIGNED_BYTE, GL_TEXTURE_MIN_FILTER, GL_TEXTURE_MAG_FILTER, GL_NEAREST,
+                       GL_PACK_ALIGNMENT, GL_UNPACK_ALIGNMENT, GL_VIEWPORT, GL_COLOR_CLEAR_VALUE,
+                       GL_COLOR_BUFFER_BIT, GL_ENABLE_BIT, GL_PROJECTION, GL_MODELVIEW, GL_BLEND,
+                       GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_DEPTH_TEST, GL_LIGHTING, GL_QUADS)
+from OpenGL.GLU import gluOrtho2D
+from OpenGL.GLUT import glutBitmapCharacter, glutBitmapWidth
+
+FIRST_CHAR = 32
+LAST_CHAR = 126
+COLUMNS = 16
+CELL_HEIGHT = 32  # fits the 24 px GLUT fonts with their descenders
+DESCENT = 8  # pixels of the cell below the baseline
+PAD = 4  # for glyphs that spill past their advance width
+MAX_STRINGS = 512  # compiled strings kept; the least recently drawn go first
+
+
+def font_key(font):
+    # GLUT fonts are c_void_p on GLX, which can't be hashed, and ints on Windows
+    return getattr(font, "value", font)
+
+
+class Atlas:
+    def __init__(self, texture, advances, cell_width, width, height):
+        self.texture = texture
+        self.advances = advances
+        self.cell_width = cell_width
+        self.width = width
+        self.height = height
+
+    def glyph_rect(self, code):
+        # Bottom-left corner of a character's cell in the texture
+        i = code - FIRST_CHAR
+        return (i % COLUMNS) * self.cell_width, (i // COLUMNS) * CELL_HEIGHT
+
+
+class TextAtlas:
+    def __init__(self, fonts=()):
+        self.atlases = {}  # font key -> Atlas
+        self.pending = {font_key(f): f for f in fonts}
+        self.lists = OrderedDict()  # (font key, text) -> display list
+        self.widths = {}  # (font key, text) -> pixels
+        self.advances = {}  # font key -> advance per character code
+        self.builds = 0
+
+    def prepare(self):
+        # Rasterizes fonts asked for since the last call; must run before
+        # the frame's glClear
+        while self.pending:
+            key, font = self.pending.popitem()
+            self.atlases[key] = self.build_atlas(font)
+
+    def build_atlas(self, font):
+        advances = self.font_advances(font)
+        cell_width = max(advances[FIRST_CHAR:LAST_CHAR + 1]) + 2 * PAD
+        rows = (LAST_CHAR - FIRST_CHAR) // COLUMNS + 1
+        width, height = COLUMNS * cell_width, rows * CELL_HEIGHT
+        _, _, view_w, view_h = glGetIntegerv(GL_VIEWPORT)
+        clear = glGetFloatv(GL_COLOR_CLEAR_VALUE)
+
+        glPushAttrib(GL_ENABLE_BIT)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_TEXTURE_2D)
+        glDisable(GL_BLEND)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, view_w, 0, view_h)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glClearColor(0, 0, 0, 0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glColor3f(1, 1, 1)
+        atlas = Atlas(None, advances, cell_width, width, height)
+        for code in range(FIRST_CHAR, LAST_CHAR + 1):
+            x, y = atlas.glyph_rect(code)
+            glRasterPos2i(x + PAD, y + DESCENT)
+            glutBitmapCharacter(font, code)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pixels = glReadPixels(0, 0, width, height, GL_RED, GL_UNSIGNED_BYTE)
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glClearColor(*clear)
+        glPopAttrib()
+
+        atlas.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, atlas.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, width, height, 0, GL_ALPHA, GL_UNSIGNED_BYTE, pixels)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return atlas
+
+    def font_advances(self, font):
+        key = font_key(font)
+        advances = self.advances.get(key)
+        if advances is None:
+            advances = self.advances[key] = [glutBitmapWidth(font, c) if FIRST_CHAR <= c <= LAST_CHAR else 0
+                                              for c in range(LAST_CHAR + 1)]
+        return advances
+
+    def width(self, text, font):
+        # Pixel width of text, as the old sum of glutBitmapWidth gave
+        key = (font_key(font), text)
+        width = self.widths.get(key)
+        if width is None:
+            advances = self.font_advances(font)
+            width = self.widths[key] = sum(advances[c] if c <= LAST_CHAR else 0 for c in map(ord, text))
+            if len(self.widths) > MAX_STRINGS:
+                del self.widths[next(iter(self.widths))]
+        return width
+
+    def draw(self, x, y, text, font):
+        # Text with its baseline starting at (x, y) in the current 2D
+        # projection, in the current color
+        key = (font_key(font), text)
+        atlas = self.atlases.get(key[0])
+        if atlas is None:
+            self.pending[key[0]] = font
+            glRasterPos2f(x, y)
+            for character in text:
+                glutBitmapCharacter(font, ord(character))
+            return
+        handle = self.lists.get(key)
+        if handle is None:
+            handle = self.lists[key] = self.compile(atlas, text)
+            if len(self.lists) > MAX_STRINGS:
+                glDeleteLists(self.lists.popitem(last=False)[1], 1)
+        else:
+            self.lists.move_to_end(key)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, atlas.texture)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glPushMatrix()
+        glTranslatef(round(x), round(y), 0)
+        glCallList(handle)
+        glPopMatrix()
+        glDisable(GL_BLEND)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+
+    def compile(self, atlas, text):
+        # One quad per glyph cell, pen moving by each character's advance
+        handle = glGenLists(1)
+        glNewList(handle, GL_COMPILE)
+        glBegin(GL_QUADS)
+        pen = 0
+        for code in map(ord, text):
+            if not FIRST_CHAR < code <= LAST_CHAR:
+                pen += atlas.advances[code] if code <= LAST_CHAR else 0
+                continue
+            u, v = atlas.glyph_rect(code)
+            x0, y0 = pen - PAD, -DESCENT
+            x1, y1 = x0 + atlas.cell_width, y0 + CELL_HEIGHT
+            u0, v0 = u / atlas.width, v / atlas.height
+            u1, v1 = (u + atlas.cell_width) / atlas.width, (v + CELL_HEIGHT) / atlas.height
+            glTexCoord2f(u0, v0)
+            glVertex2f(x0, y0)
+            glTexCoord2f(u1, v0)
+            glVertex2f(x1, y0)
+            glTexCoord2f(u1, v1)
+            glVertex2f(x1, y1)
+            glTexCoord2f(u0, v1)
+            glVertex2f(x0, y1)
+            pen += atlas.advances[code]
+        glEnd()
+        glEndList()
+        self.builds += 1
+        return handle
+
+    def clear(self):
+        for handle in self.lists.values():
+            glDeleteLists(handle, 1)
+        self.lists.clear()
+        for atlas in self.atlases.values():
+            glDeleteTextures([atlas.texture])
+        self.atlases.clear()
+
+
+class CachedLine:
+    # A HUD line that is only re-formatted when the values shown in it change
+    def __init__(self, format):
+        self.format = format
+        self.values = None
+        self.text = ""
+
+    def __call__(self, *values):
+        if values != self.values:
+            self.values = values
+            self.text = self.format(*values)
+        return self.text